@@ -7,6 +7,16 @@ in a folder with the following files:
     app.py      (the primary controller class)
     level.py    (the subcontroller for a single game level)
     models.py   (the model classes)
+    sim.py      (the headless simulation kernel for a wave)
+    events.py   (the event bus for things that happen in a wave)
+    emitters.py (the bullet patterns fired in a bullet-hell wave)
+    barriers.py (the destructible barriers protecting the ship)
+    masks.py    (the pixel masks for pixel-perfect collisions)
+    recorder.py (the recorder for the keyboard input of a game)
+    replay.py   (the headless replay of a recorded game)
+    batch.py    (the simulator for many headless waves at once)
+    farm.py     (the process pool that plays and summarizes many waves)
+    env.py      (the environment API for agents)
     consts.py   (the application constants)
 
 In addition, you should have the following subfolders
@@ -13,6 +13,8 @@ question on Piazza.
 from consts import *
 from game2d import *
 from wave import *
+from recorder import *
+from kivy.logger import Logger
 
 
 # PRIMARY RULE: Invaders can only access attributes in wave.py via
@@ -63,10 +65,45 @@ class Invaders(GameApp):
     # Invariant: _wave is a Wave object, or None if there is no wave currently
     # active. It is only None if _state is STATE_INACTIVE.
     #
+    # Attribute _next: the wave to play next, built a little every frame
+    # Invariant: _next is a Wave object that has not been updated, or None if
+    # it has not been made yet (or was handed over to _wave)
+    #
     # Attribute _text: the currently active message
     # Invariant: _text is a GLabel object, or None if there is no message to
     # display. It is only None if _state is STATE_ACTIVE.
     #
+    # The wave tells this class when the ship is hit (see shipHit) and when
+    # it is won or lost (see endWave) through events, so nothing is polled.
+    #
+    # Attribute _accumulator: the game time not yet simulated by the wave
+    # Invariant: _accumulator is a float in 0..FIXED_STEP (between frames)
+    #
+    # Attribute _alpha: how far between the last two wave updates to draw
+    # Invariant: _alpha is a float in 0..1
+    #
+    # Attribute _recorder: the recorder logging the input of every frame
+    # Invariant: _recorder is an InputRecorder, or None if RECORD_FILE is None
+    #
+    # Attribute _seeds: the seeds of the next waves to be made, in order
+    # Invariant: _seeds is a list of ints; once it is empty, waves are made
+    # with WAVE_SEED
+    #
+    # Attribute _turbo: whether the wave runs TURBO_SPEED times faster
+    # Invariant: _turbo is a bool
+    #
+    # Attribute _tickCount: the ticks run since the last rate report
+    # Invariant: _tickCount is an int >= 0
+    #
+    # Attribute _tickTime: the seconds passed since the last rate report
+    # Invariant: _tickTime is a float >= 0
+    #
+    # Attribute _tickRate: the ticks per second at the last rate report
+    # Invariant: _tickRate is a float >= 0
+    #
+    # Attribute _turboText: the turbo multiplier and tick rate on screen
+    # Invariant: _turboText is a GLabel
+    #
     # You may have new attributes if you wish (you might want an attribute to
     # store any score across multiple waves). But you must document them.
     # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
@@ -94,7 +131,21 @@ class Invaders(GameApp):
         x = GAME_WIDTH/2, y = GAME_HEIGHT/2)
         self._state = STATE_INACTIVE
         self._wave = None
-        self._wave = Wave()
+        self._next = None
+        self._accumulator = 0.0
+        self._alpha = 1.0
+        self._turbo = TURBO
+        self._tickCount = 0
+        self._tickTime = 0.0
+        self._tickRate = 0.0
+        self._turboText = GLabel(text='TURBO', font_name = ARCADE_FONT, \
+        font_size = ARCADE_SMALL, linecolor = 'blue', \
+        left = 10, top = GAME_HEIGHT - 10)
+        self._seeds = []
+        self._recorder = None
+        if RECORD_FILE != None:
+            self._recorder = InputRecorder(RECORD_FILE, ALIEN_ROWS, \
+            ALIENS_IN_ROW, ALIEN_SPEED)
 
 
     def update(self,dt):
@@ -142,6 +193,27 @@ class Invaders(GameApp):
 
         STATE_COMPLETE: The wave is over, and is either won or lost.
 
+        The wave is built ahead of time, WAVE_PREPARE_STEPS game objects per
+        frame, while the start message is shown.  Starting the wave just
+        hands over the wave that is ready, so the frame a wave starts does
+        no more work than any other.
+
+        While the game is active, and FIXED_TIMESTEP is True, the frame time
+        is added to an accumulator, and the wave is updated in ticks of
+        exactly FIXED_STEP seconds until less than one tick is left. A frame
+        may run zero, one or several ticks, so the speed of the game does not
+        depend on the frame rate. The leftover time decides how far between
+        the last two ticks the wave is drawn.
+
+        Pressing 't' switches turbo mode on and off.  In turbo mode the game
+        runs TURBO_SPEED times faster: each frame runs the ticks of TURBO_SPEED
+        times its frame time (at most TURBO_MAX_TICKS), and draws only the
+        last one.
+
+        Time left in the accumulator is thrown away whenever the state
+        changes, so no time from before a pause (or a switch of turbo mode)
+        is simulated after it.
+
         You are allowed to add more states if you wish. Should you do so, you
         should describe them here.
 
@@ -150,22 +222,25 @@ class Invaders(GameApp):
         """
         # IMPLEMENT ME
         assert isinstance(dt, int) or isinstance(dt, float)
-        if self._state != STATE_INACTIVE:
-            if self.getLose() == True or (self._wave.getDip() == True):
-                 self._state = STATE_COMPLETE
-            if self._wave.getWin() == True:
-                self._state = STATE_COMPLETE
-            self.getShip()
+        if self._recorder != None:
+            self._recorder.record(self.input, dt)
         if self.input.is_key_pressed('s') and self._state == STATE_INACTIVE:
             self._state = STATE_NEWWAVE
-            self._wave = Wave()
+            self.startWave()
             self._state = STATE_ACTIVE
         if self.input.is_key_pressed('s') and self._state == STATE_PAUSED:
             self._state = STATE_CONTINUE
             self._state = STATE_ACTIVE
             self._wave.redrawShip()
+            self.resetTicks()
+        if self.input.is_key_pressed('t'):
+            self._turbo = not self._turbo
+            self.resetTicks()
         if self._state == STATE_ACTIVE:
-            self._wave.updateWave(self._input, dt)
+            self.updateTicks(dt)
+        if self._state == STATE_INACTIVE:
+            self.prepareWave()
+        self.reportTicks(dt)
 
 
     def draw(self):
@@ -186,26 +261,197 @@ class Invaders(GameApp):
         if self._state == STATE_INACTIVE:
             self._text.draw(self.view)
         if self._state == STATE_ACTIVE:
-            self._wave.drawWave(self._state, self.view)
+            self._wave.drawWave(self._state, self.view, self._alpha)
         if self._state == STATE_PAUSED:
-            self._wave.drawWave(self._state, self.view)
+            self._wave.drawWave(self._state, self.view, self._alpha)
         if self._state == STATE_COMPLETE:
-            self._wave.drawWave(self._state, self.view)
+            self._wave.drawWave(self._state, self.view, self._alpha)
+        if self._turbo:
+            self._turboText.draw(self.view)
+
+
+    def on_stop(self):
+        """
+        Writes the recorded input (if any) when the application closes.
+
+        This is a Kivy event handler, called by the application on exit.
+        """
+        if self._recorder != None:
+            self._recorder.close()
+            Logger.info('Invaders: Recorded %d frames to %s' % \
+            (self._recorder.getFrameCount(), RECORD_FILE))
 
 
     # HELPER METHODS FOR THE STATES GO HERE
-    def getShip(self):
+    def prepareWave(self):
+        """
+        Builds a little more of the next wave, starting it if there is none.
+
+        Only the simulation kernel of the wave is made in the first frame;
+        each later frame builds WAVE_PREPARE_STEPS more of its game objects,
+        until the wave is ready.
+        """
+        if self._next == None:
+            self._next = Wave(self.nextSeed(), WAVE_PATTERN, False)
+        else:
+            self._next.prepare(WAVE_PREPARE_STEPS)
+
+
+    def startWave(self):
+        """
+        Makes the next wave the current wave and resets the frame timing.
+
+        The next wave is normally ready by now.  If it is not (the player
+        started as soon as the game opened), the rest is built at once.
+        """
+        if self._next == None:
+            self._next = Wave(self.nextSeed(), WAVE_PATTERN, False)
+        self._next.prepare()
+        self._wave = self._next
+        self._next = None
+        self._wave.subscribe(EVENT_SHIP_HIT, self.shipHit)
+        self._wave.subscribe(EVENT_WAVE_WON, self.endWave)
+        self._wave.subscribe(EVENT_WAVE_LOST, self.endWave)
+        Logger.info('Invaders: Starting wave with seed %d' % \
+        self._wave.getSeed())
+        if self._recorder != None:
+            self._recorder.addWave(self._wave.getSeed())
+        self.resetTicks()
+
+
+    def setSeeds(self, seeds):
+        """
+        Sets the seeds of the next waves to be made, such as the waves of a
+        recorded session.
+
+        Parameter seeds: the seeds, in the order the waves are to start
+        Precondition: seeds is a list of ints
+        """
+        assert isinstance(seeds, list)
+        self._seeds = list(seeds)
+
+
+    def nextSeed(self):
+        """
+        Returns the seed of the next wave to be made, and uses it up.
+
+        Waves start in the order they are made, so the k-th seed set by
+        setSeeds goes to the k-th wave started.
         """
-        Detects whether the _wave._ship is None
+        if len(self._seeds) > 0:
+            return self._seeds.pop(0)
+        return WAVE_SEED
+
+
+    def resetTicks(self):
+        """
+        Throws away the game time not yet simulated, when the state changes.
+        """
+        self._accumulator = 0.0
+        self._alpha = 1.0
+
+
+    def updateTicks(self, dt):
         """
-        if self._wave.manageLives() and self._wave.getLives() > 0:
+        Updates the active wave for the time dt.
+
+        If FIXED_TIMESTEP is False, the wave is updated once with dt.
+        Otherwise, dt is added to the accumulator (at most MAX_FRAME_TIME
+        per frame), and the wave is updated in FIXED_STEP ticks until the
+        accumulator holds less than one tick. Ticks stop early if the ship
+        is destroyed or the wave ends, as that changes the state (and so
+        empties the accumulator).
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._wave.latchInput(self.input)
+        if self._turbo:
+            self.updateTurbo(dt)
+            return
+        if not FIXED_TIMESTEP:
+            self._wave.updateWave(self.input, dt)
+            self._alpha = 1.0
+            return
+        self._accumulator += min(dt, MAX_FRAME_TIME)
+        while self._accumulator >= FIXED_STEP and self._state == STATE_ACTIVE:
+            self._accumulator -= FIXED_STEP
+            self._wave.updateWave(self.input, FIXED_STEP)
+            self._tickCount += 1
+        if self._state == STATE_ACTIVE:
+            self._alpha = min(self._accumulator / FIXED_STEP, 1.0)
+
+
+    def updateTurbo(self, dt):
+        """
+        Updates the active wave for TURBO_SPEED times the time dt.
+
+        As in updateTicks, the time is added to the accumulator and the wave
+        is updated in FIXED_STEP ticks, but only the last tick is drawn.  A
+        frame runs at most TURBO_MAX_TICKS ticks, and any time left after
+        that is thrown away, so a slow frame does not make the next one
+        slower.  The ticks of a frame only depend on dt, so a recorded
+        session plays back the same under replay.py, turbo mode or not.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._accumulator += min(dt, MAX_FRAME_TIME) * TURBO_SPEED
+        ticks = 0
+        while self._accumulator >= FIXED_STEP and ticks < TURBO_MAX_TICKS \
+        and self._state == STATE_ACTIVE:
+            self._accumulator -= FIXED_STEP
+            self._wave.updateWave(self.input, FIXED_STEP)
+            ticks += 1
+        if ticks == TURBO_MAX_TICKS:
+            self._accumulator = 0.0
+        self._tickCount += ticks
+        self._alpha = 1.0
+
+
+    def reportTicks(self, dt):
+        """
+        Measures the ticks run per second of real time, every TURBO_REPORT
+        seconds.
+
+        The rate is logged and shown on screen while turbo mode is on.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._tickTime += dt
+        if self._tickTime >= TURBO_REPORT:
+            self._tickRate = self._tickCount / self._tickTime
+            self._tickCount = 0
+            self._tickTime = 0.0
+            if self._turbo:
+                self._turboText.text = 'TURBO x%d  %d TICKS/S' % \
+                (TURBO_SPEED, self._tickRate)
+                self._turboText.left = 10
+                self._turboText.top = GAME_HEIGHT - 10
+                Logger.info('Invaders: Turbo x%d, %.0f ticks per second' % \
+                (TURBO_SPEED, self._tickRate))
+
+
+    def shipHit(self, events):
+        """
+        Pauses the game when the ship is destroyed and lives remain.
+
+        Parameter events: the ship hit events of an update
+        Precondition: events is a nonempty list of EVENT_SHIP_HIT Events
+        """
+        if events[-1].value > 0:
             self._state = STATE_PAUSED
+            self.resetTicks()
 
 
-    def getLose(self):
+    def endWave(self, events):
         """
-        Returns whether the player has won or lost the game (as a bool)
+        Completes the game once the wave reports that it is won or lost.
+
+        Parameter events: the outcome event of the wave
+        Precondition: events is a list of one EVENT_WAVE_WON or
+        EVENT_WAVE_LOST Event
         """
-        lives = self._wave.getLives()
-        if lives == 0:
-            return True
+        self._state = STATE_COMPLETE
+        self.resetTicks()
@@ -0,0 +1,283 @@
+"""
+Barrier module for Alien Invaders
+
+This module contains the destructible barriers (bunkers) of a wave.  The
+barriers sit in rows above the defense line, and every bolt that reaches one
+blasts a crater in it, whoever fired the bolt.
+
+The damage state of each barrier is a NumPy bitmask with one bool per pixel
+(row 0 at the bottom), and the masks of every barrier are stacked in one
+array.  Finding where bolts hit is a single vectorized gather over the pixels
+each bolt swept, and a crater is a precomputed disc stamped into the mask.
+Each crater is reported as the rectangle of pixels it changed, so that a
+renderer only updates that part of its texture.  Like sim.py, this module
+never touches Kivy.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+from consts import *
+from masks import *
+import numpy as np
+
+# The RGBA pixels of each barrier made so far (see loadPixels)
+_PIXELS = {}
+
+# The result of Barriers.sweep when no bolt hits a barrier
+NO_HITS = (np.zeros(0, dtype=int), np.zeros(0), np.zeros(0, dtype=int), \
+np.zeros(0, dtype=int), np.zeros(0, dtype=int))
+
+
+class Barriers(object):
+    """
+    A class holding the damage state of every barrier of a wave.
+
+    Barrier i is a BARRIER_WIDTH x BARRIER_HEIGHT block of pixels whose
+    bottom left corner is (getLefts()[i], getBottoms()[i]).  A pixel is solid
+    while its entry in the mask of the barrier is True.  Barriers never move,
+    and only lose pixels.
+
+    The arrays returned by the getters are owned by the barriers and must not
+    be modified.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _lefts: the x coordinate of the left edge of each barrier
+    # Invariant: _lefts is a float64 array of shape (count,)
+    #
+    # Attribute _bottoms: the y coordinate of the bottom edge of each barrier
+    # Invariant: _bottoms is a float64 array of shape (count,)
+    #
+    # Attribute _masks: which pixels of each barrier are solid
+    # Invariant: _masks is a bool array of shape (count, BARRIER_HEIGHT,
+    # BARRIER_WIDTH), row 0 at the bottom
+    #
+    # Attribute _crater: the pixels a bolt blasts, around the pixel it hit
+    # Invariant: _crater is a bool array of shape (2r+1, 2r+1), where r is
+    # BARRIER_CRATER, that is True outside of a disc of radius r
+    #
+    # Attribute _floor: the bottom edge of the lowest barrier
+    # Invariant: _floor is a float (infinite if there are no barriers)
+    #
+    # Attribute _top: the top edge of the highest barrier
+    # Invariant: _top is a float (-infinite if there are no barriers)
+    #
+    # Attribute _cells: the bytes of _masks, kept between snapshots
+    # Invariant: _cells is the bytes of _masks, or None if a crater was
+    # blasted since it was made
+
+    # GETTERS AND SETTERS
+    def getCount(self):
+        """
+        Returns the number of barriers.
+        """
+        return len(self._lefts)
+
+    def getLefts(self):
+        """
+        Returns the x coordinate of the left edge of each barrier.
+        """
+        return self._lefts
+
+    def getBottoms(self):
+        """
+        Returns the y coordinate of the bottom edge of each barrier.
+        """
+        return self._bottoms
+
+    def getMasks(self):
+        """
+        Returns the (count, BARRIER_HEIGHT, BARRIER_WIDTH) mask of solid
+        pixels, row 0 at the bottom.
+        """
+        return self._masks
+
+    def isSolid(self, index, col, row):
+        """
+        Returns True if the given pixel of a barrier is solid.
+
+        Parameter index: the barrier
+        Precondition: index is an int in 0..getCount()-1
+
+        Parameter col: the column of the pixel (0 at the left)
+        Precondition: col is an int in 0..BARRIER_WIDTH-1
+
+        Parameter row: the row of the pixel (0 at the bottom)
+        Precondition: row is an int in 0..BARRIER_HEIGHT-1
+        """
+        return bool(self._masks[index, row, col])
+
+    # INITIALIZER
+    def __init__(self, count=BARRIER_COUNT):
+        """
+        Initializes count undamaged barriers, laid out by layout.
+
+        The solid pixels are those of the barrier image (see loadPixels).
+
+        Parameter count: the number of barriers
+        Precondition: count is an int >= 0
+        """
+        assert isinstance(count, int) and count >= 0
+        self._lefts, self._bottoms = layout(count)
+        shape = loadPixels()[:, :, 3] > 0
+        self._masks = np.repeat(shape[None], count, axis=0)
+        r = BARRIER_CRATER
+        ys, xs = np.mgrid[-r:r+1, -r:r+1]
+        self._crater = xs*xs + ys*ys > r*r
+        self._floor = self._bottoms.min(initial=np.inf)
+        self._top = self._bottoms.max(initial=-np.inf) + BARRIER_HEIGHT
+        self._cells = None
+
+    # METHODS
+    def sweep(self, px, py, x, y):
+        """
+        Returns the bolts that hit a solid pixel during their last move, as
+        the arrays (bolts, times, indices, cols, rows).
+
+        Entry k says that bolt bolts[k] first touched the solid pixel
+        (cols[k], rows[k]) of barrier indices[k] at time times[k] of the move
+        (0 at the start, 1 at the end).
+
+        A bolt is tested against every pixel of the box it swept (its own box
+        grown by its move), so a fast bolt cannot jump over a thin wall.  The
+        bolts and barriers whose boxes overlap are paired first, and the
+        pixels of every pair are then gathered and tested all at once.  The
+        pixel hit first is the solid one the center of the bolt reaches
+        first along its move.
+
+        Parameter px: the x coordinate of each bolt before the move
+        Precondition: px is a float array
+
+        Parameter py: the y coordinate of each bolt before the move
+        Precondition: py is a float array the same length as px
+
+        Parameter x: the x coordinate of each bolt after the move
+        Precondition: x is a float array the same length as px
+
+        Parameter y: the y coordinate of each bolt after the move
+        Precondition: y is a float array the same length as px
+        """
+        low = np.minimum(py, y) - BOLT_HEIGHT/2
+        high = np.maximum(py, y) + BOLT_HEIGHT/2
+        near = np.nonzero((low < self._top) & (high > self._floor))[0]
+        if len(near) == 0:
+            return NO_HITS
+        sx = px[near]
+        sy = py[near]
+        dx = x[near] - sx
+        dy = y[near] - sy
+        left = np.minimum(sx, sx + dx) - BOLT_WIDTH/2
+        low = low[near]
+        bolt, index = np.nonzero((left[:, None] < self._lefts + \
+        BARRIER_WIDTH) & (left[:, None] + (np.abs(dx) + BOLT_WIDTH)[:, None] > \
+        self._lefts) & (low[:, None] < self._bottoms + BARRIER_HEIGHT) & \
+        (high[near, None] > self._bottoms))
+        if len(bolt) == 0:
+            return NO_HITS
+        times, cols, rows = sweepMasks(self._masks, index, \
+        self._lefts[index], self._bottoms[index], 1.0, sx[bolt], sy[bolt], \
+        dx[bolt], dy[bolt], BOLT_WIDTH, BOLT_HEIGHT)
+        hit = np.nonzero(times != np.inf)[0]
+        if len(hit) == 0:
+            return NO_HITS
+        # A bolt may overlap two barriers; keep its earliest hit
+        slots = near[bolt[hit]]
+        hit = hit[np.lexsort((times[hit], slots))]
+        slots = near[bolt[hit]]
+        keep = np.ones(len(hit), dtype=bool)
+        keep[1:] = slots[1:] != slots[:-1]
+        hit = hit[keep]
+        return (slots[keep], times[hit], index[hit], cols[hit], rows[hit])
+
+    def blast(self, index, col, row):
+        """
+        Blasts a crater around a pixel of a barrier, and returns the
+        rectangle (left, bottom, right, top) of pixels it may have changed.
+
+        The rectangle is in pixels of the barrier, right and top exclusive.
+
+        Parameter index: the barrier
+        Precondition: index is an int in 0..getCount()-1
+
+        Parameter col: the column of the pixel (0 at the left)
+        Precondition: col is an int in 0..BARRIER_WIDTH-1
+
+        Parameter row: the row of the pixel (0 at the bottom)
+        Precondition: row is an int in 0..BARRIER_HEIGHT-1
+        """
+        r = BARRIER_CRATER
+        x0 = max(col - r, 0)
+        x1 = min(col + r + 1, BARRIER_WIDTH)
+        y0 = max(row - r, 0)
+        y1 = min(row + r + 1, BARRIER_HEIGHT)
+        self._masks[index, y0:y1, x0:x1] &= self._crater[y0-row+r:y1-row+r, \
+        x0-col+r:x1-col+r]
+        self._cells = None
+        return (x0, y0, x1, y1)
+
+    def snapshot(self):
+        """
+        Returns the bytes of the masks of every barrier.
+
+        The masks are only copied again after a crater was blasted.
+        """
+        if self._cells == None:
+            self._cells = self._masks.tobytes()
+        return self._cells
+
+    def restore(self, state):
+        """
+        Puts the barriers back in the state captured by snapshot.
+
+        Parameter state: the state to restore
+        Precondition: state was returned by snapshot of barriers with the
+        same count
+        """
+        self._masks[:] = np.frombuffer(state, dtype=bool).reshape( \
+        self._masks.shape)
+        self._cells = state
+
+
+def layout(count):
+    """
+    Returns the arrays (lefts, bottoms) of the bottom left corners of count
+    barriers.
+
+    The barriers are spread evenly across the screen, starting at
+    BARRIER_BOTTOM.  When they do not fit in one row with BARRIER_GAP between
+    them, the rest go in more rows above.
+
+    Parameter count: the number of barriers
+    Precondition: count is an int >= 0
+    """
+    perRow = max(GAME_WIDTH // (BARRIER_WIDTH + BARRIER_GAP), 1)
+    index = np.arange(count)
+    row = index // perRow
+    inRow = np.minimum(count - row * perRow, perRow)
+    lefts = (index % perRow + 0.5) * GAME_WIDTH / inRow - BARRIER_WIDTH/2
+    bottoms = BARRIER_BOTTOM + row * (BARRIER_HEIGHT + BARRIER_GAP)
+    return np.floor(lefts), bottoms.astype(float)
+
+
+def loadPixels(source=BARRIER_IMAGE):
+    """
+    Returns the RGBA pixels of a barrier, as a uint8 array of shape
+    (BARRIER_HEIGHT, BARRIER_WIDTH, 4) with row 0 at the bottom.
+
+    The barrier is the bottom left BARRIER_WIDTH x BARRIER_HEIGHT frame of
+    the image, with the top corners cut and an arch cut out of the bottom,
+    like the bunkers of the arcade game.  Each image is only read once.
+
+    Parameter source: the image file, in the folder Images
+    Precondition: source is a string naming an image at least BARRIER_WIDTH
+    by BARRIER_HEIGHT pixels
+    """
+    if not source in _PIXELS:
+        pixels = readImage(source)[:BARRIER_HEIGHT, :BARRIER_WIDTH].copy()
+        ys, xs = np.mgrid[0:BARRIER_HEIGHT, 0:BARRIER_WIDTH]
+        corner = (BARRIER_HEIGHT - 1 - ys) + np.minimum(xs, \
+        BARRIER_WIDTH - 1 - xs) < BARRIER_WIDTH // 4
+        arch = (xs - (BARRIER_WIDTH - 1)/2)**2 + ys**2 < \
+        (BARRIER_WIDTH // 5)**2
+        pixels[corner | arch, 3] = 0
+        _PIXELS[source] = pixels
+    return _PIXELS[source]
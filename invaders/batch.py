@@ -0,0 +1,540 @@
+"""
+Batched simulation module for Alien Invaders
+
+This module contains a simulator that plays many independent waves at once.
+Every piece of wave state (the alien grid, the formation offset, the bolts,
+the ship, the timers and the lives) is a NumPy array whose first axis is the
+game, and a single call to step advances every game by one update.
+
+The rules are those of WaveSim (see sim.py), applied to all games together:
+the ship moves and fires, the aliens march and drop every ALIEN_SPEED
+seconds, the bottom alien of a random column fires every 1..BOLT_RATE
+marches, and bolts destroy aliens and the ship.  The differences are:
+
+  * Random numbers come from one NumPy generator for the whole batch, so a
+    game does not play out as a WaveSim with the same seed would.
+  * A destroyed ship is put back at the start of the next step, as Invaders
+    does when the player continues.
+  * Each game has room for BATCH_BOLTS alien bolts.  An alien that fires
+    when every slot is taken does not fire.
+  * A game that ends is reset to a new wave at the end of the step.
+  * There are no barriers.
+  * Bolts hit the whole box of an alien or the ship, not just the opaque
+    pixels of its image.
+
+Like sim.py, this module never touches Kivy.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+from consts import *
+from formation import *
+import numpy as np
+
+# PRIMARY RULE: This module may only access consts.py and formation.py.  It
+# must never import game2d (or anything that imports it).
+
+
+class BatchSim(object):
+    """
+    A class simulating many independent waves of Alien Invaders in lockstep.
+
+    The games are numbered 0..size-1.  The method step takes one action bit
+    mask per game, and returns which games ended (and which of those were
+    won) during that step.  Those games have already been reset to a new
+    wave when step returns; their final length and shot count are kept
+    until they end again (see getResults).
+
+    The arrays returned by the getters are owned by the simulator and must
+    not be modified.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _size: the number of games
+    # Invariant: _size is an int > 0
+    #
+    # Attribute _rng: the random generator for every game
+    # Invariant: _rng is a numpy.random.Generator
+    #
+    # Attribute _colX: the home x coordinate of each column of aliens
+    # Invariant: _colX is a float64 array of shape (cols,)
+    #
+    # Attribute _rowY: the home y coordinate of each row (row 0 at bottom)
+    # Invariant: _rowY is a float64 array of shape (rows,)
+    #
+    # Attribute _pitchX: the distance between the centers of two columns
+    # Invariant: _pitchX is a float > 0
+    #
+    # Attribute _pitchY: the distance between the centers of two rows
+    # Invariant: _pitchY is a float > 0
+    #
+    # Attribute _scale: how much the formation is shrunk to fit the screen
+    # Invariant: _scale is a float in (0, 1], as in Formation.getScale
+    #
+    # Attribute _alive: which aliens are alive in each game
+    # Invariant: _alive is a bool array of shape (size, rows, cols)
+    #
+    # Attribute _count: the number of living aliens in each game
+    # Invariant: _count is an int array of shape (size,) matching _alive
+    #
+    # Attribute _offX: the horizontal formation offset of each game
+    # Invariant: _offX is a float64 array of shape (size,)
+    #
+    # Attribute _offY: the vertical formation offset of each game
+    # Invariant: _offY is a float64 array of shape (size,), all <= 0
+    #
+    # Attribute _direction: the marching direction of each game
+    # Invariant: _direction is a float64 array of 1s and -1s, shape (size,)
+    #
+    # Attribute _time: the time since the last march in each game
+    # Invariant: _time is a float64 array of shape (size,), all >= 0
+    #
+    # Attribute _steps: the marches since the last alien bolt in each game
+    # Invariant: _steps is an int array of shape (size,), all >= 0
+    #
+    # Attribute _fireWhen: the march at which each game fires an alien bolt
+    # Invariant: _fireWhen is an int array of shape (size,), in 1..BOLT_RATE
+    #
+    # Attribute _shipX: the x coordinate of the ship in each game
+    # Invariant: _shipX is a float64 array of shape (size,)
+    #
+    # Attribute _shipAlive: whether the ship is on screen in each game
+    # Invariant: _shipAlive is a bool array of shape (size,)
+    #
+    # Attribute _lives: the lives left in each game
+    # Invariant: _lives is an int array of shape (size,), all >= 0
+    #
+    # Attribute _pbolt: whether each game has a player bolt on screen
+    # Invariant: _pbolt is a bool array of shape (size,)
+    #
+    # Attribute _pboltX: the x coordinate of the player bolt of each game
+    # Invariant: _pboltX is a float64 array of shape (size,)
+    #
+    # Attribute _pboltY: the y coordinate of the player bolt of each game
+    # Invariant: _pboltY is a float64 array of shape (size,)
+    #
+    # Attribute _abolt: which alien bolt slots are in use in each game
+    # Invariant: _abolt is a bool array of shape (size, BATCH_BOLTS)
+    #
+    # Attribute _aboltX: the x coordinate of each alien bolt
+    # Invariant: _aboltX is a float64 array of shape (size, BATCH_BOLTS)
+    #
+    # Attribute _aboltY: the y coordinate of each alien bolt
+    # Invariant: _aboltY is a float64 array of shape (size, BATCH_BOLTS)
+    #
+    # Attribute _over: whether each game has ended during the current step
+    # Invariant: _over is a bool array of shape (size,); all False between
+    # steps, as ended games are reset
+    #
+    # Attribute _won: whether each game that ended was won
+    # Invariant: _won is a bool array of shape (size,)
+    #
+    # Attribute _ticks: the number of steps played in each game so far
+    # Invariant: _ticks is an int array of shape (size,)
+    #
+    # Attribute _fired: the number of player bolts fired in each game so far
+    # Invariant: _fired is an int array of shape (size,)
+    #
+    # Attribute _lastTicks: the length in steps of the last game to end in
+    # each position
+    # Invariant: _lastTicks is an int array of shape (size,)
+    #
+    # Attribute _lastFired: the player bolts fired in the last game to end
+    # in each position
+    # Invariant: _lastFired is an int array of shape (size,)
+
+    # GETTERS AND SETTERS
+    def getSize(self):
+        """
+        Returns the number of games in the batch.
+        """
+        return self._size
+
+    def getAlive(self):
+        """
+        Returns the (size, rows, cols) alive mask of every formation.
+        """
+        return self._alive
+
+    def getCount(self):
+        """
+        Returns the number of living aliens in each game.
+        """
+        return self._count
+
+    def getOffset(self):
+        """
+        Returns the formation offsets of every game as two arrays (dx, dy).
+        """
+        return (self._offX, self._offY)
+
+    def getShipX(self):
+        """
+        Returns the x coordinate of the ship in each game.
+        """
+        return self._shipX
+
+    def getLives(self):
+        """
+        Returns the number of lives left in each game.
+        """
+        return self._lives
+
+    def getPlayerBolts(self):
+        """
+        Returns the player bolts as three arrays (present, x, y), one entry
+        per game.
+        """
+        return (self._pbolt, self._pboltX, self._pboltY)
+
+    def getAlienBolts(self):
+        """
+        Returns the alien bolts as three (size, BATCH_BOLTS) arrays
+        (present, x, y).
+        """
+        return (self._abolt, self._aboltX, self._aboltY)
+
+    def getResults(self):
+        """
+        Returns the last results of every position as three arrays
+        (won, ticks, fired).
+
+        Entry i describes the last game that ended in position i: whether it
+        was won, how many steps it lasted and how many player bolts it fired.
+        It is only meaningful once a game in that position has ended.
+        """
+        return (self._won, self._lastTicks, self._lastFired)
+
+    # INITIALIZER
+    def __init__(self, size, seed=None, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW):
+        """
+        Initializes size new waves.
+
+        Parameter size: the number of games
+        Precondition: size is an int > 0
+
+        Parameter seed: the seed of the random generator for the batch
+        Precondition: seed is an int >= 0, or None to pick one at random
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int > 0
+        """
+        assert isinstance(size, int) and size > 0
+        assert seed is None or isinstance(seed, int)
+        home = Formation(rows, cols)
+        self._size = size
+        self._rng = np.random.default_rng(seed)
+        self._colX = np.array(home.getX()[0])
+        self._rowY = np.array(home.getY()[:, 0])
+        self._scale = home.getScale()
+        self._pitchX = float(ALIEN_H_SEP + ALIEN_WIDTH) * self._scale
+        self._pitchY = float(ALIEN_V_SEP + ALIEN_HEIGHT) * self._scale
+        self._alive = np.ones((size, rows, cols), dtype=bool)
+        self._count = np.full(size, rows * cols)
+        self._offX = np.zeros(size)
+        self._offY = np.zeros(size)
+        self._direction = np.ones(size)
+        self._time = np.zeros(size)
+        self._steps = np.zeros(size, dtype=int)
+        self._fireWhen = np.zeros(size, dtype=int)
+        self._shipX = np.zeros(size)
+        self._shipAlive = np.ones(size, dtype=bool)
+        self._lives = np.zeros(size, dtype=int)
+        self._pbolt = np.zeros(size, dtype=bool)
+        self._pboltX = np.zeros(size)
+        self._pboltY = np.zeros(size)
+        self._abolt = np.zeros((size, BATCH_BOLTS), dtype=bool)
+        self._aboltX = np.zeros((size, BATCH_BOLTS))
+        self._aboltY = np.zeros((size, BATCH_BOLTS))
+        self._over = np.zeros(size, dtype=bool)
+        self._won = np.zeros(size, dtype=bool)
+        self._ticks = np.zeros(size, dtype=int)
+        self._fired = np.zeros(size, dtype=int)
+        self._lastTicks = np.zeros(size, dtype=int)
+        self._lastFired = np.zeros(size, dtype=int)
+        self.reset(np.ones(size, dtype=bool))
+
+    # UPDATE METHOD
+    def step(self, actions, dt=FIXED_STEP):
+        """
+        Advances every game by one update, and returns (done, won).
+
+        done and won are bool arrays with one entry per game: done is True
+        for each game that ended in this step, and won is True for each of
+        those that was won.  Both arrays are reused by the next step.
+
+        Parameter actions: the player actions of each game
+        Precondition: actions is an int array of shape (size,) combining
+        ACTION_LEFT, ACTION_RIGHT and ACTION_FIRE with |
+
+        Parameter dt: the time in seconds of the update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        assert isinstance(dt, int) or isinstance(dt, float)
+        actions = np.asarray(actions)
+        assert actions.shape == (self._size,)
+        self._shipAlive[:] = True
+        self.fireShipBolts(actions)
+        self.updateAliens(dt)
+        self.moveShips(actions, dt)
+        self.updateBolts(dt)
+        self._ticks += 1
+        done = self._over.copy()
+        if done.any():
+            self._lastTicks[done] = self._ticks[done]
+            self._lastFired[done] = self._fired[done]
+            self.reset(done)
+        return done, self._won & done
+
+    def reset(self, games):
+        """
+        Starts a new wave in each of the given games.
+
+        Parameter games: which games to reset
+        Precondition: games is a bool array of shape (size,)
+        """
+        n = int(np.count_nonzero(games))
+        self._alive[games] = True
+        self._count[games] = self._alive.shape[1] * self._alive.shape[2]
+        self._offX[games] = 0.0
+        self._offY[games] = 0.0
+        self._direction[games] = 1.0
+        self._time[games] = 0.0
+        self._steps[games] = 0
+        self._fireWhen[games] = self._rng.integers(1, BOLT_RATE + 1, n)
+        self._shipX[games] = GAME_WIDTH/2
+        self._shipAlive[games] = True
+        self._lives[games] = SHIP_LIVES
+        self._pbolt[games] = False
+        self._abolt[games] = False
+        self._over[games] = False
+        self._ticks[games] = 0
+        self._fired[games] = 0
+
+    def finish(self, games, won):
+        """
+        Ends the given games, unless they already ended this step.
+
+        Parameter games: which games to end
+        Precondition: games is a bool array of shape (size,)
+
+        Parameter won: whether the games were won
+        Precondition: won is a bool
+        """
+        games = games & ~self._over
+        self._won[games] = won
+        self._over |= games
+
+    # HELPER METHODS FOR THE SHIP
+    def moveShips(self, actions, dt):
+        """
+        Moves every ship left and/or right at SHIP_SPEED, keeping it on
+        screen.
+
+        Parameter actions: the player actions of each game
+        Precondition: actions is an int array of shape (size,)
+
+        Parameter dt: the time in seconds of the update
+        Precondition: dt is a number (int or float)
+        """
+        da = SHIP_SPEED * dt * (((actions & ACTION_RIGHT) != 0).astype(float) \
+        - ((actions & ACTION_LEFT) != 0))
+        np.clip(self._shipX + da, SHIP_WIDTH/2, GAME_WIDTH - SHIP_WIDTH/2, \
+        out=self._shipX)
+
+    def fireShipBolts(self, actions):
+        """
+        Fires a bolt from every ship that asked to, unless its game already
+        has a player bolt.
+
+        Parameter actions: the player actions of each game
+        Precondition: actions is an int array of shape (size,)
+        """
+        fire = ((actions & ACTION_FIRE) != 0) & self._shipAlive & ~self._pbolt
+        self._pbolt |= fire
+        self._pboltX[fire] = self._shipX[fire]
+        self._pboltY[fire] = SHIP_BOTTOM + SHIP_HEIGHT + BOLT_HEIGHT/2
+        self._fired += fire
+
+    # HELPER METHODS FOR THE ALIENS
+    def updateAliens(self, dt):
+        """
+        Marches the aliens of every game whose ALIEN_SPEED seconds are up.
+
+        As in WaveSim, a march happens at the start of an update, and the time
+        left over past ALIEN_SPEED is kept.
+
+        Only those games are examined, so the cost of a step without a march
+        does not depend on the size of the formation.
+
+        Parameter dt: the time in seconds of the update
+        Precondition: dt is a number (int or float)
+        """
+        games = np.nonzero(self._time >= ALIEN_SPEED - TIMER_SLACK)[0]
+        self._time[games] = np.maximum(self._time[games] - ALIEN_SPEED, 0.0)
+        self._time += dt
+        if len(games) == 0:
+            return
+        self._steps[games] += 1
+        alive = self._alive[games]
+        columns = alive.any(axis=1)
+        self.whenAliensShoot(games, alive, columns)
+        cols = columns.shape[1]
+        left = np.argmax(columns, axis=1)
+        right = cols - 1 - np.argmax(columns[:, ::-1], axis=1)
+        offX = self._offX[games]
+        margin = (ALIEN_H_SEP + ALIEN_WIDTH) * self._scale
+        edge = columns.any(axis=1) & \
+        ((self._colX[left] + offX <= margin) | \
+        (self._colX[right] + offX >= GAME_WIDTH - margin))
+        dropped = games[edge]
+        if len(dropped) > 0:
+            self._direction[dropped] = -self._direction[dropped]
+            self._offY[dropped] -= ALIEN_V_WALK * self._scale
+            lowest = np.argmax(alive[edge].any(axis=2), axis=1)
+            dip = np.zeros(self._size, dtype=bool)
+            dip[dropped] = self._rowY[lowest] + self._offY[dropped] \
+            - ALIEN_HEIGHT * self._scale/2 < DEFENSE_LINE
+            self.finish(dip, False)
+        self._offX[games] += ALIEN_H_WALK * self._scale * \
+        self._direction[games]
+
+    def whenAliensShoot(self, games, alive, columns):
+        """
+        Fires an alien bolt in each marching game whose turn has come.
+
+        The shooter is the bottom-most living alien of a column picked
+        uniformly at random among the columns with a living alien.
+
+        Parameter games: the games that are marching
+        Precondition: games is an int array of game numbers
+
+        Parameter alive: the alive masks of those games
+        Precondition: alive is a bool array of shape (len(games), rows, cols)
+
+        Parameter columns: which columns of those games have a living alien
+        Precondition: columns is a bool array of shape (len(games), cols)
+        """
+        turn = (self._steps[games] == self._fireWhen[games]) & \
+        columns.any(axis=1)
+        if not turn.any():
+            return
+        ready = games[turn]
+        self._steps[ready] = 0
+        self._fireWhen[ready] = self._rng.integers(1, BOLT_RATE + 1, \
+        len(ready))
+        free = ~self._abolt[games]
+        shoot = turn & free.any(axis=1)
+        which = games[shoot]
+        col = np.argmax(self._rng.random(columns[shoot].shape) * \
+        columns[shoot], axis=1)
+        row = np.argmax(alive[shoot, :, col], axis=1)
+        slot = np.argmax(free[shoot], axis=1)
+        self._abolt[which, slot] = True
+        self._aboltX[which, slot] = self._colX[col] + self._offX[which]
+        self._aboltY[which, slot] = self._rowY[row] + self._offY[which] \
+        - ALIEN_HEIGHT * self._scale/2 - BOLT_HEIGHT/2
+
+    # HELPER METHODS FOR THE BOLTS
+    def updateBolts(self, dt):
+        """
+        Moves every bolt and resolves its collisions with ship and aliens.
+
+        As in WaveSim, hits are found over the whole move of each bolt before
+        the bolts that left the screen are removed.
+
+        Parameter dt: the time in seconds of the update
+        Precondition: dt is a number (int or float)
+        """
+        move = BOLT_SPEED * dt
+        self._pboltY += move
+        self._aboltY -= move
+        self.hitAliens(move)
+        self.hitShips(move)
+        self._pbolt &= (self._pboltY < GAME_HEIGHT) & (self._pboltY > 0)
+        self._abolt &= (self._aboltY < GAME_HEIGHT) & (self._aboltY > 0)
+
+    def hitAliens(self, move):
+        """
+        Destroys every alien hit by a player bolt, removing the bolt.
+
+        As in Formation.sweepCells, the bolt is swept over its last move, and
+        the cells it can overlap are worked out arithmetically from the
+        formation lattice.  In a formation scaled down far enough, a bolt
+        overlaps several columns, and every one of them is tested.  Bolts
+        only move up, so the first living alien in the rows it crossed
+        (bottom row first, then left to right) is the one it hit first.
+
+        Parameter move: how far the bolts moved in this update
+        Precondition: move is a number >= 0
+        """
+        games = np.nonzero(self._pbolt)[0]
+        if len(games) == 0:
+            return
+        rows, cols = self._alive.shape[1:]
+        x0 = self._pboltX[games] - self._colX[0] - self._offX[games]
+        y0 = self._pboltY[games] - self._rowY[0] - self._offY[games]
+        reachX = (ALIEN_WIDTH * self._scale + BOLT_WIDTH)/2
+        reachY = (ALIEN_HEIGHT * self._scale + BOLT_HEIGHT)/2
+        left = np.maximum(np.floor((x0 - reachX)/self._pitchX) + 1, 0)
+        right = np.minimum(np.ceil((x0 + reachX)/self._pitchX) - 1, cols - 1)
+        first = np.floor((y0 - move - reachY)/self._pitchY).astype(int) + 1
+        last = np.minimum(np.ceil((y0 + reachY)/self._pitchY) - 1, rows - 1)
+        inside = left <= right
+        games, left, right = games[inside], left[inside], right[inside]
+        first, last = np.maximum(first[inside], 0), last[inside]
+        # The columns each bolt overlaps, padded to the same number
+        span = left.astype(int)[:, None] + \
+        np.arange(int(np.ceil(2 * reachX/self._pitchX)) + 1)
+        valid = span <= right[:, None]
+        np.minimum(span, cols - 1, out=span)
+        row = np.full(len(games), -1)
+        col = np.full(len(games), -1)
+        for step in range(int(np.ceil((move + 2 * reachY)/self._pitchY)) + 1):
+            check = np.nonzero((row < 0) & (first + step <= last))[0]
+            if len(check) == 0:
+                break
+            alive = self._alive[games[check, None], (first + step)[check, \
+            None], span[check]] & valid[check]
+            found = alive.any(axis=1)
+            check = check[found]
+            row[check] = (first + step)[check]
+            col[check] = span[check, np.argmax(alive[found], axis=1)]
+        hit = row >= 0
+        games, row, col = games[hit], row[hit], col[hit]
+        if len(games) == 0:
+            return
+        self._alive[games, row, col] = False
+        self._pbolt[games] = False
+        self._count[games] -= 1
+        cleared = np.zeros(self._size, dtype=bool)
+        cleared[games] = self._count[games] == 0
+        self.finish(cleared, True)
+
+    def hitShips(self, move):
+        """
+        Destroys every ship hit by an alien bolt, removing one such bolt.
+
+        Each bolt is swept over its last move.  Bolts only move down, so of
+        the bolts that hit a ship, the lowest one hit it first.
+
+        Parameter move: how far the bolts moved in this update
+        Precondition: move is a number >= 0
+        """
+        reachY = (SHIP_HEIGHT + BOLT_HEIGHT)/2
+        centerY = SHIP_BOTTOM + SHIP_HEIGHT/2
+        hits = self._abolt & self._shipAlive[:, None] & \
+        (np.abs(self._aboltX - self._shipX[:, None]) < \
+        (SHIP_WIDTH + BOLT_WIDTH)/2) & \
+        (self._aboltY < centerY + reachY) & \
+        (self._aboltY + move > centerY - reachY)
+        games = np.nonzero(hits.any(axis=1))[0]
+        if len(games) == 0:
+            return
+        lowest = np.where(hits[games], self._aboltY[games], np.inf)
+        self._abolt[games, np.argmin(lowest, axis=1)] = False
+        self._shipAlive[games] = False
+        self._lives[games] -= 1
+        self.finish(self._lives == 0, False)
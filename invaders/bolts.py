@@ -0,0 +1,422 @@
+"""
+Bolt store module for Alien Invaders
+
+This module contains the array-backed store for the laser bolts in the
+simulation kernel. Every bolt is a slot in a set of parallel NumPy arrays
+(position, velocity and owner), and the live bolts are always packed into the
+first count slots.
+
+Bolts have a 2D velocity, and are moved all at once with a single vectorized
+step.  Many bolts can also be spawned in one call (see spawnMany).  Bolts that
+leave the screen or hit something are only marked during the frame, and are
+then removed together by compact, which fills each hole with a live bolt from
+the end of the store (swap-removal).  Like sim.py, this module never touches
+Kivy.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+from consts import *
+from collections import namedtuple
+import numpy as np
+
+
+class StoreState(namedtuple('StoreState', \
+['count', 'x', 'y', 'px', 'py', 'vx', 'vy', 'player'])):
+    """
+    An immutable snapshot of a BoltStore, made by BoltStore.snapshot.
+
+    Attribute count: the number of live bolts
+    Invariant: count is an int >= 0
+
+    Attributes x, y, px, py, vx, vy, player: the live slots of each array
+    Invariant: each is the bytes of the first count slots of the array with
+    the same name in BoltStore
+    """
+    __slots__ = ()
+
+
+class BoltStore(object):
+    """
+    A class holding every laser bolt of a wave in parallel arrays.
+
+    Slot i of each array describes the same bolt. Only the first getCount()
+    slots hold live bolts; the rest are spare capacity.  Slots are not stable:
+    compact moves bolts from the end of the store into the holes left by
+    removed bolts.
+
+    The arrays returned by the getters are views into the store, trimmed to
+    the live bolts.  They must not be modified.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _x: the x coordinate of the center of each bolt
+    # Invariant: _x is a float64 array of length _capacity
+    #
+    # Attribute _y: the y coordinate of the center of each bolt
+    # Invariant: _y is a float64 array of length _capacity
+    #
+    # Attribute _px: the x coordinate of each bolt before the last move
+    # Invariant: _px is a float64 array of length _capacity
+    #
+    # Attribute _py: the y coordinate of each bolt before the last move
+    # Invariant: _py is a float64 array of length _capacity
+    #
+    # Attribute _vx: the number of pixels per second each bolt moves right
+    # Invariant: _vx is a float64 array of length _capacity
+    #
+    # Attribute _vy: the number of pixels per second each bolt moves up
+    # Invariant: _vy is a float64 array of length _capacity
+    #
+    # Attribute _player: whether each bolt was fired by the player
+    # Invariant: _player is a bool array of length _capacity
+    #
+    # Attribute _dead: which bolts are marked for removal
+    # Invariant: _dead is a bool array of length _capacity; it is all False
+    # right after compact
+    #
+    # Attribute _count: the number of live bolts
+    # Invariant: _count is an int in 0.._capacity
+    #
+    # Attribute _capacity: the number of slots in each array
+    # Invariant: _capacity is an int > 0
+
+    # GETTERS AND SETTERS
+    def getCount(self):
+        """
+        Returns the number of bolts in the store.
+        """
+        return self._count
+
+    def getX(self):
+        """
+        Returns the x coordinates of the bolts in the store.
+        """
+        return self._x[:self._count]
+
+    def getY(self):
+        """
+        Returns the y coordinates of the bolts in the store.
+        """
+        return self._y[:self._count]
+
+    def getPrevX(self):
+        """
+        Returns the x coordinates of the bolts before the last move.
+        """
+        return self._px[:self._count]
+
+    def getPrevY(self):
+        """
+        Returns the y coordinates of the bolts before the last move.
+        """
+        return self._py[:self._count]
+
+    def getVelocity(self):
+        """
+        Returns the vertical velocities of the bolts in the store.
+        """
+        return self._vy[:self._count]
+
+    def getVelocityX(self):
+        """
+        Returns the horizontal velocities of the bolts in the store.
+        """
+        return self._vx[:self._count]
+
+    def getPlayer(self):
+        """
+        Returns the owner flags (True for the player) of the bolts in the store.
+        """
+        return self._player[:self._count]
+
+    def getDead(self):
+        """
+        Returns which bolts in the store are marked for removal.
+        """
+        return self._dead[:self._count]
+
+    # INITIALIZER
+    def __init__(self, capacity=16):
+        """
+        Initializes an empty store.
+
+        Parameter capacity: the number of slots to start with
+        Precondition: capacity is an int > 0
+        """
+        assert isinstance(capacity, int) and capacity > 0
+        self._capacity = capacity
+        self._count = 0
+        self._x = np.zeros(capacity)
+        self._y = np.zeros(capacity)
+        self._px = np.zeros(capacity)
+        self._py = np.zeros(capacity)
+        self._vx = np.zeros(capacity)
+        self._vy = np.zeros(capacity)
+        self._player = np.zeros(capacity, dtype=bool)
+        self._dead = np.zeros(capacity, dtype=bool)
+
+    # METHODS
+    def spawn(self, x, y, player):
+        """
+        Adds a bolt to the end of the store and returns its slot.
+
+        Player bolts move straight up at BOLT_SPEED and alien bolts move
+        straight down.  A new bolt has no previous position, so it is its
+        current one.  The arrays double in size when the store is full.
+
+        Parameter x: the x coordinate of the center of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the center of the bolt
+        Precondition: y is an int or float
+
+        Parameter player: whether the bolt was fired by the player
+        Precondition: player is a bool
+        """
+        assert isinstance(player, bool)
+        if self._count == self._capacity:
+            self.grow(2 * self._capacity)
+        slot = self._count
+        self._x[slot] = x
+        self._y[slot] = y
+        self._px[slot] = x
+        self._py[slot] = y
+        self._vx[slot] = 0.0
+        self._vy[slot] = BOLT_SPEED if player else -BOLT_SPEED
+        self._player[slot] = player
+        self._dead[slot] = False
+        self._count += 1
+        return slot
+
+    def spawnMany(self, xs, ys, vxs, vys):
+        """
+        Adds alien bolts to the end of the store, all in one step.
+
+        The arrays double in size (as often as needed) when the new bolts do
+        not fit.
+
+        Parameter xs: the x coordinates of the centers of the bolts
+        Precondition: xs is a float array
+
+        Parameter ys: the y coordinates of the centers of the bolts
+        Precondition: ys is a float array the same length as xs
+
+        Parameter vxs: the number of pixels per second each bolt moves right
+        Precondition: vxs is a float array the same length as xs
+
+        Parameter vys: the number of pixels per second each bolt moves up
+        Precondition: vys is a float array the same length as xs
+        """
+        n = self._count
+        m = n + len(xs)
+        if m > self._capacity:
+            capacity = self._capacity
+            while capacity < m:
+                capacity *= 2
+            self.grow(capacity)
+        self._x[n:m] = xs
+        self._y[n:m] = ys
+        self._px[n:m] = xs
+        self._py[n:m] = ys
+        self._vx[n:m] = vxs
+        self._vy[n:m] = vys
+        self._player[n:m] = False
+        self._dead[n:m] = False
+        self._count = m
+
+    def grow(self, capacity):
+        """
+        Enlarges every array to the given number of slots.
+
+        Parameter capacity: the new number of slots
+        Precondition: capacity is an int >= getCount()
+        """
+        assert capacity >= self._count
+        for name in ('_x', '_y', '_px', '_py', '_vx', '_vy', '_player', \
+        '_dead'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._count] = old[:self._count]
+            setattr(self, name, new)
+        self._capacity = capacity
+
+    def move(self, dt):
+        """
+        Moves every bolt by its velocity for dt seconds, remembering where it
+        was.
+
+        Parameter dt: the time in seconds to move for
+        Precondition: dt is a number (int or float) >= 0
+        """
+        n = self._count
+        self._px[:n] = self._x[:n]
+        self._py[:n] = self._y[:n]
+        self._x[:n] += self._vx[:n] * dt
+        self._y[:n] += self._vy[:n] * dt
+
+    def markOffscreen(self):
+        """
+        Marks every bolt that has left the screen.
+        """
+        n = self._count
+        x = self._x[:n]
+        y = self._y[:n]
+        self._dead[:n] |= (y >= GAME_HEIGHT) | (y <= 0) | (x >= GAME_WIDTH) \
+        | (x <= 0)
+
+    def kill(self, slot):
+        """
+        Marks the bolt in the given slot for removal.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int in 0..getCount()-1
+        """
+        self._dead[slot] = True
+
+    def sweepAll(self, x, y, width, height, mask, startX=None):
+        """
+        Returns the arrays (times, slots) of every bolt in mask that
+        overlapped a box during the last move, and when it first did.
+
+        Each bolt moved in a straight line from its previous position (time 0)
+        to its current one (time 1).  The box may also have moved sideways
+        over the same time, from startX to x, in which case the bolts are
+        swept relative to the box.  The box is grown by the size of a bolt.
+        Bolts whose vertical extent over the move misses the box are culled
+        first, and the rest are tested exactly, one axis at a time.  The
+        slots are in increasing order.
+
+        Parameter x: the x coordinate of the center of the box
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the center of the box
+        Precondition: y is an int or float
+
+        Parameter width: the width of the box
+        Precondition: width is a number >= 0
+
+        Parameter height: the height of the box
+        Precondition: height is a number >= 0
+
+        Parameter mask: which bolts to test
+        Precondition: mask is a bool array of length getCount()
+
+        Parameter startX: the x coordinate of the center of the box at time 0
+        Precondition: startX is an int or float, or None if the box did not
+        move
+        """
+        n = self._count
+        reachY = (height + BOLT_HEIGHT)/2
+        py = self._py[:n]
+        cy = self._y[:n]
+        near = np.nonzero(mask & (np.minimum(py, cy) < y + reachY) & \
+        (np.maximum(py, cy) > y - reachY))[0]
+        if len(near) == 0:
+            return (np.zeros(0), near)
+        shift = 0.0 if startX == None else x - startX
+        px = self._px[near] + shift
+        py = py[near]
+        enterX, leaveX = slabs(px, self._x[near] - px, x, \
+        (width + BOLT_WIDTH)/2)
+        enterY, leaveY = slabs(py, cy[near] - py, y, reachY)
+        enter = np.maximum(np.maximum(enterX, enterY), 0.0)
+        leave = np.minimum(np.minimum(leaveX, leaveY), 1.0)
+        hit = enter < leave
+        return (enter[hit], near[hit])
+
+    def isDead(self, slot):
+        """
+        Returns True if the bolt in the given slot is marked for removal.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int in 0..getCount()-1
+        """
+        return bool(self._dead[slot])
+
+    def snapshot(self):
+        """
+        Returns an immutable StoreState of the live bolts.
+
+        Only the live slots are copied, so an empty store costs nothing.  The
+        store must be compact (as it is between steps).
+        """
+        n = self._count
+        return StoreState(n, self._x[:n].tobytes(), self._y[:n].tobytes(), \
+        self._px[:n].tobytes(), self._py[:n].tobytes(), \
+        self._vx[:n].tobytes(), self._vy[:n].tobytes(), \
+        self._player[:n].tobytes())
+
+    def restore(self, state):
+        """
+        Puts this store back in the state captured by snapshot.
+
+        Parameter state: the state to restore
+        Precondition: state is a StoreState
+        """
+        assert isinstance(state, StoreState)
+        n = state.count
+        if n > self._capacity:
+            self.grow(n)
+        self._x[:n] = np.frombuffer(state.x)
+        self._y[:n] = np.frombuffer(state.y)
+        self._px[:n] = np.frombuffer(state.px)
+        self._py[:n] = np.frombuffer(state.py)
+        self._vx[:n] = np.frombuffer(state.vx)
+        self._vy[:n] = np.frombuffer(state.vy)
+        self._player[:n] = np.frombuffer(state.player, dtype=bool)
+        self._dead[:] = False
+        self._count = n
+
+    def compact(self):
+        """
+        Removes every marked bolt and returns how many player bolts went.
+
+        Each hole below the new count is filled with a live bolt from above
+        it (swap-removal), so the copying is proportional to the number of
+        bolts removed, and no bolt is skipped or moved twice.
+        """
+        n = self._count
+        dead = np.nonzero(self._dead[:n])[0]
+        if len(dead) == 0:
+            return 0
+        gone = int(np.count_nonzero(self._player[dead]))
+        m = n - len(dead)
+        holes = dead[dead < m]
+        fill = m + np.nonzero(~self._dead[m:n])[0]
+        for array in (self._x, self._y, self._px, self._py, self._vx, \
+        self._vy, self._player):
+            array[holes] = array[fill]
+        self._dead[dead] = False
+        self._count = m
+        return gone
+
+
+def slabs(start, delta, center, reach):
+    """
+    Returns the arrays of (enter, leave) times at which points moving along
+    one axis are within reach of center.
+
+    This is slab in formation.py for many points at once.  Time 0 is the
+    start of each move and time 1 is the end.
+
+    Parameter start: the positions of the points at time 0
+    Precondition: start is a float array
+
+    Parameter delta: how far each point moves from time 0 to time 1
+    Precondition: delta is a float array the same length as start
+
+    Parameter center: the center of the slab
+    Precondition: center is an int or float
+
+    Parameter reach: half the width of the slab
+    Precondition: reach is a number > 0
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        low = (center - reach - start)/delta
+        high = (center + reach - start)/delta
+    still = delta == 0
+    inside = np.abs(start - center) < reach
+    enter = np.where(still, np.where(inside, -np.inf, np.inf), \
+    np.minimum(low, high))
+    leave = np.where(still, np.inf, np.maximum(low, high))
+    return enter, leave
@@ -27,10 +27,13 @@ SHIP_WIDTH    = 44
 SHIP_HEIGHT   = 44
 # the distance of the (bottom of the) ship from the bottom
 SHIP_BOTTOM   = 32
-# The number of pixels to move the ship per update
-SHIP_MOVEMENT = 5
-# The image file to use for the ship
+# The number of pixels per second the ship moves
+SHIP_SPEED    = 300
+# The image file to use for the ship (and for its collision mask)
 SHIP_IMAGE    = 'ship.png'
+# The filmstrip to draw the ship with, and its grid of (rows, columns) frames
+SHIP_STRIP    = 'ship-strip.png'
+SHIP_FORMAT   = (2, 4)
 # The number of lives a ship has
 SHIP_LIVES    = 3
 # How many seconds a death animation takes
@@ -55,12 +58,25 @@ ALIEN_H_WALK  = ALIEN_WIDTH // 4
 ALIEN_V_WALK  = ALIEN_HEIGHT // 2
 # The distance of the top alien from the top of the window
 ALIEN_CEILING = 100
-# the number of rows of aliens, in range 1..10
+# the number of rows of aliens, in range 1..FORMATION_LIMIT
 ALIEN_ROWS     = 5
-# the number of aliens per row
+# the number of aliens per row, in range 1..FORMATION_LIMIT
 ALIENS_IN_ROW  = 12
-# the image files for the aliens (bottom to top)
+# the most rows, and the most aliens per row, of a formation
+FORMATION_LIMIT = 1000
+# the largest formation drawn at full size; a formation with more rows or more
+# aliens per row is scaled down to take no more room than this one
+ALIEN_ROWS_FIT    = 10
+ALIENS_IN_ROW_FIT = 15
+# the image files for the aliens (bottom to top), used for collision masks
 ALIEN_IMAGES   = ('alien1.png','alien2.png','alien3.png')
+# the filmstrips to draw the aliens with (bottom to top), and their grid of
+# (rows, columns) frames
+ALIEN_STRIPS   = ('alien-strip1.png','alien-strip2.png','alien-strip3.png')
+ALIEN_FORMAT   = (4, 2)
+# the number of frames (at the start of a filmstrip) the aliens march through,
+# moving on to the next frame at every march
+ALIEN_MARCH_FRAMES = 2
 # the number of seconds (float <= 1) between alien steps
 ALIEN_SPEED = 1.0
 
@@ -71,10 +87,38 @@ ALIEN_SPEED = 1.0
 BOLT_WIDTH  = 4
 # the height of a laser bolt
 BOLT_HEIGHT = 16
-# the number of pixels to move the bolt per update
-BOLT_SPEED  = 10
+# the number of pixels per second a bolt moves
+BOLT_SPEED  = 600
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
+# the most idle Bolt objects kept in the bolt pool for reuse
+BOLT_POOL_SIZE = 256
+# the number of alien bolts each game of a BatchSim can have on screen
+BATCH_BOLTS = 8
+
+
+### BARRIER CONSTANTS (see barriers.py) ###
+
+# the image file of the barriers
+BARRIER_IMAGE  = 'barrier.png'
+# the width of a barrier, in pixels of its image
+BARRIER_WIDTH  = 44
+# the height of a barrier, in pixels of its image
+BARRIER_HEIGHT = 44
+# the number of barriers in a wave (0 for none)
+BARRIER_COUNT  = 4
+# the y coordinate of the bottom of the lowest row of barriers
+BARRIER_BOTTOM = DEFENSE_LINE + 20
+# the least space between two barriers, side by side or one above the other
+BARRIER_GAP    = 16
+# the radius (in pixels) of the crater a bolt blasts in a barrier
+BARRIER_CRATER = 5
+
+
+### MASK CONSTANTS (see masks.py) ###
+
+# the least alpha (0..255) of a pixel that a bolt can hit
+MASK_ALPHA = 128
 
 
 ### GAME CONSTANTS ###
@@ -93,6 +137,108 @@ STATE_CONTINUE = 4
 STATE_COMPLETE = 5
 
 
+### TIMING CONSTANTS ###
+
+# whether to update in fixed-size ticks (True) or once per frame (False)
+FIXED_TIMESTEP = True
+# the number of seconds of game time in one fixed tick
+FIXED_STEP = 1/60
+# how far past its period a game timer may be while it still counts as due,
+# so that summing float tick lengths cannot delay a timer by a whole tick
+TIMER_SLACK = 1e-9
+# the number of seconds between two moves of the timed policy, which plays
+# the same wave at several update rates (see farm.py)
+TIMED_PERIOD = 0.2
+# the most frame time (in seconds) that a single frame will catch up on
+MAX_FRAME_TIME = 0.25
+# whether the game starts in turbo mode (toggled with the 't' key)
+TURBO = False
+# how many times faster than real time the game runs in turbo mode
+TURBO_SPEED = 20
+# the most ticks that turbo mode will run in a single frame, so that a slow
+# frame cannot make the next ones slower still
+TURBO_MAX_TICKS = 200
+# the number of seconds between two reports of the turbo tick rate
+TURBO_REPORT = 1.0
+# the number of game objects (or rows of aliens) of the wave built ahead of
+# time in each frame, while the start message is shown
+WAVE_PREPARE_STEPS = 2
+
+
+### RANDOM CONSTANTS ###
+
+# the random seed of every wave, or None to pick a new seed for each wave
+WAVE_SEED = None
+# seeds picked for a wave are in the range 0..SEED_RANGE-1
+SEED_RANGE = 2**32
+# the file to record the keyboard input to, or None to not record it
+RECORD_FILE = None
+
+
+### ACTION CONSTANTS (bit flags, combine with |) ###
+
+# no player input this update
+ACTION_NONE  = 0
+# move the ship to the left
+ACTION_LEFT  = 1
+# move the ship to the right
+ACTION_RIGHT = 2
+# fire a bolt from the ship
+ACTION_FIRE  = 4
+
+
+### EMITTER CONSTANTS (see emitters.py) ###
+
+# the bullet pattern of every wave ('spread', 'spiral' or 'aimed'), or None
+# for the original alien fire
+WAVE_PATTERN = None
+# the most quads (bolts or aliens) in one Kivy Mesh, which uses 16-bit indices
+MESH_QUADS = 16383
+# the number of seconds between two volleys of a pattern
+EMITTER_RATE = 0.25
+# the number of pixels per second a pattern bolt moves
+EMITTER_SPEED = 240
+# the number of directions in the precomputed direction table
+EMITTER_DIRECTIONS = 360
+# the number of bolts in a spread or aimed fan
+EMITTER_FAN = 7
+# the width of a spread or aimed fan, in degrees
+EMITTER_ARC = 60
+# the number of bolts in a spiral volley
+EMITTER_ARMS = 12
+# the number of table directions a spiral turns after each volley
+EMITTER_TURN = 7
+
+
+### EVENT CONSTANTS (see events.py) ###
+
+# an alien was destroyed; the value is its (row, col)
+EVENT_ALIEN_KILLED      = 0
+# the ship was destroyed; the value is the number of lives left
+EVENT_SHIP_HIT          = 1
+# a bolt was fired; the value is True for the player, False for an alien
+EVENT_BOLT_FIRED        = 2
+# the formation dropped at an edge; the value is its new bottom edge
+EVENT_FORMATION_DROPPED = 3
+# every alien was destroyed; the value is None
+EVENT_WAVE_WON          = 4
+# the aliens reached the defense line or the lives ran out; the value is None
+EVENT_WAVE_LOST         = 5
+# a bolt blasted a crater in a barrier; the value is (index, left, bottom,
+# right, top), the barrier and the rectangle of its pixels that changed
+EVENT_BARRIER_HIT       = 6
+
+
+### ENVIRONMENT CONSTANTS ###
+
+# the number of bolts a WaveEnv observation has room for
+ENV_BOLTS = 32
+# the reward for each alien destroyed
+ENV_KILL_REWARD = 1.0
+# the reward for each life lost
+ENV_LIFE_REWARD = -10.0
+
+
 ### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW"""
 """
 sys.argv is a list of the command line arguments when you run python. These arguments are
@@ -101,18 +247,20 @@ everything after the word python. So if you start the game typing
     python invaders 3 4 0.5
 
 Python puts ['breakout.py', '3', '4', '0.5'] into sys.argv. Below, we take advantage of
-this fact to change the constants ALIEN_ROWS, ALIENS_IN_ROW, and ALIEN_SPEED.
+this fact to change the constants ALIEN_ROWS, ALIENS_IN_ROW, and ALIEN_SPEED.  A fourth
+argument (an int) is the random seed of every wave, so that a game can be replayed.  A
+fifth argument is the name of a file to record the keyboard input to (see recorder.py).
 """
 try:
     rows = int(sys.argv[1])
-    if rows >= 1 and rows <= 10:
+    if rows >= 1 and rows <= FORMATION_LIMIT:
         ALIEN_ROWS = rows
 except:
     pass # Use original value
 
 try:
     perrow = int(sys.argv[2])
-    if perrow >= 1 and perrow <= 15:
+    if perrow >= 1 and perrow <= FORMATION_LIMIT:
         ALIENS_IN_ROW = perrow
 except:
     pass # Use original value
@@ -124,10 +272,18 @@ try:
 except:
     pass # Use original value
 
-### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
+try:
+    WAVE_SEED = int(sys.argv[4])
+except:
+    pass # Use original value
+
+try:
+    if sys.argv[5] != '':
+        RECORD_FILE = sys.argv[5]
+except:
+    pass # Use original value
 
-# The alternate images to use in the filmstrip
-#SHIP_IMAGE    = 'ship-strip.png'
+### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
 
 # The number of (base) points each alien is worth.  Multiplied by row
 ALIEN_POINTS = 10
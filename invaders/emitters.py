@@ -0,0 +1,163 @@
+"""
+Emitter module for Alien Invaders
+
+This module contains the bullet pattern emitters of the bullet-hell wave.
+Instead of one alien firing every few marches, every shooting alien (the
+bottom-most living alien of each column) fires a pattern of bolts every
+EMITTER_RATE seconds:
+
+    'spread'  a fan of EMITTER_FAN bolts, EMITTER_ARC degrees wide, downward
+    'spiral'  EMITTER_ARMS bolts evenly around a circle, turning every volley
+    'aimed'   a fan of EMITTER_FAN bolts centered on the ship
+
+Directions come from a table of EMITTER_DIRECTIONS unit vectors computed
+once, so a pattern is a set of table indices, and a volley from every
+shooter is built with a few array operations and added to the BoltStore in
+one call.  Like sim.py, this module never touches Kivy.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+from consts import *
+from bolts import *
+import numpy as np
+
+# The velocity (in pixels per second) of a bolt fired in each table direction.
+# Direction k is k*360/EMITTER_DIRECTIONS degrees counter-clockwise from right.
+_ANGLES = np.arange(EMITTER_DIRECTIONS) * (2 * np.pi / EMITTER_DIRECTIONS)
+DIRECTION_VX = EMITTER_SPEED * np.cos(_ANGLES)
+DIRECTION_VY = EMITTER_SPEED * np.sin(_ANGLES)
+
+# The table index of straight down
+DOWN = (3 * EMITTER_DIRECTIONS) // 4
+
+# The patterns an Emitter can fire
+PATTERNS = ('spread', 'spiral', 'aimed')
+
+
+class Emitter(object):
+    """
+    A class firing one bullet pattern from every shooting alien.
+
+    The emitter keeps its own clock, and fires a volley whenever
+    EMITTER_RATE seconds have passed.  The spiral pattern also turns by
+    EMITTER_TURN table steps after every volley.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _pattern: the name of the pattern
+    # Invariant: _pattern is one of PATTERNS
+    #
+    # Attribute _offsets: the table offsets of the bolts of one shooter
+    # Invariant: _offsets is an int array; for 'spread' and 'aimed' they
+    # are relative to the center of the fan, and for 'spiral' to the phase
+    #
+    # Attribute _time: the time since the last volley
+    # Invariant: _time is a float >= 0
+    #
+    # Attribute _phase: the table index the spiral starts at
+    # Invariant: _phase is an int in 0..EMITTER_DIRECTIONS-1
+
+    # GETTERS AND SETTERS
+    def getPattern(self):
+        """
+        Returns the name of the pattern this emitter fires.
+        """
+        return self._pattern
+
+    def getBoltsPerShooter(self):
+        """
+        Returns the number of bolts each shooting alien fires per volley.
+        """
+        return len(self._offsets)
+
+    # INITIALIZER
+    def __init__(self, pattern):
+        """
+        Initializes an emitter that has not fired yet.
+
+        Parameter pattern: the name of the pattern
+        Precondition: pattern is one of PATTERNS
+        """
+        assert pattern in PATTERNS
+        self._pattern = pattern
+        if pattern == 'spiral':
+            step = EMITTER_DIRECTIONS / EMITTER_ARMS
+            self._offsets = np.round(np.arange(EMITTER_ARMS) * step)
+            self._offsets = self._offsets.astype(int)
+        else:
+            arc = EMITTER_ARC * EMITTER_DIRECTIONS / 360
+            self._offsets = np.round(np.linspace(-arc/2, arc/2, \
+            EMITTER_FAN)).astype(int)
+        self._time = 0.0
+        self._phase = 0
+
+    # METHODS
+    def update(self, dt):
+        """
+        Returns True (and restarts the clock) when it is time for a volley.
+
+        As with the alien march, a volley is fired at the start of the first
+        update that begins EMITTER_RATE seconds or more after the last one,
+        and the time left over is kept for the next volley.
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        due = self._time >= EMITTER_RATE - TIMER_SLACK
+        if due:
+            self._time = max(self._time - EMITTER_RATE, 0.0)
+        self._time += dt
+        return due
+
+    def fire(self, store, xs, ys, targetX, targetY):
+        """
+        Adds one volley from every shooter to store, and returns the number
+        of bolts fired.
+
+        Parameter store: the store to add the bolts to
+        Precondition: store is a BoltStore
+
+        Parameter xs: the x coordinate each shooter fires from
+        Precondition: xs is a float array
+
+        Parameter ys: the y coordinate each shooter fires from
+        Precondition: ys is a float array the same length as xs
+
+        Parameter targetX: the x coordinate aimed at by 'aimed'
+        Precondition: targetX is an int or float
+
+        Parameter targetY: the y coordinate aimed at by 'aimed'
+        Precondition: targetY is an int or float
+        """
+        if len(xs) == 0:
+            return 0
+        if self._pattern == 'spread':
+            centers = np.full(len(xs), DOWN)
+        elif self._pattern == 'spiral':
+            centers = np.full(len(xs), self._phase)
+            self._phase = (self._phase + EMITTER_TURN) % EMITTER_DIRECTIONS
+        else:
+            angles = np.arctan2(targetY - ys, targetX - xs)
+            centers = np.round(angles * (EMITTER_DIRECTIONS / (2 * np.pi)))
+            centers = centers.astype(int)
+        index = (centers[:, None] + self._offsets) % EMITTER_DIRECTIONS
+        count = len(self._offsets)
+        store.spawnMany(np.repeat(xs, count), np.repeat(ys, count), \
+        DIRECTION_VX[index].ravel(), DIRECTION_VY[index].ravel())
+        return index.size
+
+    def snapshot(self):
+        """
+        Returns the state of the emitter as an immutable (time, phase) pair.
+        """
+        return (self._time, self._phase)
+
+    def restore(self, state):
+        """
+        Puts the emitter back in the state returned by snapshot.
+
+        Parameter state: the state to restore
+        Precondition: state is a (time, phase) pair from an emitter with the
+        same pattern
+        """
+        self._time, self._phase = state
@@ -0,0 +1,187 @@
+"""
+Environment module for Alien Invaders
+
+This module wraps the simulation kernel in an environment for agents, with
+the usual reset(seed) and step(action) -> (obs, reward, done, info) API.
+
+Each environment allocates its observation once.  Every call to reset and
+step fills the same arrays in place and returns the same dict, so a training
+loop running for millions of steps allocates nothing per step.  Agents that
+keep an observation across steps must copy it.
+
+The observation is a dict of NumPy arrays:
+
+    alive     bool (rows, cols)      which aliens are alive (row 0 at bottom)
+    offset    float64 (2,)           the formation offset (dx, dy)
+    ship      float64 (3,)           ship x, 1.0 if the ship is alive, lives
+    bolts     float64 (ENV_BOLTS, 5) x, y, vx, vy and 1.0 for a player bolt
+    boltMask  bool (ENV_BOLTS,)      which rows of bolts hold a bolt
+
+Like sim.py, this module never touches Kivy.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+from consts import *
+from sim import *
+import numpy as np
+
+
+class WaveEnv(object):
+    """
+    A class presenting one wave of Alien Invaders as an environment.
+
+    An action is an int combining ACTION_LEFT, ACTION_RIGHT and ACTION_FIRE
+    with |.  Each step is one FIXED_STEP update of a WaveSim.  The reward of
+    a step is ENV_KILL_REWARD for every alien destroyed plus ENV_LIFE_REWARD
+    for every life lost.  A destroyed ship is put back on the next step, as
+    if the player continued at once.  The episode is done when the wave is
+    won or lost.
+
+    Only the first ENV_BOLTS bolts on screen are observed.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _sim: the wave being played
+    # Invariant: _sim is a WaveSim, or None before the first reset
+    #
+    # Attribute _rows: the number of rows of aliens in every wave
+    # Invariant: _rows is an int in 1..FORMATION_LIMIT
+    #
+    # Attribute _cols: the number of aliens in each row in every wave
+    # Invariant: _cols is an int in 1..FORMATION_LIMIT
+    #
+    # Attribute _pattern: the bullet pattern of every wave
+    # Invariant: _pattern is one of PATTERNS in emitters.py, or None
+    #
+    # Attribute _obs: the observation, filled in place
+    # Invariant: _obs is a dict of arrays as described in the module
+    #
+    # Attribute _info: the extra information of a step, filled in place
+    # Invariant: _info is a dict with keys 'seed', 'lives', 'count', 'won'
+    #
+    # Attribute _shown: the number of rows of _obs['bolts'] in use
+    # Invariant: _shown is an int in 0..ENV_BOLTS
+    #
+    # Attribute _count: the number of living aliens after the last step
+    # Invariant: _count is an int >= 0
+    #
+    # Attribute _lives: the number of lives after the last step
+    # Invariant: _lives is an int >= 0
+
+    # GETTERS AND SETTERS
+    def getObservation(self):
+        """
+        Returns the observation dict, as filled by the last reset or step.
+        """
+        return self._obs
+
+    def getSim(self):
+        """
+        Returns the WaveSim being played (None before the first reset).
+        """
+        return self._sim
+
+    # INITIALIZER
+    def __init__(self, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW, pattern=None):
+        """
+        Initializes an environment, allocating its observation.
+
+        reset must be called before the first step.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int in 1..FORMATION_LIMIT
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int in 1..FORMATION_LIMIT
+
+        Parameter pattern: the bullet pattern the aliens fire
+        Precondition: pattern is one of PATTERNS in emitters.py, or None for
+        the original alien fire
+        """
+        assert isinstance(rows, int) and 1 <= rows <= FORMATION_LIMIT
+        assert isinstance(cols, int) and 1 <= cols <= FORMATION_LIMIT
+        assert pattern is None or pattern in PATTERNS
+        self._sim = None
+        self._rows = rows
+        self._cols = cols
+        self._pattern = pattern
+        self._obs = {'alive': np.zeros((rows, cols), dtype=bool), \
+        'offset': np.zeros(2), 'ship': np.zeros(3), \
+        'bolts': np.zeros((ENV_BOLTS, 5)), \
+        'boltMask': np.zeros(ENV_BOLTS, dtype=bool)}
+        self._info = {'seed': None, 'lives': 0, 'count': 0, 'won': None}
+        self._shown = 0
+        self._count = 0
+        self._lives = 0
+
+    # METHODS
+    def reset(self, seed=None):
+        """
+        Starts a new wave and returns its first observation.
+
+        Parameter seed: the seed of the wave
+        Precondition: seed is an int, or None to pick one at random
+        """
+        self._sim = WaveSim(seed, self._pattern, self._rows, self._cols)
+        self._count = self._sim.getCount()
+        self._lives = self._sim.getLives()
+        self._info['seed'] = self._sim.getSeed()
+        np.copyto(self._obs['alive'], self._sim.getFormation().getAlive())
+        self.observe()
+        return self._obs
+
+    def step(self, action):
+        """
+        Advances the wave by one update, and returns (obs, reward, done,
+        info).
+
+        Parameter action: the player actions for this update
+        Precondition: action is an int combining ACTION values with |, and
+        the last step did not return done
+        """
+        sim = self._sim
+        assert sim != None and sim.getOutcome() == None
+        if not sim.isShipAlive():
+            sim.respawnShip()
+        sim.step(int(action), FIXED_STEP)
+        count = sim.getCount()
+        lives = sim.getLives()
+        reward = ENV_KILL_REWARD * (self._count - count) + \
+        ENV_LIFE_REWARD * (self._lives - lives)
+        if count != self._count:
+            np.copyto(self._obs['alive'], sim.getFormation().getAlive())
+        self._count = count
+        self._lives = lives
+        self.observe()
+        return (self._obs, reward, sim.getOutcome() != None, self._info)
+
+    def observe(self):
+        """
+        Fills the observation and info with the state of the wave.
+
+        The alive grid is not filled here, as it only changes on a kill.
+        """
+        sim = self._sim
+        obs = self._obs
+        obs['offset'][:] = sim.getFormation().getOffset()
+        ship = obs['ship']
+        ship[0] = sim.getShipX()
+        ship[1] = sim.isShipAlive()
+        ship[2] = sim.getLives()
+        store = sim.getBolts()
+        shown = min(store.getCount(), ENV_BOLTS)
+        bolts = obs['bolts']
+        bolts[:shown, 0] = store.getX()[:shown]
+        bolts[:shown, 1] = store.getY()[:shown]
+        bolts[:shown, 2] = store.getVelocityX()[:shown]
+        bolts[:shown, 3] = store.getVelocity()[:shown]
+        bolts[:shown, 4] = store.getPlayer()[:shown]
+        if shown < self._shown:
+            bolts[shown:self._shown] = 0.0
+        obs['boltMask'][:shown] = True
+        obs['boltMask'][shown:self._shown] = False
+        self._shown = shown
+        info = self._info
+        info['lives'] = self._lives
+        info['count'] = self._count
+        info['won'] = sim.getOutcome()
@@ -0,0 +1,147 @@
+"""
+Event module for Alien Invaders
+
+This module contains the event bus that the simulation kernel uses to tell
+the rest of the game what happened in an update: aliens killed, the ship hit,
+bolts fired, the formation dropping, barriers damaged, and the wave being won
+or lost.
+
+Events are queued as they happen, and handed to the subscribers together
+when the update is over, so a subscriber is called at most once per update
+for each kind of event it listens to.  Like sim.py, this module never
+touches Kivy.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+from consts import *
+from collections import namedtuple
+
+
+class Event(namedtuple('Event', ['kind', 'value'])):
+    """
+    An immutable record of something that happened in an update.
+
+    Attribute kind: what happened
+    Invariant: kind is one of the EVENT constants in consts.py
+
+    Attribute value: the details, which depend on kind
+    Invariant: value is (row, col) for EVENT_ALIEN_KILLED, the lives left
+    for EVENT_SHIP_HIT, True (player) or False (alien) for EVENT_BOLT_FIRED,
+    the bottom edge of the formation for EVENT_FORMATION_DROPPED, the barrier
+    and changed rectangle (index, left, bottom, right, top) for
+    EVENT_BARRIER_HIT, and None for EVENT_WAVE_WON and EVENT_WAVE_LOST
+    """
+    __slots__ = ()
+
+
+class EventBus(object):
+    """
+    A class queueing events and dispatching them to subscribers in bulk.
+
+    A subscriber is a function taking a list of Events.  It subscribes to
+    one kind of event, or to every kind (with kind None).  When dispatch is
+    called, each subscriber is called once with the list of queued events it
+    listens to, if there are any.  Kinds are dispatched in the order of
+    their EVENT constants, then the subscribers to every kind are called.
+
+    Events of a kind nobody listens to are not queued at all.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _subscribers: the subscribers to each kind of event
+    # Invariant: _subscribers is a dict mapping EVENT constants to nonempty
+    # lists of functions
+    #
+    # Attribute _everything: the subscribers to every kind of event
+    # Invariant: _everything is a list of functions
+    #
+    # Attribute _queue: the events posted since the last dispatch
+    # Invariant: _queue is a list of Event objects
+
+    # GETTERS AND SETTERS
+    def getPending(self):
+        """
+        Returns the number of events waiting to be dispatched.
+        """
+        return len(self._queue)
+
+    # INITIALIZER
+    def __init__(self):
+        """
+        Initializes a bus with no subscribers and no events.
+        """
+        self._subscribers = {}
+        self._everything = []
+        self._queue = []
+
+    # METHODS
+    def subscribe(self, kind, subscriber):
+        """
+        Adds a subscriber to one kind of event, or to every kind.
+
+        Parameter kind: the kind of event to listen to
+        Precondition: kind is an EVENT constant, or None for every kind
+
+        Parameter subscriber: the function to call with the events
+        Precondition: subscriber is a function taking a list of Events
+        """
+        assert callable(subscriber)
+        if kind == None:
+            self._everything.append(subscriber)
+        else:
+            self._subscribers.setdefault(kind, []).append(subscriber)
+
+    def unsubscribe(self, kind, subscriber):
+        """
+        Removes a subscriber added with subscribe.
+
+        Parameter kind: the kind the subscriber listens to
+        Precondition: kind is an EVENT constant, or None for every kind
+
+        Parameter subscriber: the function to remove
+        Precondition: subscriber was subscribed to kind
+        """
+        if kind == None:
+            self._everything.remove(subscriber)
+        else:
+            self._subscribers[kind].remove(subscriber)
+            if len(self._subscribers[kind]) == 0:
+                del self._subscribers[kind]
+
+    def post(self, kind, value=None):
+        """
+        Queues an event for the next dispatch.
+
+        Parameter kind: what happened
+        Precondition: kind is an EVENT constant
+
+        Parameter value: the details of the event (see Event)
+        Precondition: value matches kind
+        """
+        if kind in self._subscribers or self._everything:
+            self._queue.append(Event(kind, value))
+
+    def dispatch(self):
+        """
+        Hands every queued event to its subscribers, and empties the queue.
+
+        Events posted by a subscriber are kept for the next dispatch.
+        """
+        if len(self._queue) == 0:
+            return
+        events = self._queue
+        self._queue = []
+        kinds = {}
+        for event in events:
+            kinds.setdefault(event.kind, []).append(event)
+        for kind in sorted(kinds):
+            for subscriber in tuple(self._subscribers.get(kind, ())):
+                subscriber(kinds[kind])
+        for subscriber in tuple(self._everything):
+            subscriber(events)
+
+    def clear(self):
+        """
+        Drops every queued event without dispatching it.
+        """
+        self._queue = []
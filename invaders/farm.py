@@ -0,0 +1,470 @@
+"""
+Simulation farm module for Alien Invaders
+
+This module plays many seeded headless waves across a pool of processes and
+prints summary statistics: the win rate, and the distributions of wave
+duration and of bolts fired.  To run a farm, type
+
+    python invaders/farm.py [rows perrow speed] --games 1000 --policy random
+
+The optional rows, aliens per row and alien speed come first, as they do for
+the game itself (see consts.py).  Game i is played by a WaveSim seeded with
+first+i, and the policy draws its own random numbers from the same seed, so
+every game can be played again on its own.
+
+With --rates, the farm instead plays every game once at each of the given
+update rates (in updates per second), with a policy that acts at the same
+game times at every rate, and reports the games that did not end the same:
+
+    python invaders/farm.py --games 200 --rates 30 60 240
+
+Games are handed to the workers in chunks of seeds.  Each worker folds the
+results of a chunk into a Summary and sends only that back, and the parent
+merges the summaries as they arrive, so no per-game record is ever kept.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+
+def parseArgs(argv):
+    """
+    Returns the options of a farm, parsed from the list argv.
+
+    Parameter argv: the command line arguments, without the script name
+    Precondition: argv is a list of str
+    """
+    parser = argparse.ArgumentParser(description='Play seeded headless ' + \
+    'waves of Alien Invaders and summarize them.')
+    parser.add_argument('config', nargs='*', \
+    help='rows, aliens per row and alien speed (read by consts.py)')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--first', type=int, default=0, \
+    help='the seed of the first game')
+    # The keys of POLICIES, which is only defined once consts is imported
+    parser.add_argument('--policy', choices=('random', 'scripted'), \
+    default='random')
+    parser.add_argument('--workers', type=int, default=None, \
+    help='the number of processes (default: one per core)')
+    parser.add_argument('--chunk', type=int, default=16, \
+    help='the number of games per task')
+    parser.add_argument('--rates', type=int, nargs='+', default=None, \
+    help='compare the timed policy at these updates per second instead')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    # This must happen before consts is imported.  consts.py reads the game
+    # settings from sys.argv by position, so only the rows, aliens per row
+    # and alien speed may be left there, not the options of the farm.
+    ARGS = parseArgs(sys.argv[1:])
+    sys.argv = sys.argv[:1] + ARGS.config
+
+from consts import *
+from sim import *
+import numpy as np
+
+
+class Summary(object):
+    """
+    A class holding the statistics of a set of games.
+
+    Durations are counted in whole seconds of game time, and bolts fired in
+    single bolts, as histograms.  Two summaries are combined with merge, so
+    summaries of separate chunks of games can be added up in any order.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _games: the number of games
+    # Invariant: _games is an int >= 0
+    #
+    # Attribute _wins: the number of games won
+    # Invariant: _wins is an int in 0.._games
+    #
+    # Attribute _ticks: the total number of updates over every game
+    # Invariant: _ticks is an int >= 0
+    #
+    # Attribute _duration: the number of games lasting each whole second
+    # Invariant: _duration is an int64 array; its entries add up to _games
+    #
+    # Attribute _fired: the number of games firing each number of bolts
+    # Invariant: _fired is an int64 array; its entries add up to _games
+
+    # GETTERS AND SETTERS
+    def getGames(self):
+        """
+        Returns the number of games in the summary.
+        """
+        return self._games
+
+    def getWins(self):
+        """
+        Returns the number of games won.
+        """
+        return self._wins
+
+    def getTicks(self):
+        """
+        Returns the total number of updates over every game.
+        """
+        return self._ticks
+
+    # INITIALIZER
+    def __init__(self):
+        """
+        Initializes a summary of no games.
+        """
+        self._games = 0
+        self._wins = 0
+        self._ticks = 0
+        self._duration = np.zeros(1, dtype=np.int64)
+        self._fired = np.zeros(1, dtype=np.int64)
+
+    # METHODS
+    def add(self, won, ticks, fired):
+        """
+        Adds the result of one game to the summary.
+
+        Parameter won: whether the game was won
+        Precondition: won is a bool
+
+        Parameter ticks: the number of FIXED_STEP updates the game lasted
+        Precondition: ticks is an int >= 0
+
+        Parameter fired: the number of bolts the player fired
+        Precondition: fired is an int >= 0
+        """
+        self._games += 1
+        self._wins += int(won)
+        self._ticks += ticks
+        self._duration = count(self._duration, int(ticks * FIXED_STEP))
+        self._fired = count(self._fired, fired)
+
+    def merge(self, other):
+        """
+        Adds every game of another summary to this one.
+
+        Parameter other: the summary to add
+        Precondition: other is a Summary
+        """
+        assert isinstance(other, Summary)
+        self._games += other._games
+        self._wins += other._wins
+        self._ticks += other._ticks
+        self._duration = combine(self._duration, other._duration)
+        self._fired = combine(self._fired, other._fired)
+
+    def report(self):
+        """
+        Returns a multi-line str describing the summary.
+        """
+        if self._games == 0:
+            return 'No games played'
+        lines = ['Games:      %d' % self._games, \
+        'Win rate:   %.3f' % (self._wins / self._games), \
+        'Duration:   ' + describe(self._duration, 's'), \
+        'Bolts:      ' + describe(self._fired, '')]
+        return '\n'.join(lines)
+
+
+def count(histogram, value):
+    """
+    Returns histogram with one more entry for value, enlarged if needed.
+
+    Parameter histogram: the histogram to add to
+    Precondition: histogram is an int64 array
+
+    Parameter value: the value to count
+    Precondition: value is an int >= 0
+    """
+    if value >= len(histogram):
+        histogram = combine(histogram, np.zeros(value + 1, dtype=np.int64))
+    histogram[value] += 1
+    return histogram
+
+
+def combine(first, second):
+    """
+    Returns the sum of two histograms of possibly different lengths.
+
+    Parameter first: a histogram
+    Precondition: first is an int64 array
+
+    Parameter second: a histogram
+    Precondition: second is an int64 array
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    result = first.copy()
+    result[:len(second)] += second
+    return result
+
+
+def describe(histogram, unit):
+    """
+    Returns a one-line str with the mean, percentiles and range of a
+    histogram.
+
+    Parameter histogram: the histogram to describe
+    Precondition: histogram is a nonzero int64 array
+
+    Parameter unit: the unit to put after each value
+    Precondition: unit is a str
+    """
+    values = np.arange(len(histogram))
+    total = histogram.sum()
+    mean = (values * histogram).sum() / total
+    cumulative = np.cumsum(histogram)
+    seen = np.nonzero(histogram)[0]
+    parts = ['mean %.1f%s' % (mean, unit)]
+    for p in (10, 50, 90):
+        value = int(np.searchsorted(cumulative, total * p / 100))
+        parts.append('p%d %d%s' % (p, value, unit))
+    parts.append('range %d%s..%d%s' % (seen[0], unit, seen[-1], unit))
+    return ', '.join(parts)
+
+
+# POLICIES
+def randomPolicy(sim, rng):
+    """
+    Returns a random action: left, right or still, and fire 30% of the time.
+
+    Parameter sim: the wave being played
+    Precondition: sim is a WaveSim
+
+    Parameter rng: the random generator of the policy
+    Precondition: rng is a random.Random
+    """
+    action = rng.choice((ACTION_LEFT, ACTION_RIGHT, ACTION_NONE))
+    if rng.random() < 0.3:
+        action |= ACTION_FIRE
+    return action
+
+
+def scriptedPolicy(sim, rng):
+    """
+    Returns the action moving the ship under the nearest shooting alien,
+    firing whenever it is close enough to hit it.
+
+    Parameter sim: the wave being played
+    Precondition: sim is a WaveSim
+
+    Parameter rng: the random generator of the policy (unused)
+    Precondition: rng is a random.Random
+    """
+    formation = sim.getFormation()
+    shipX = sim.getShipX()
+    target = None
+    for index in range(formation.countShooters()):
+        x = formation.getPosition(*formation.getShooter(index))[0]
+        if target == None or abs(x - shipX) < abs(target - shipX):
+            target = x
+    if target == None:
+        return ACTION_NONE
+    if abs(target - shipX) < formation.getAlienSize()[0]/2:
+        return ACTION_FIRE
+    return ACTION_RIGHT if target > shipX else ACTION_LEFT
+
+
+# The policies that a farm can use, by name
+POLICIES = {'random': randomPolicy, 'scripted': scriptedPolicy}
+
+
+def playGame(seed, policy):
+    """
+    Plays one wave to the end, and returns (won, ticks, fired).
+
+    The wave is updated in FIXED_STEP ticks.  A destroyed ship is put back
+    on the next tick, as if the player continued at once.
+
+    Parameter seed: the seed of the wave and of the policy
+    Precondition: seed is an int
+
+    Parameter policy: the function choosing the action of each tick
+    Precondition: policy is a function taking a WaveSim and a random.Random
+    """
+    sim = WaveSim(seed)
+    rng = random.Random(seed)
+    ticks = 0
+    while sim.getOutcome() == None:
+        if not sim.isShipAlive():
+            sim.respawnShip()
+        sim.step(policy(sim, rng), FIXED_STEP)
+        ticks += 1
+    return (sim.getOutcome(), ticks, sim.getShotsFired())
+
+
+def playTimed(seed, rate, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW):
+    """
+    Plays one wave to the end at rate updates per second, and returns
+    (won, fired, lives, count) at the end.
+
+    Every TIMED_PERIOD seconds of game time, the timed policy picks a move
+    (left, right or still) from a generator seeded with seed, and fires once.
+    The move is held until the next pick.  A destroyed ship is put back at
+    the next pick too.  As everything the policy does happens at the same
+    game times at every rate, a wave that plays out the same whatever the
+    update rate returns the same result.
+
+    Parameter seed: the seed of the wave and of the policy
+    Precondition: seed is an int
+
+    Parameter rate: the number of updates per second
+    Precondition: rate is an int > 0, and TIMED_PERIOD * rate is a whole
+    number
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int in 1..FORMATION_LIMIT
+
+    Parameter cols: the number of aliens in each row
+    Precondition: cols is an int in 1..FORMATION_LIMIT
+    """
+    period = round(TIMED_PERIOD * rate)
+    assert period > 0 and abs(period - TIMED_PERIOD * rate) < 1e-6
+    sim = WaveSim(seed, None, rows, cols)
+    rng = random.Random(seed)
+    move = ACTION_NONE
+    ticks = 0
+    while sim.getOutcome() == None:
+        action = move
+        if ticks % period == 0:
+            if not sim.isShipAlive():
+                sim.respawnShip()
+            move = rng.choice((ACTION_LEFT, ACTION_RIGHT, ACTION_NONE))
+            action = move | ACTION_FIRE
+        sim.step(action, 1/rate)
+        ticks += 1
+    return (sim.getOutcome(), sim.getShotsFired(), sim.getLives(), \
+    sim.getCount())
+
+
+def compareChunk(task):
+    """
+    Plays a chunk of seeds at every rate, and returns the list of seeds whose
+    results differ between rates.
+
+    This is the function run by the workers of compareRates.
+
+    Parameter task: the first seed, the seed after the last and the rates
+    Precondition: task is a tuple (int, int, tuple of ints)
+    """
+    start, stop, rates = task
+    differ = []
+    for seed in range(start, stop):
+        if len(set(playTimed(seed, rate) for rate in rates)) > 1:
+            differ.append(seed)
+    return differ
+
+
+def playChunk(task):
+    """
+    Plays a chunk of seeds and returns their Summary.
+
+    This is the function run by the workers.
+
+    Parameter task: the first seed, the seed after the last and the policy
+    Precondition: task is a tuple (int, int, str), the str a key of POLICIES
+    """
+    start, stop, name = task
+    policy = POLICIES[name]
+    summary = Summary()
+    for seed in range(start, stop):
+        summary.add(*playGame(seed, policy))
+    return summary
+
+
+def farm(games, first=0, policy='random', workers=None, chunk=16):
+    """
+    Plays games seeded first..first+games-1 over a pool of processes, and
+    returns the merged Summary.
+
+    Parameter games: the number of games to play
+    Precondition: games is an int >= 0
+
+    Parameter first: the seed of the first game
+    Precondition: first is an int
+
+    Parameter policy: the name of the policy
+    Precondition: policy is a key of POLICIES
+
+    Parameter workers: the number of processes
+    Precondition: workers is an int > 0, or None for one per core
+
+    Parameter chunk: the number of games per task sent to a worker
+    Precondition: chunk is an int > 0
+    """
+    assert policy in POLICIES
+    tasks = [(seed, min(seed + chunk, first + games), policy) \
+    for seed in range(first, first + games, chunk)]
+    summary = Summary()
+    with multiprocessing.Pool(workers) as pool:
+        for part in pool.imap_unordered(playChunk, tasks):
+            summary.merge(part)
+    return summary
+
+
+def compareRates(games, rates, first=0, workers=None, chunk=16):
+    """
+    Plays games seeded first..first+games-1 at each rate over a pool of
+    processes, and returns the sorted list of seeds whose results differ.
+
+    Parameter games: the number of games to play
+    Precondition: games is an int >= 0
+
+    Parameter rates: the update rates to compare
+    Precondition: rates is a nonempty tuple of rates valid for playTimed
+
+    Parameter first: the seed of the first game
+    Precondition: first is an int
+
+    Parameter workers: the number of processes
+    Precondition: workers is an int > 0, or None for one per core
+
+    Parameter chunk: the number of games per task sent to a worker
+    Precondition: chunk is an int > 0
+    """
+    tasks = [(seed, min(seed + chunk, first + games), rates) \
+    for seed in range(first, first + games, chunk)]
+    differ = []
+    with multiprocessing.Pool(workers) as pool:
+        for part in pool.imap_unordered(compareChunk, tasks):
+            differ.extend(part)
+    return sorted(differ)
+
+
+def main(args):
+    """
+    Runs a farm with the command line options and prints its summary.
+
+    Parameter args: the options of the farm
+    Precondition: args was returned by parseArgs
+    """
+    assert args.policy in POLICIES
+    start = time.perf_counter()
+    if args.rates != None:
+        differ = compareRates(args.games, tuple(args.rates), args.first, \
+        args.workers, args.chunk)
+        print('Rates:      ' + ', '.join('%d Hz' % r for r in args.rates))
+        print('Same:       %d of %d games' % (args.games - len(differ), \
+        args.games))
+        if len(differ) > 0:
+            print('Differ:     ' + ' '.join(str(s) for s in differ[:20]))
+        print('Elapsed:    %.1fs' % (time.perf_counter() - start))
+        sys.exit(1 if len(differ) > 0 else 0)
+    summary = farm(args.games, args.first, args.policy, args.workers, \
+    args.chunk)
+    elapsed = time.perf_counter() - start
+    print('Formation:  %d x %d, alien speed %s' % \
+    (ALIEN_ROWS, ALIENS_IN_ROW, ALIEN_SPEED))
+    print(summary.report())
+    print('Elapsed:    %.1fs (%.0f ticks per second)' % \
+    (elapsed, summary.getTicks() / max(elapsed, 1e-9)))
+
+
+# Application code
+if __name__ == '__main__':
+    main(ARGS)
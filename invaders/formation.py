@@ -0,0 +1,591 @@
+"""
+Formation module for Alien Invaders
+
+This module contains the alien formation used by the simulation kernel.  The
+formation is stored as a structure of arrays: the home x coordinate of every
+column, the home y coordinate of every row, and the alive mask and image type
+of every alien, indexed by (row, column). Row 0 is the bottom row.
+
+Every alien moves together, so a march step or a drop only changes the
+formation offset.  The left-most and right-most living columns and the lowest
+living row are kept up to date as aliens are killed, which makes the edge and
+defense line tests constant time.  Like sim.py, this module never touches Kivy.
+
+A formation too large to fit the screen at full size is scaled down, aliens,
+gaps and walking distances alike (see getScale).  Nothing in a formation costs
+more than a vectorized pass over its cells, so formations of 100x100 aliens
+and more can be played.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+from consts import *
+from collections import namedtuple
+import numpy as np
+import math
+
+
+class FormationState(namedtuple('FormationState', \
+['cells', 'offX', 'offY', 'floor'])):
+    """
+    An immutable snapshot of a Formation, made by Formation.snapshot.
+
+    Attribute cells: which aliens are alive, and the indices kept from that
+    Invariant: cells is a tuple (alive, colCount, rowCount, count, left,
+    right, lowest, bottom, shooters, slot), where the first three are the
+    bytes of the matching arrays, and the last three are tuples
+
+    Attribute offX: the horizontal formation offset
+    Invariant: offX is a float
+
+    Attribute offY: the vertical formation offset
+    Invariant: offY is a float
+
+    Attribute floor: the bottom edge of the lowest living alien
+    Invariant: floor is a float, or None if every alien is dead
+    """
+    __slots__ = ()
+
+
+class Formation(object):
+    """
+    A class representing the grid of aliens in a wave.
+
+    Every cell in the grid has a position, an alive flag and a type (the
+    index of its image in ALIEN_IMAGES).  The position of the alien at
+    (row, col) is the home position of that cell plus the formation offset.
+    Dead aliens keep their cell, but they are ignored by every query.
+
+    The arrays returned by the getters are owned by the formation and must
+    not be modified.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _colX: the home x coordinate of the center of each column
+    # Invariant: _colX is a float64 array of shape (cols,), evenly spaced
+    # _pitchX apart
+    #
+    # Attribute _rowY: the home y coordinate of the center of each row
+    # Invariant: _rowY is a float64 array of shape (rows,), evenly spaced
+    # _pitchY apart
+    #
+    # Attribute _pitchX: the distance between the centers of two columns
+    # Invariant: _pitchX is a float > 0
+    #
+    # Attribute _pitchY: the distance between the centers of two rows
+    # Invariant: _pitchY is a float > 0
+    #
+    # Attribute _scale: how much the formation is shrunk to fit the screen
+    # Invariant: _scale is a float in (0, 1]
+    #
+    # Attribute _width: the width of an alien
+    # Invariant: _width is ALIEN_WIDTH * _scale
+    #
+    # Attribute _height: the height of an alien
+    # Invariant: _height is ALIEN_HEIGHT * _scale
+    #
+    # Attribute _offX: how far the formation has marched from home
+    # Invariant: _offX is a float
+    #
+    # Attribute _offY: how far the formation has moved up from home
+    # Invariant: _offY is a float (<= 0, as aliens only drop)
+    #
+    # Attribute _alive: which aliens are still alive
+    # Invariant: _alive is a bool array of shape (rows, cols)
+    #
+    # Attribute _types: the image index of each alien
+    # Invariant: _types is an int array of shape (rows, cols), with values in
+    # 0..len(ALIEN_IMAGES)-1
+    #
+    # Attribute _colCount: the number of living aliens in each column
+    # Invariant: _colCount is an int array of shape (cols,) matching _alive
+    #
+    # Attribute _rowCount: the number of living aliens in each row
+    # Invariant: _rowCount is an int array of shape (rows,) matching _alive
+    #
+    # Attribute _left: the left-most column with a living alien
+    # Invariant: _left is an int; _left > _right if every alien is dead
+    #
+    # Attribute _right: the right-most column with a living alien
+    # Invariant: _right is an int; _left > _right if every alien is dead
+    #
+    # Attribute _count: the number of living aliens
+    # Invariant: _count is an int >= 0 matching _alive
+    #
+    # Attribute _lowest: the lowest row with a living alien
+    # Invariant: _lowest is an int; it is rows if every alien is dead
+    #
+    # Attribute _floor: the bottom edge of the lowest living alien
+    # Invariant: _floor is a float, or None if every alien is dead
+    #
+    # Attribute _bottom: the bottom-most living row of each column
+    # Invariant: _bottom is a list of ints of length cols; the entry is rows
+    # for a column with no living aliens
+    #
+    # Attribute _shooters: the columns that still have a living alien
+    # Invariant: _shooters is a list of distinct ints in 0..cols-1, in no
+    # particular order
+    #
+    # Attribute _slot: the position of each column in _shooters
+    # Invariant: _slot is a list of ints of length cols, with
+    # _shooters[_slot[c]] == c for every c in _shooters
+    #
+    # Attribute _cells: the cells of the last snapshot, if still current
+    # Invariant: _cells is a tuple as in FormationState, or None if an alien
+    # was killed since the last snapshot
+
+    # GETTERS AND SETTERS
+    def getRows(self):
+        """
+        Returns the number of rows in the formation.
+        """
+        return self._alive.shape[0]
+
+    def getCols(self):
+        """
+        Returns the number of aliens in each row of the formation.
+        """
+        return self._alive.shape[1]
+
+    def getCount(self):
+        """
+        Returns the number of living aliens.
+        """
+        return self._count
+
+    def getScale(self):
+        """
+        Returns how much the formation is shrunk to fit the screen.
+
+        Every alien distance (ALIEN_WIDTH, ALIEN_HEIGHT, the separations and
+        the walking distances) is multiplied by the scale.  It is 1.0 unless
+        the formation has more than ALIEN_ROWS_FIT rows or ALIENS_IN_ROW_FIT
+        aliens in a row.
+        """
+        return self._scale
+
+    def getAlienSize(self):
+        """
+        Returns the (width, height) of an alien in this formation.
+        """
+        return (self._width, self._height)
+
+    def getOffset(self):
+        """
+        Returns the formation offset from its home position as (dx, dy).
+        """
+        return (self._offX, self._offY)
+
+    def getX(self):
+        """
+        Returns a read-only (rows, cols) array of alien x coordinates.
+        """
+        return np.broadcast_to(self._colX + self._offX, self._alive.shape)
+
+    def getY(self):
+        """
+        Returns a read-only (rows, cols) array of alien y coordinates.
+        """
+        return np.broadcast_to((self._rowY + self._offY)[:, None], \
+        self._alive.shape)
+
+    def getAlive(self):
+        """
+        Returns the alive mask of the formation.
+        """
+        return self._alive
+
+    def getTypes(self):
+        """
+        Returns the array of alien image indices.
+        """
+        return self._types
+
+    def getPosition(self, row, col):
+        """
+        Returns the center (x, y) of the alien at (row, col) as floats.
+
+        Parameter row: the row of the alien (0 is the bottom row)
+        Precondition: row is an int in 0..getRows()-1
+
+        Parameter col: the column of the alien
+        Precondition: col is an int in 0..getCols()-1
+        """
+        return (float(self._colX[col]) + self._offX, \
+        float(self._rowY[row]) + self._offY)
+
+    def isAlive(self, row, col):
+        """
+        Returns True if the alien at (row, col) is alive.
+
+        Parameter row: the row of the alien (0 is the bottom row)
+        Precondition: row is an int in 0..getRows()-1
+
+        Parameter col: the column of the alien
+        Precondition: col is an int in 0..getCols()-1
+        """
+        return bool(self._alive[row, col])
+
+    def getLiving(self):
+        """
+        Returns the rows and columns of the living aliens as two lists.
+
+        The cells are listed in row-major order, bottom row first.
+        """
+        rows, cols = np.nonzero(self._alive)
+        return rows.tolist(), cols.tolist()
+
+    # INITIALIZER
+    def __init__(self, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW):
+        """
+        Initializes a full formation laid out as in the original game.
+
+        The top row sits ALIEN_CEILING below the top of the screen, aliens are
+        ALIEN_H_SEP and ALIEN_V_SEP apart, and every two rows share an image,
+        cycling through ALIEN_IMAGES from the bottom.  A formation with more
+        than ALIEN_ROWS_FIT rows or ALIENS_IN_ROW_FIT aliens per row has every
+        alien distance scaled down, so that it is no wider and no taller than
+        a formation of that size.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int > 0
+        """
+        assert isinstance(rows, int) and rows > 0
+        assert isinstance(cols, int) and cols > 0
+        scale = min(1.0, span(ALIENS_IN_ROW_FIT + 1, ALIEN_WIDTH, ALIEN_H_SEP) \
+        / span(cols + 1, ALIEN_WIDTH, ALIEN_H_SEP), \
+        span(ALIEN_ROWS_FIT, ALIEN_HEIGHT, ALIEN_V_SEP) \
+        / span(rows, ALIEN_HEIGHT, ALIEN_V_SEP))
+        self._scale = scale
+        self._width = ALIEN_WIDTH * scale
+        self._height = ALIEN_HEIGHT * scale
+        bottom = GAME_HEIGHT - ALIEN_CEILING - (rows - 0.5) * self._height \
+        - ALIEN_V_SEP * scale * (rows - 1)
+        left = ALIEN_H_SEP * scale + 1/2 * self._width
+        self._pitchX = float(ALIEN_H_SEP * scale + self._width)
+        self._pitchY = float(ALIEN_V_SEP * scale + self._height)
+        self._colX = left + self._pitchX * np.arange(1, cols + 1, dtype=np.float64)
+        self._rowY = bottom + self._pitchY * np.arange(rows, dtype=np.float64)
+        self._offX = 0.0
+        self._offY = 0.0
+        self._alive = np.ones((rows, cols), dtype=bool)
+        rowtypes = (np.arange(rows) // 2) % len(ALIEN_IMAGES)
+        self._types = np.repeat(rowtypes[:, None], cols, axis=1)
+        self._colCount = np.full(cols, rows, dtype=np.int64)
+        self._rowCount = np.full(rows, cols, dtype=np.int64)
+        self._left = 0
+        self._right = cols - 1
+        self._count = rows * cols
+        self._lowest = 0
+        self._floor = float(self._rowY[0]) - self._height/2
+        self._bottom = [0] * cols
+        self._shooters = list(range(cols))
+        self._slot = list(range(cols))
+        self._cells = None
+
+    # MOVEMENT
+    def march(self, dx):
+        """
+        Moves every alien dx pixels horizontally.
+
+        Parameter dx: the number of pixels to move (positive is right)
+        Precondition: dx is an int or float
+        """
+        self._offX += dx
+
+    def drop(self, dy):
+        """
+        Moves every alien dy pixels down.
+
+        Parameter dy: the number of pixels to move down
+        Precondition: dy is an int or float
+        """
+        self._offY -= dy
+        if self._floor != None:
+            self._floor -= dy
+
+    def kill(self, row, col):
+        """
+        Marks the living alien at (row, col) as dead.
+
+        If this empties a column (or row) at the edge of the formation, the
+        tracked extents move inward past every empty column (or row).  If the
+        alien was the bottom of its column, the column index moves up to the
+        next living alien, and an emptied column stops being a shooter.
+
+        Parameter row: the row of the alien (0 is the bottom row)
+        Precondition: row is an int in 0..getRows()-1, and the alien at
+        (row, col) is alive
+
+        Parameter col: the column of the alien
+        Precondition: col is an int in 0..getCols()-1
+        """
+        assert self._alive[row, col]
+        self._alive[row, col] = False
+        self._cells = None
+        self._count -= 1
+        self._colCount[col] -= 1
+        self._rowCount[row] -= 1
+        if row == self._bottom[col]:
+            rows = self._alive.shape[0]
+            bottom = row + 1
+            while bottom < rows and not self._alive[bottom, col]:
+                bottom += 1
+            self._bottom[col] = bottom
+        if self._colCount[col] == 0:
+            self.removeShooter(col)
+            while self._left <= self._right and self._colCount[self._left] == 0:
+                self._left += 1
+            while self._right >= self._left and self._colCount[self._right] == 0:
+                self._right -= 1
+        if self._rowCount[row] == 0:
+            rows = self._alive.shape[0]
+            while self._lowest < rows and self._rowCount[self._lowest] == 0:
+                self._lowest += 1
+            if self._lowest < rows:
+                self._floor = float(self._rowY[self._lowest]) + self._offY \
+                - self._height/2
+            else:
+                self._floor = None
+
+    # STATE CAPTURE
+    def snapshot(self):
+        """
+        Returns an immutable FormationState of this formation.
+
+        Marching and dropping only change the offset, so the alive cells are
+        only copied again after an alien is killed.  Between kills, a snapshot
+        costs no more than building a small tuple.
+        """
+        if self._cells == None:
+            self._cells = (self._alive.tobytes(), self._colCount.tobytes(), \
+            self._rowCount.tobytes(), self._count, self._left, self._right, \
+            self._lowest, tuple(self._bottom), tuple(self._shooters), \
+            tuple(self._slot))
+        return FormationState(self._cells, self._offX, self._offY, \
+        self._floor)
+
+    def restore(self, state):
+        """
+        Puts this formation back in the state captured by snapshot.
+
+        The arrays are overwritten in place; nothing is reallocated.
+
+        Parameter state: the state to restore
+        Precondition: state is a FormationState taken from a formation with
+        the same number of rows and columns
+        """
+        assert isinstance(state, FormationState)
+        alive, colCount, rowCount, count, left, right, lowest, bottom, \
+        shooters, slot = state.cells
+        assert len(alive) == self._alive.size
+        self._alive.flat[:] = np.frombuffer(alive, dtype=bool)
+        self._colCount[:] = np.frombuffer(colCount, dtype=np.int64)
+        self._rowCount[:] = np.frombuffer(rowCount, dtype=np.int64)
+        self._count = count
+        self._left = left
+        self._right = right
+        self._lowest = lowest
+        self._bottom = list(bottom)
+        self._shooters = list(shooters)
+        self._slot = list(slot)
+        self._cells = state.cells
+        self._offX = state.offX
+        self._offY = state.offY
+        self._floor = state.floor
+
+    # QUERIES
+    def isEmpty(self):
+        """
+        Returns True if every alien is dead.
+        """
+        return self._count == 0
+
+    def atEdge(self, low, high):
+        """
+        Returns True if a living alien has x <= low or x >= high.
+
+        Only the left-most and right-most living columns are checked.
+
+        Parameter low: the left-most allowed center
+        Precondition: low is an int or float
+
+        Parameter high: the right-most allowed center
+        Precondition: high is an int or float
+        """
+        if self.isEmpty():
+            return False
+        return self._colX[self._left] + self._offX <= low or \
+        self._colX[self._right] + self._offX >= high
+
+    def getBottom(self):
+        """
+        Returns the y coordinate of the bottom edge of the lowest living
+        alien, or None if every alien is dead.
+        """
+        return self._floor
+
+    def isBelow(self, line):
+        """
+        Returns True if the bottom edge of a living alien is below line.
+
+        Parameter line: the y coordinate to test against
+        Precondition: line is an int or float
+        """
+        bottom = self.getBottom()
+        return bottom != None and bottom < line
+
+    def countShooters(self):
+        """
+        Returns the number of columns that still have a living alien.
+        """
+        return len(self._shooters)
+
+    def getShooter(self, index):
+        """
+        Returns (row, col) of the bottom-most living alien of a column.
+
+        The column is chosen by its position in the (unordered) list of
+        non-empty columns, so a random shooter is getShooter(k) for a
+        random k in 0..countShooters()-1.
+
+        Parameter index: the position of the column among non-empty columns
+        Precondition: index is an int in 0..countShooters()-1
+        """
+        col = self._shooters[index]
+        return (self._bottom[col], col)
+
+    def getShooterPositions(self):
+        """
+        Returns the centers of every shooting alien as two arrays (xs, ys).
+
+        There is one shooter per column with a living alien: the bottom-most
+        living alien of that column.
+        """
+        cols = np.array(self._shooters, dtype=int)
+        rows = np.array(self._bottom, dtype=int)[cols]
+        return (self._colX[cols] + self._offX, self._rowY[rows] + self._offY)
+
+    def removeShooter(self, col):
+        """
+        Removes an emptied column from the list of shooters.
+
+        The last shooter is swapped into the vacated position, so removal
+        takes constant time.
+
+        Parameter col: the column to remove
+        Precondition: col is a column in the list of shooters
+        """
+        index = self._slot[col]
+        last = self._shooters.pop()
+        if last != col:
+            self._shooters[index] = last
+            self._slot[last] = index
+
+    def sweepCells(self, x0, y0, x1, y1, width, height):
+        """
+        Returns a list of (t, (row, col)) for every living alien that a box
+        moving in a straight line runs into, in row-major order.
+
+        The time t is the fraction of the move done when the box first
+        overlaps the alien (0 if it starts overlapping).  The formation is a
+        regular lattice, so the rows and columns under the bounding box of
+        the whole move are worked out arithmetically, and clamped to the
+        living extents.  Only those cells are checked.  Each row and column
+        is a slab, so the entry and exit times are computed once per row and
+        once per column.
+
+        Parameter x0: the x coordinate of the center of the box at the start
+        Precondition: x0 is an int or float
+
+        Parameter y0: the y coordinate of the center of the box at the start
+        Precondition: y0 is an int or float
+
+        Parameter x1: the x coordinate of the center of the box at the end
+        Precondition: x1 is an int or float
+
+        Parameter y1: the y coordinate of the center of the box at the end
+        Precondition: y1 is an int or float
+
+        Parameter width: the width of the box
+        Precondition: width is a number >= 0
+
+        Parameter height: the height of the box
+        Precondition: height is a number >= 0
+        """
+        if self._count == 0:
+            return []
+        reachX = (self._width + width)/2
+        reachY = (self._height + height)/2
+        baseX = float(self._colX[0]) + self._offX
+        baseY = float(self._rowY[0]) + self._offY
+        cmin = max(math.floor((min(x0, x1) - baseX - reachX)/self._pitchX) \
+        + 1, self._left)
+        cmax = min(math.ceil((max(x0, x1) - baseX + reachX)/self._pitchX) \
+        - 1, self._right)
+        rmin = max(math.floor((min(y0, y1) - baseY - reachY)/self._pitchY) \
+        + 1, self._lowest)
+        rmax = min(math.ceil((max(y0, y1) - baseY + reachY)/self._pitchY) \
+        - 1, self._alive.shape[0] - 1)
+        if cmin > cmax:
+            return []
+        slabsX = [slab(x0, x1 - x0, baseX + self._pitchX * col, reachX) \
+        for col in range(cmin, cmax + 1)]
+        cells = []
+        for row in range(rmin, rmax + 1):
+            enterY, leaveY = slab(y0, y1 - y0, baseY + self._pitchY * row, \
+            reachY)
+            for col in range(cmin, cmax + 1):
+                if self._alive[row, col]:
+                    enterX, leaveX = slabsX[col - cmin]
+                    enter = max(enterX, enterY, 0.0)
+                    if enter < min(leaveX, leaveY, 1.0):
+                        cells.append((enter, (row, col)))
+        return cells
+
+
+def span(count, size, gap):
+    """
+    Returns the length of a line of count aliens of the given size, gap apart.
+
+    Parameter count: the number of aliens
+    Precondition: count is an int > 0
+
+    Parameter size: the size of an alien along the line
+    Precondition: size is a number > 0
+
+    Parameter gap: the space between two aliens
+    Precondition: gap is a number >= 0
+    """
+    return count * size + (count - 1) * gap
+
+
+def slab(start, delta, center, reach):
+    """
+    Returns the (enter, leave) times at which a point moving along one axis
+    is within reach of center.
+
+    Time 0 is the start of the move and time 1 is the end.  A point that does
+    not move is within reach always (-inf, inf) or never (inf, -inf).
+
+    Parameter start: the position of the point at time 0
+    Precondition: start is an int or float
+
+    Parameter delta: how far the point moves from time 0 to time 1
+    Precondition: delta is an int or float
+
+    Parameter center: the center of the slab
+    Precondition: center is an int or float
+
+    Parameter reach: half the width of the slab
+    Precondition: reach is a number > 0
+    """
+    if delta == 0:
+        if abs(start - center) < reach:
+            return (-math.inf, math.inf)
+        return (math.inf, -math.inf)
+    low = (center - reach - start)/delta
+    high = (center + reach - start)/delta
+    return (low, high) if delta > 0 else (high, low)
@@ -49,6 +49,9 @@ class GameApp(kivy.app.App):
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
     
+    # Class attribute for tracking filmstrip frames (shared by every sprite)
+    FRAME_CACHE = {}
+    
     
     # MUTABLE ATTRIBUTES
     @property
@@ -220,6 +223,46 @@ class GameApp(kivy.app.App):
         
         return texture
     
+    @classmethod
+    def load_frames(cls,name,format):
+        """
+        Returns: The frames of the filmstrip for the given file name, or None if it cannot be loaded
+        
+        The filmstrip is the texture :meth:`load_texture` returns for ``name``, divided
+        into a grid of ``format`` (rows, columns) frames.  The result is a list of texture 
+        regions, with the frames arranged left-to-right, top-to-bottom.  The regions are 
+        only computed once for each name and format.  Every later call (and so every 
+        :class:`GSprite` with the same source and format) shares the same list, which 
+        must not be modified.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param format: The grid size of the filmstrip
+        :type format:  2-element tuple of ints > 0
+        """
+        key = (name,tuple(format))
+        if key in cls.FRAME_CACHE:
+            return cls.FRAME_CACHE[key]
+        
+        texture = cls.load_texture(name)
+        if not texture:
+            return None
+        
+        width  = texture.width/format[1]
+        height = texture.height/format[0]
+        frames = []
+        ty = 0
+        for row in range(format[0]):
+            tx = 0
+            for col in range(format[1]):
+                frames.append(texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height)))
+                tx += width
+            ty += height
+        
+        cls.FRAME_CACHE[key] = frames
+        return frames
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -233,6 +276,8 @@ class GameApp(kivy.app.App):
         :type name:  ``str``
         """
         assert type(name) == str, '%s is not a valid texture name' % repr(name)
+        for key in [key for key in cls.FRAME_CACHE if key[0] == name]:
+            del cls.FRAME_CACHE[key]
         if name in cls.TEXTURE_CACHE:
             texture = cls.TEXTURE_CACHE[name]
             del cls.TEXTURE_CACHE[name]
@@ -27,6 +27,11 @@ class GSprite(GRectangle):
     2d grid and are arranged left-to-right, top-to-bottom.  By specifying the frame,
     you can control what image is displayed inside of this rectangle.
     
+    The frames are only cut out of the image once for each source and format (see
+    :meth:`GameApp.load_frames`), and are shared by every sprite with that filmstrip.
+    Changing the frame just swaps the texture of the rectangle that draws the sprite,
+    so animating many sprites at once is cheap.
+    
     If the attributes ``width`` and ``height`` do not agree with the actual size of a
     single frame, the image is scaled to fit.Furthermore, if you define ``fillcolor``, 
     this object will tint your image by the given color.`
@@ -84,6 +89,8 @@ class GSprite(GRectangle):
         
         if self.frame >= count:
             self.frame = 0
+        if self._defined:
+            self._reset()
     
     @property
     def frame(self):
@@ -153,20 +160,11 @@ class GSprite(GRectangle):
         # Texture must load FIRST
         texture = GameApp.load_texture(self.source)
         if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += height
+            self._images = GameApp.load_frames(self.source,self._format)
             if not self._set_width:
-                self.width = width
+                self.width  = texture.width/self._format[1]
             if not self._set_height:
-                self.height = height
+                self.height = texture.height/self._format[0]
         else:
             print('Failed to load',repr(self.source))
         
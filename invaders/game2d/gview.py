@@ -124,6 +124,32 @@ class GInput(object):
         """
         return tuple(k for (k,v) in self._keystate.items() if v)
 
+    @property
+    def pressed_keys(self):
+        """
+        The list of keys that were just pressed.
+
+        These are the keys for which :meth:`is_key_pressed` is True this animation frame.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a list of strings (possibly empty)
+        """
+        return tuple(self._keypress.keys())
+
+    @property
+    def released_keys(self):
+        """
+        The list of keys that were just released.
+
+        These are the keys for which :meth:`is_key_released` is True this animation frame.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a list of strings (possibly empty)
+        """
+        return tuple(self._keyrelease.keys())
+
 
     # BUILT-IN METHODS
     def __init__(self):
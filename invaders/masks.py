@@ -0,0 +1,165 @@
+"""
+Mask module for Alien Invaders
+
+This module contains the pixel masks used for pixel-perfect collisions.  A
+mask is a bool array with one entry per pixel of an image (row 0 at the
+bottom), which is True where the pixel is opaque enough to be hit.
+
+Images are decoded once per process.  Their pixels are kept in IMAGE_CACHE
+and their masks in MASK_CACHE, keyed by file name just like the textures in
+GameApp.TEXTURE_CACHE.  A collision test uses bounding boxes first, and only
+the boxes that overlap are tested against the masks, with sweepMasks.  Like
+sim.py, this module never touches Kivy.
+
+Images are decoded with Pillow, which is only imported when the first image
+is read.  Importing this module (or sim.py) does not need it.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+from consts import *
+from bolts import *
+import numpy as np
+import os.path
+
+# The RGBA pixels of each image read so far, by file name (see readImage)
+IMAGE_CACHE = {}
+
+# The masks made so far, by file name or tuple of file names (see loadMask)
+MASK_CACHE = {}
+
+
+def readImage(source):
+    """
+    Returns the RGBA pixels of an image, as a uint8 array of shape
+    (height, width, 4) with row 0 at the bottom.
+
+    The image is only read once; later calls return the same array, which
+    must not be modified.
+
+    Parameter source: the image file, in the folder Images
+    Precondition: source is a string naming an image file
+    """
+    if not source in IMAGE_CACHE:
+        from PIL import Image
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), \
+        'Images', source)
+        pixels = np.array(Image.open(path).convert('RGBA'))[::-1]
+        IMAGE_CACHE[source] = np.ascontiguousarray(pixels)
+    return IMAGE_CACHE[source]
+
+
+def loadMask(sources):
+    """
+    Returns the mask of an image, or the masks of several images stacked.
+
+    A pixel is solid if its alpha is at least MASK_ALPHA.  Each mask is only
+    made once; later calls return the same array, which must not be modified.
+
+    Parameter sources: the image file(s), in the folder Images
+    Precondition: sources is a string naming an image file, or a tuple of
+    such strings naming images of the same size
+    """
+    if not sources in MASK_CACHE:
+        if isinstance(sources, tuple):
+            MASK_CACHE[sources] = np.stack([loadMask(source) \
+            for source in sources])
+        else:
+            MASK_CACHE[sources] = readImage(sources)[:, :, 3] >= MASK_ALPHA
+    return MASK_CACHE[sources]
+
+
+def sweepMasks(masks, index, lefts, bottoms, pixel, sx, sy, dx, dy, width, \
+height):
+    """
+    Returns the arrays (times, cols, rows) of where moving boxes first touch
+    a solid pixel of a mask.
+
+    Each entry k is a pair of a box and a mask.  The box is centered at
+    (sx[k], sy[k]) at time 0 and moves by (dx[k], dy[k]) by time 1.  The mask
+    is masks[index[k]], with its bottom left corner at (lefts[k], bottoms[k])
+    and each pixel pixel units wide.  The box first touches the solid pixel
+    (cols[k], rows[k]) at time times[k], which is infinite (and the pixel
+    meaningless) if it touches none.
+
+    Every pixel under the bounding box of the move is tested exactly, all
+    pairs at once, with slabs (see bolts.py) for its row and its column.
+    When several pixels are touched at the same time, the one nearest the
+    path of the center of the box is picked.
+
+    Parameter masks: the masks
+    Precondition: masks is a bool array of shape (count, rows, cols)
+
+    Parameter index: the mask of each pair
+    Precondition: index is an int array with values in 0..count-1
+
+    Parameter lefts: the x coordinate of the left edge of each mask
+    Precondition: lefts is a float array the same length as index
+
+    Parameter bottoms: the y coordinate of the bottom edge of each mask
+    Precondition: bottoms is a float array the same length as index
+
+    Parameter pixel: the width and height of a pixel of a mask
+    Precondition: pixel is a number > 0
+
+    Parameter sx: the x coordinate of the center of each box at time 0
+    Precondition: sx is a float array the same length as index
+
+    Parameter sy: the y coordinate of the center of each box at time 0
+    Precondition: sy is a float array the same length as index
+
+    Parameter dx: how far each box moves right
+    Precondition: dx is a float array the same length as index
+
+    Parameter dy: how far each box moves up
+    Precondition: dy is a float array the same length as index
+
+    Parameter width: the width of every box
+    Precondition: width is a number > 0
+
+    Parameter height: the height of every box
+    Precondition: height is a number > 0
+    """
+    high, wide = masks.shape[1:]
+    # Everything from here is in the pixels of the mask of each pair
+    sx = (sx - lefts) / pixel
+    sy = (sy - bottoms) / pixel
+    dx = dx / pixel
+    dy = dy / pixel
+    reachX = width / (2 * pixel)
+    reachY = height / (2 * pixel)
+    col0 = np.maximum(np.floor(np.minimum(sx, sx + dx) - reachX), 0)
+    col1 = np.minimum(np.ceil(np.maximum(sx, sx + dx) + reachX), wide)
+    row0 = np.maximum(np.floor(np.minimum(sy, sy + dy) - reachY), 0)
+    row1 = np.minimum(np.ceil(np.maximum(sy, sy + dy) + reachY), high)
+    cols = col0.astype(int)[:, None] + \
+    np.arange(max(int((col1 - col0).max()), 1))
+    rows = row0.astype(int)[:, None] + \
+    np.arange(max(int((row1 - row0).max()), 1))
+    inCol = cols < col1[:, None]
+    inRow = rows < row1[:, None]
+    np.minimum(cols, wide - 1, out=cols)
+    np.minimum(rows, high - 1, out=rows)
+    cells = (index * high)[:, None] + rows
+    solid = masks.reshape(-1, wide)[cells[:, :, None], cols[:, None, :]] & \
+    inRow[:, :, None] & inCol[:, None, :]
+    # Each column and each row of pixels is a slab, and the box touches a
+    # pixel once it is inside both slabs
+    enterX, leaveX = slabs(sx[:, None], dx[:, None], cols + 0.5, reachX + 0.5)
+    enterY, leaveY = slabs(sy[:, None], dy[:, None], rows + 0.5, reachY + 0.5)
+    enter = np.maximum(np.maximum(enterX[:, None, :], enterY[:, :, None]), \
+    0.0)
+    leave = np.minimum(np.minimum(leaveX[:, None, :], leaveY[:, :, None]), \
+    1.0)
+    enter = np.where(solid & (enter < leave), enter, np.inf)
+    enter = enter.reshape(len(index), -1)
+    times = enter.min(axis=1)
+    # Of the pixels touched first, pick the one nearest the path of the center
+    aside = np.abs(((rows + 0.5 - sy[:, None]) * dx[:, None])[:, :, None] - \
+    ((cols + 0.5 - sx[:, None]) * dy[:, None])[:, None, :])
+    aside = np.where(enter == times[:, None], aside.reshape(len(index), -1), \
+    np.inf)
+    first = np.argmin(aside, axis=1)
+    pairs = np.arange(len(index))
+    return (times, cols[pairs, first % cols.shape[1]], \
+    rows[pairs, first // cols.shape[1]])
@@ -22,11 +22,21 @@ You are free to add even more models to this module.  You may wish to do this
 when you add new features to your game, such as power-ups.  If you are unsure
 about whether to make a new class or not, please ask on Piazza.
 
+The rules for moving the ship and for collisions live in the simulation
+kernel (sim.py). The classes here are only used to draw that state.
+
 # YOUR NAME(S) AND NETID(S) HERE: Jonathan Wang (jyw38) and Derek Wang (dkw48)
 # DATE COMPLETED HERE: 12/11/2023
 """
 from consts import *
 from game2d import *
+# BoltField, BarrierField and AlienField draw with Kivy instructions, as the
+# game2d classes do, since no game2d class can draw a mesh or a texture made
+# while the game runs.  Kivy is a library, like game2d, not a module of this
+# game, so this is not an exception to the rule below.
+from kivy.graphics import Mesh, PopMatrix, Rectangle
+from kivy.graphics.texture import Texture
+import numpy as np
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other
 # than consts.py.  If you need extra information from Gameplay, then it should
@@ -34,7 +44,7 @@ from game2d import *
 # calls the method.
 
 
-class Ship(GImage):
+class Ship(GSprite):
     """
     A class to represent the game ship.
 
@@ -56,6 +66,9 @@ class Ship(GImage):
     However, there is no need for any more attributes other than those
     inherited by GImage. You would only add attributes if you needed them
     for extra gameplay features (like animation).
+
+    The ship is drawn with the filmstrip SHIP_STRIP, whose frames are shared
+    with every other sprite of that filmstrip.  Frame 0 is the ship at rest.
     """
     #  IF YOU ADD ATTRIBUTES, LIST THEM BELOW
 
@@ -64,7 +77,7 @@ class Ship(GImage):
     # need
     # INITIALIZER TO CREATE A NEW SHIP
     def __init__(self,x=GAME_WIDTH/2,y=SHIP_BOTTOM + 1/2*SHIP_HEIGHT, \
-    source=SHIP_IMAGE):
+    source=SHIP_STRIP):
         """Initilizes a ship at the specified coordinates, dimensions, and
         source image
 
@@ -82,57 +95,22 @@ class Ship(GImage):
         Precondition: y a an int or float  1/2 SHIP_HEIGHT and
         DEFENSE_LINE - 1/2 SHIP_HEIGHT
 
-        Parameter: an image to be used to represent the Ship image
-        Precondition: source is a GImage object
+        Parameter: the filmstrip to be used to represent the Ship image
+        Precondition: source is a string naming an image with SHIP_FORMAT
+        frames
         """
         super().__init__(x=x, y=y, width=SHIP_WIDTH, height=SHIP_HEIGHT, \
-        source=source)
+        source=source, format=SHIP_FORMAT)
         assert (x >= 1/2 * SHIP_WIDTH) and (x <= GAME_WIDTH - 1/2 *SHIP_HEIGHT)
         assert (y >= 1/2 * SHIP_HEIGHT) and \
         (y <= DEFENSE_LINE - 1/2 *SHIP_HEIGHT)
 
-    # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
-    def shipCollides(self,bolt):
-        """
-        Returns True if the player bolt collides with this alien
-
-        This method returns False if bolt was not fired by the player.
-
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
-        """
-        assert isinstance(bolt, Bolt)
-        if self.contains((bolt.left, bolt.top)) or \
-        self.contains((bolt.right, bolt.top)) or \
-        self.contains((bolt.left, bolt.bottom)) or \
-        self.contains((bolt.right, bolt.bottom)):
-            if bolt.isPlayerBolt() == False:
-                return True
-            else:
-                return False
-
-
-    def moveShip(self,input):
-        """
-        Changes the x value of the Ship so that it moves left and right
-
-        Precondition: input is a GInput Object
-        """
-        da = 0
-        if input.is_key_down('left'):
-            da = da - SHIP_MOVEMENT
-        if input.is_key_down('right'):
-            da = da + SHIP_MOVEMENT
-        current = self.x + da
-        current = max(current, SHIP_WIDTH/2)
-        current = min(current, GAME_WIDTH - SHIP_WIDTH/2)
-        self.x = current
     # COROUTINE METHOD TO ANIMATE THE SHIP
 
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 
-class Alien(GImage):
+class Alien(GSprite):
     """
     A class to represent a single alien.
 
@@ -149,6 +127,10 @@ class Alien(GImage):
     However, there is no need for any more attributes other than those
     inherited by GImage. You would only add attributes if you needed them
     for extra gameplay features (like giving each alien a score value).
+
+    An alien is drawn with one of ALIEN_STRIPS, and marches through its first
+    ALIEN_MARCH_FRAMES frames.  As the frames are shared by every alien with
+    the same filmstrip, setting the frame only swaps the texture drawn.
     """
     #  IF YOU ADD ATTRIBUTES, LIST THEM BELOW
     # HIDDEN ATTRIBUTES
@@ -169,36 +151,16 @@ class Alien(GImage):
         Parameters: y is the y coordinate of the center of the Alein
         Precondition: y is a float or int within the gameboard
 
-        Parameters: source is a GInput
-        Precondition: source is a GInput Object
+        Parameters: source is the filmstrip of the alien
+        Precondition: source is a string naming an image with ALIEN_FORMAT
+        frames
 
         Parameter: width is the number of pixels the ship is wide
         Precondition: width is a positive integer
 
         """
         super().__init__(x=x, y=y, width=ALIEN_WIDTH, height=ALIEN_HEIGHT, \
-        source=source)
-
-
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def alienCollides(self,bolt):
-        """
-        Returns True if the player bolt collides with this alien
-
-        This method returns False if bolt was not fired by the player.
-
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
-        """
-        assert isinstance(bolt, Bolt)
-        if self.contains((bolt.left, bolt.top)) or \
-        self.contains((bolt.right, bolt.top)) or \
-        self.contains((bolt.left, bolt.bottom)) or \
-        self.contains((bolt.right, bolt.bottom)):
-            if bolt.isPlayerBolt() == True:
-                return True
-            else:
-                return False
+        source=source, format=ALIEN_FORMAT)
 
 
 class Bolt(GRectangle):
@@ -224,8 +186,11 @@ class Bolt(GRectangle):
     allows Wave to do this on its own, so this method is not required.
     """
     # INSTANCE ATTRIBUTES:
-    # Attribute: _velocity: the velocity in y direction
+    # Attribute: _velocity: the velocity in y direction, in pixels per second
     # Invariant: _velocity is an int or float
+    # (A Bolt only draws a bolt of the kernel.  The kernel moves its bolts,
+    # with both velocities, in its BoltStore, and a Bolt is only used for
+    # bolts that move straight up or down: pattern bolts go to BoltField.)
 
     # Attribute: _isPLayerBolt: whether a bolt is shot from the player
     # Invariant: _isPLayerBolt is a boolean
@@ -314,7 +279,468 @@ class Bolt(GRectangle):
         self._isPlayerBolt = isPlayerBolt
 
 
+    def reuse(self, x, y, isPlayerBolt):
+        """
+        Resets this bolt so that it can be fired again.
+
+        The position, owner, velocity and color are reset in place. The Kivy
+        instructions of the bolt are kept, so reusing a bolt allocates
+        nothing.
+
+        Parameter x: the x coordinate of the center of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the center of the bolt
+        Precondition: y is an int or float
+
+        Parameter isPlayerBolt: whether the player fired the bolt
+        Precondition: isPlayerBolt is a bool
+        """
+        assert isinstance(isPlayerBolt, bool)
+        self.x = x
+        self.y = y
+        if isPlayerBolt != self._isPlayerBolt:
+            self._isPlayerBolt = isPlayerBolt
+            color = BLUE_COLOR if isPlayerBolt else RED_COLOR
+            self._fillcolor.rgba = color.glColor()
+        self.setVelocity(BOLT_SPEED)
+
+
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 
 # IF YOU NEED ADDITIONAL MODEL CLASSES, THEY GO HERE
+class BoltField(GObject):
+    """
+    A class drawing many alien bolts at once.
+
+    A bullet-hell wave can have thousands of bolts on screen, far too many to
+    draw as one Bolt each.  A BoltField draws them all as the triangles of a
+    single Kivy Mesh, whose corners are computed from the bolt positions
+    with NumPy.  The field itself does not move.
+
+    Kivy indexes a mesh with 16-bit numbers, so at most MESH_QUADS bolts are
+    drawn; any more are left out.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _mesh: the mesh holding two triangles per bolt
+    # Invariant: _mesh is a Kivy Mesh
+    #
+    # Attribute _vertices: the (x, y, u, v) of each corner of each bolt
+    # Invariant: _vertices is a float array of shape (capacity, 4, 4)
+    #
+    # Attribute _count: the number of bolts in the mesh
+    # Invariant: _count is an int in 0..MESH_QUADS
+
+    # GETTERS AND SETTERS
+    def getCount(self):
+        """
+        Returns the number of bolts drawn.
+        """
+        return self._count
+
+    # INITIALIZER
+    def __init__(self, fillcolor = RED_COLOR):
+        """
+        Initializes a field with no bolts.
+
+        Parameter fillcolor: the color of the bolts
+        Precondition: fillcolor is an RGB Object (DEFAULT IS RED_COLOR)
+        """
+        super().__init__(fillcolor = fillcolor, linecolor = None)
+        self._mesh = Mesh(mode = 'triangles')
+        self._vertices = np.zeros((0, 4, 4))
+        self._count = 0
+        self._reset()
+        self._defined = True
+
+    # METHODS
+    def setBolts(self, xs, ys):
+        """
+        Replaces the bolts in the field.
+
+        The mesh indices are only rebuilt when the number of bolts changes.
+
+        Parameter xs: the x coordinate of the center of each bolt
+        Precondition: xs is a float array
+
+        Parameter ys: the y coordinate of the center of each bolt
+        Precondition: ys is a float array the same length as xs
+        """
+        n = min(len(xs), MESH_QUADS)
+        if n > len(self._vertices):
+            self._vertices = np.zeros((max(n, 2 * len(self._vertices)), 4, 4))
+            self._vertices[:, :, 2:] = [[0, 0], [1, 0], [1, 1], [0, 1]]
+        corners = self._vertices[:n]
+        left = xs[:n] - BOLT_WIDTH/2
+        bottom = ys[:n] - BOLT_HEIGHT/2
+        corners[:, 0, 0] = corners[:, 3, 0] = left
+        corners[:, 1, 0] = corners[:, 2, 0] = left + BOLT_WIDTH
+        corners[:, 0, 1] = corners[:, 1, 1] = bottom
+        corners[:, 2, 1] = corners[:, 3, 1] = bottom + BOLT_HEIGHT
+        self._mesh.vertices = corners.ravel().tolist()
+        if n != self._count:
+            quads = 4 * np.arange(n)[:, None] + [0, 1, 2, 2, 3, 0]
+            self._mesh.indices = quads.ravel().tolist()
+            self._count = n
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._cache.add(self._fillcolor)
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
+
+
+class BarrierField(GObject):
+    """
+    A class drawing the destructible barriers of a wave.
+
+    Each barrier is a Kivy Rectangle with a texture of its own, made from the
+    pixels of the barrier image with the destroyed pixels cleared.  When a
+    crater is blasted, only the rectangle of pixels it changed is written
+    to the texture (with blit_buffer), so a hit costs the same however large
+    the barrier is.  The field itself does not move.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _pixels: the RGBA pixels of an undamaged barrier
+    # Invariant: _pixels is a uint8 array of shape (height, width, 4), row 0
+    # at the bottom
+    #
+    # Attribute _textures: the texture of each barrier
+    # Invariant: _textures is a list of Kivy Textures of size (width, height)
+    #
+    # Attribute _rects: the rectangle drawing each barrier
+    # Invariant: _rects is a list of Kivy Rectangles, one per texture
+
+    # INITIALIZER
+    def __init__(self, lefts, bottoms, pixels, masks):
+        """
+        Initializes a field drawing the barriers as they are in masks.
+
+        Parameter lefts: the x coordinate of the left edge of each barrier
+        Precondition: lefts is a float array
+
+        Parameter bottoms: the y coordinate of the bottom edge of each barrier
+        Precondition: bottoms is a float array the same length as lefts
+
+        Parameter pixels: the RGBA pixels of an undamaged barrier
+        Precondition: pixels is a uint8 array of shape (height, width, 4),
+        row 0 at the bottom
+
+        Parameter masks: which pixels of each barrier are left
+        Precondition: masks is a bool array of shape (len(lefts), height,
+        width)
+        """
+        super().__init__(fillcolor = 'white', linecolor = None)
+        self._pixels = pixels
+        height, width = pixels.shape[:2]
+        self._textures = []
+        self._rects = []
+        for left, bottom in zip(lefts.tolist(), bottoms.tolist()):
+            texture = Texture.create(size = (width, height), colorfmt = 'rgba')
+            texture.mag_filter = 'nearest'
+            self._textures.append(texture)
+            self._rects.append(Rectangle(texture = texture, \
+            pos = (left, bottom), size = (width, height)))
+        self.setBarriers(masks)
+        self._reset()
+        self._defined = True
+
+    # METHODS
+    def setBarriers(self, masks):
+        """
+        Redraws every barrier in full.
+
+        Parameter masks: which pixels of each barrier are left
+        Precondition: masks is a bool array of shape (count, height, width)
+        """
+        height, width = self._pixels.shape[:2]
+        for index in range(len(self._textures)):
+            self.setRegion(index, masks[index], 0, 0, width, height)
+
+    def setRegion(self, index, mask, left, bottom, right, top):
+        """
+        Redraws one rectangle of pixels of a barrier.
+
+        The rectangle is in pixels of the barrier, right and top exclusive.
+
+        Parameter index: the barrier
+        Precondition: index is an int in 0..count-1
+
+        Parameter mask: which pixels of the barrier are left
+        Precondition: mask is a bool array of shape (height, width)
+
+        Parameter left: the first column of the rectangle
+        Precondition: left is an int in 0..right-1
+
+        Parameter bottom: the first row of the rectangle
+        Precondition: bottom is an int in 0..top-1
+
+        Parameter right: the column after the rectangle
+        Precondition: right is an int in left+1..width
+
+        Parameter top: the row after the rectangle
+        Precondition: top is an int in bottom+1..height
+        """
+        region = self._pixels[bottom:top, left:right].copy()
+        region[:, :, 3] *= mask[bottom:top, left:right]
+        self._textures[index].blit_buffer(region.tobytes(), \
+        pos = (left, bottom), size = (right - left, top - bottom), \
+        colorfmt = 'rgba', bufferfmt = 'ubyte')
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._cache.add(self._fillcolor)
+        for rect in self._rects:
+            self._cache.add(rect)
+        self._cache.add(PopMatrix())
+
+
+class BoltPool(object):
+    """
+    A class that recycles Bolt objects.
+
+    Making a Bolt builds a full set of Kivy instructions, so the pool keeps
+    bolts that went off screen and hands them out again for the next shot.
+    The pool grows on demand. Up to BOLT_POOL_SIZE idle bolts are kept, and
+    any bolt released beyond that is left to the garbage collector.
+
+    The pool also counts how it is used: the high-water mark is the most
+    bolts ever out at once, and the reuse count is the number of shots that
+    were served by a recycled bolt.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _free: the idle bolts waiting to be reused
+    # Invariant: _free is a list of Bolt objects, of length <= _cap
+    #
+    # Attribute _cap: the most idle bolts to keep
+    # Invariant: _cap is an int >= 0
+    #
+    # Attribute _out: the number of bolts currently handed out
+    # Invariant: _out is an int >= 0
+    #
+    # Attribute _highWater: the most bolts ever handed out at once
+    # Invariant: _highWater is an int >= _out
+    #
+    # Attribute _reuses: the number of acquires served from _free
+    # Invariant: _reuses is an int >= 0
+
+    # GETTERS AND SETTERS
+    def getHighWater(self):
+        """
+        Returns the most bolts that were ever out of the pool at once.
+        """
+        return self._highWater
+
+    def getReuses(self):
+        """
+        Returns the number of bolts handed out that were recycled.
+        """
+        return self._reuses
+
+    def getOut(self):
+        """
+        Returns the number of bolts currently out of the pool.
+        """
+        return self._out
+
+    # INITIALIZER
+    def __init__(self, cap=BOLT_POOL_SIZE):
+        """
+        Initializes an empty pool.
+
+        Parameter cap: the most idle bolts to keep
+        Precondition: cap is an int >= 0
+        """
+        assert isinstance(cap, int) and cap >= 0
+        self._free = []
+        self._cap = cap
+        self._out = 0
+        self._highWater = 0
+        self._reuses = 0
+
+    # METHODS
+    def acquire(self, x, y, isPlayerBolt):
+        """
+        Returns a bolt at (x,y) for the given owner, recycling if possible.
+
+        Parameter x: the x coordinate of the center of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the center of the bolt
+        Precondition: y is an int or float
+
+        Parameter isPlayerBolt: whether the player fired the bolt
+        Precondition: isPlayerBolt is a bool
+        """
+        if self._free != []:
+            bolt = self._free.pop()
+            bolt.reuse(x, y, isPlayerBolt)
+            self._reuses += 1
+        else:
+            bolt = Bolt(x, y, isPlayerBolt = isPlayerBolt)
+        self._out += 1
+        self._highWater = max(self._highWater, self._out)
+        return bolt
+
+    def release(self, bolt):
+        """
+        Returns a bolt to the pool once it is off screen or has hit.
+
+        Parameter bolt: the bolt to release
+        Precondition: bolt is a Bolt that came from acquire, and has not
+        been released since
+        """
+        assert isinstance(bolt, Bolt)
+        self._out -= 1
+        if len(self._free) < self._cap:
+            self._free.append(bolt)
+
+
+class AlienField(GObject):
+    """
+    A class drawing a whole (scaled) formation of aliens at once.
+
+    A large formation has far too many aliens to draw as one Alien each.  An
+    AlienField draws each row of aliens as one Kivy Mesh, textured with the
+    filmstrip of that row and built with NumPy from the home positions of its
+    living aliens.  As the formation marches, only the position of the field
+    (the formation offset) changes, and when an alien dies only its row is
+    rebuilt.  A new march frame only changes the texture coordinates.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _meshes: the mesh of each row of aliens (row 0 at bottom)
+    # Invariant: _meshes is a list of Kivy Meshes, one per row
+    #
+    # Attribute _colX: the home x coordinate of the center of each column
+    # Invariant: _colX is a float array
+    #
+    # Attribute _rowY: the home y coordinate of the center of each row
+    # Invariant: _rowY is a float array with one entry per mesh
+    #
+    # Attribute _width: the width of an alien
+    # Invariant: _width is a float > 0
+    #
+    # Attribute _height: the height of an alien
+    # Invariant: _height is a float > 0
+    #
+    # Attribute _frames: the filmstrip frames of each row
+    # Invariant: _frames is a list of lists of Kivy Textures (or None if a
+    # filmstrip could not be loaded), one per mesh
+    #
+    # Attribute _frame: the frame every alien is drawn with
+    # Invariant: _frame is an int in 0..ALIEN_MARCH_FRAMES-1
+    #
+    # Attribute _corners: the vertices of each row, as last built
+    # Invariant: _corners is a list of float arrays of shape (n, 4, 4), one
+    # per mesh, where n is the number of aliens drawn in that row
+
+    # INITIALIZER
+    def __init__(self, colX, rowY, types, width, height):
+        """
+        Initializes a field with no living aliens, at offset (0, 0).
+
+        Parameter colX: the home x coordinate of the center of each column
+        Precondition: colX is a float array
+
+        Parameter rowY: the home y coordinate of the center of each row
+        Precondition: rowY is a float array
+
+        Parameter types: the index in ALIEN_STRIPS of the aliens of each row
+        Precondition: types is a list of ints, the same length as rowY
+
+        Parameter width: the width of an alien
+        Precondition: width is a number > 0
+
+        Parameter height: the height of an alien
+        Precondition: height is a number > 0
+        """
+        assert len(colX) <= MESH_QUADS
+        super().__init__(fillcolor = 'white', linecolor = None)
+        self._colX = colX
+        self._rowY = rowY
+        self._width = width
+        self._height = height
+        self._frames = [GameApp.load_frames(ALIEN_STRIPS[kind], ALIEN_FORMAT) \
+        for kind in types]
+        self._frame = 0
+        self._corners = [np.empty((0, 4, 4)) for kind in types]
+        self._meshes = [Mesh(mode = 'triangles', texture = None \
+        if frames == None else frames[0]) for frames in self._frames]
+        self._reset()
+        self._defined = True
+
+    # METHODS
+    def setRow(self, row, alive):
+        """
+        Rebuilds the mesh of one row from its living aliens.
+
+        Parameter row: the row to rebuild (0 is the bottom row)
+        Precondition: row is an int in 0..len(rowY)-1
+
+        Parameter alive: which aliens of the row are alive
+        Precondition: alive is a bool array the same length as colX
+        """
+        mesh = self._meshes[row]
+        left = self._colX[alive] - self._width/2
+        n = len(left)
+        corners = np.empty((n, 4, 4))
+        bottom = self._rowY[row] - self._height/2
+        corners[:, 0, 0] = corners[:, 3, 0] = left
+        corners[:, 1, 0] = corners[:, 2, 0] = left + self._width
+        corners[:, 0, 1] = corners[:, 1, 1] = bottom
+        corners[:, 2, 1] = corners[:, 3, 1] = bottom + self._height
+        self._corners[row] = corners
+        self._setCoords(row)
+        quads = 4 * np.arange(n)[:, None] + [0, 1, 2, 2, 3, 0]
+        mesh.indices = quads.ravel().tolist()
+
+    def setFrame(self, frame):
+        """
+        Draws every alien with the given frame of its filmstrip.
+
+        Only the texture and texture coordinates of each mesh change.
+
+        Parameter frame: the frame to draw
+        Precondition: frame is an int in 0..ALIEN_MARCH_FRAMES-1
+        """
+        if frame == self._frame:
+            return
+        self._frame = frame
+        for row in range(len(self._meshes)):
+            self._setCoords(row)
+
+    # HIDDEN METHODS
+    def _setCoords(self, row):
+        """
+        Textures the mesh of a row with the current frame.
+
+        Parameter row: the row to texture (0 is the bottom row)
+        Precondition: row is an int in 0..len(rowY)-1
+        """
+        mesh = self._meshes[row]
+        corners = self._corners[row]
+        if self._frames[row] != None:
+            mesh.texture = self._frames[row][self._frame]
+            corners[:, :, 2:] = np.reshape(mesh.texture.tex_coords, (4, 2))
+        else:
+            corners[:, :, 2:] = 0.0
+        mesh.vertices = corners.ravel().tolist()
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._cache.add(self._fillcolor)
+        for mesh in self._meshes:
+            self._cache.add(mesh)
+        self._cache.add(PopMatrix())
@@ -0,0 +1,277 @@
+"""
+Input recording module for Alien Invaders
+
+This module contains the recorder that logs the keyboard input of a game,
+one frame at a time, so that the game can be replayed later (see replay.py).
+
+A session file is a compressed NumPy archive (.npz).  For every frame it holds
+the time dt passed to Invaders.update, and three bit masks: the keys held
+down, the keys pressed and the keys released that frame.  Bit i of a mask
+stands for the i-th key name in the archive.  The archive also holds the
+command line arguments (rows, aliens per row and alien speed) that reproduce
+the waves that were played, and the seed of every wave started, with the
+frame it started in.
+
+Like sim.py, this module never touches Kivy, so sessions can be read by
+headless tools.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+import numpy as np
+
+# The largest number of different keys that a session can hold
+SESSION_KEYS = 64
+
+
+class InputRecorder(object):
+    """
+    A class that logs the key state of a GInput every frame.
+
+    Frames are kept in memory (a few bytes each) and written to the session
+    file by close.  Touches are not recorded, as the game does not use them.
+    Only the first SESSION_KEYS different keys seen are recorded.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _path: the name of the session file to write
+    # Invariant: _path is a nonempty str
+    #
+    # Attribute _argv: the command line arguments that recreate the waves
+    # Invariant: _argv is a list of str
+    #
+    # Attribute _starts: the waves started so far, in order
+    # Invariant: _starts is a list of (frame, seed) pairs of ints, where
+    # frame is the index in _frames of the frame the wave started in
+    #
+    # Attribute _keys: the key names seen so far, in order of first use
+    # Invariant: _keys is a list of at most SESSION_KEYS str
+    #
+    # Attribute _bits: the bit of each key in _keys
+    # Invariant: _bits is a dict mapping each name in _keys to 1 << its index
+    #
+    # Attribute _frames: the recorded frames
+    # Invariant: _frames is a list of (dt, down, pressed, released) tuples,
+    # where the last three are int bit masks over _keys
+
+    # GETTERS AND SETTERS
+    def getFrameCount(self):
+        """
+        Returns the number of frames recorded so far.
+        """
+        return len(self._frames)
+
+    def addWave(self, seed):
+        """
+        Records that a wave with the given seed started in the last frame
+        recorded.
+
+        Parameter seed: the seed of the wave
+        Precondition: seed is an int, and a frame was recorded
+        """
+        assert isinstance(seed, int) and len(self._frames) > 0
+        self._starts.append((len(self._frames) - 1, seed))
+
+    # INITIALIZER
+    def __init__(self, path, rows, perrow, speed):
+        """
+        Initializes a recorder with no frames.
+
+        Parameter path: the name of the session file to write
+        Precondition: path is a nonempty str
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter perrow: the number of aliens per row
+        Precondition: perrow is an int > 0
+
+        Parameter speed: the number of seconds between alien steps
+        Precondition: speed is a number (int or float) >= 0
+        """
+        assert isinstance(path, str) and path != ''
+        self._path = path
+        self._argv = [str(rows), str(perrow), str(speed)]
+        self._starts = []
+        self._keys = []
+        self._bits = {}
+        self._frames = []
+
+    # METHODS
+    def record(self, input, dt):
+        """
+        Logs the key state of input for a frame that lasted dt seconds.
+
+        This should be called from Invaders.update, before the input is used.
+        A key counts as pressed (or released) if input reports it so during
+        the update.
+
+        Parameter input: the input of the game
+        Precondition: input is a GInput
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._frames.append((dt, self.toMask(input.keys), \
+        self.toMask(input.pressed_keys), self.toMask(input.released_keys)))
+
+    def toMask(self, keys):
+        """
+        Returns the bit mask of the given key names.
+
+        Parameter keys: the key names
+        Precondition: keys is an iterable of str
+        """
+        mask = 0
+        for key in keys:
+            if not key in self._bits and len(self._keys) < SESSION_KEYS:
+                self._bits[key] = 1 << len(self._keys)
+                self._keys.append(key)
+            mask |= self._bits.get(key, 0)
+        return mask
+
+    def close(self):
+        """
+        Writes every frame recorded so far to the session file.
+        """
+        frames = np.array(self._frames, dtype=[('dt', np.float64), \
+        ('down', np.uint64), ('pressed', np.uint64), ('released', np.uint64)])
+        starts = np.array(self._starts, dtype=[('frame', np.int64), \
+        ('seed', np.int64)])
+        with open(self._path, 'wb') as file:
+            np.savez_compressed(file, dt=frames['dt'], down=frames['down'], \
+            pressed=frames['pressed'], released=frames['released'], \
+            keys=np.array(self._keys, dtype=str), \
+            argv=np.array(self._argv, dtype=str), starts=starts['frame'], \
+            seeds=starts['seed'])
+
+
+class Session(object):
+    """
+    A class holding the frames of a recorded session, read from a file.
+
+    Frame i is described by getDt()[i], and by the key names in
+    getDown(i), getPressed(i) and getReleased(i).
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _dt: the time of each frame
+    # Invariant: _dt is a list of floats
+    #
+    # Attribute _down: the keys held down in each frame
+    # Invariant: _down is a list of tuples of str, one per frame
+    #
+    # Attribute _pressed: the keys pressed in each frame
+    # Invariant: _pressed is a list of tuples of str, one per frame
+    #
+    # Attribute _released: the keys released in each frame
+    # Invariant: _released is a list of tuples of str, one per frame
+    #
+    # Attribute _argv: the command line arguments that recreate the waves
+    # Invariant: _argv is a list of str
+    #
+    # Attribute _starts: the frame each wave started in
+    # Invariant: _starts is a list of ints, in increasing order
+    #
+    # Attribute _seeds: the seed of each wave
+    # Invariant: _seeds is a list of ints, the same length as _starts
+
+    # GETTERS AND SETTERS
+    def getFrameCount(self):
+        """
+        Returns the number of frames in the session.
+        """
+        return len(self._dt)
+
+    def getDt(self):
+        """
+        Returns the list of frame times.
+        """
+        return self._dt
+
+    def getDown(self, frame):
+        """
+        Returns the names of the keys held down in the given frame.
+
+        Parameter frame: the frame number
+        Precondition: frame is an int in 0..getFrameCount()-1
+        """
+        return self._down[frame]
+
+    def getPressed(self, frame):
+        """
+        Returns the names of the keys pressed in the given frame.
+
+        Parameter frame: the frame number
+        Precondition: frame is an int in 0..getFrameCount()-1
+        """
+        return self._pressed[frame]
+
+    def getReleased(self, frame):
+        """
+        Returns the names of the keys released in the given frame.
+
+        Parameter frame: the frame number
+        Precondition: frame is an int in 0..getFrameCount()-1
+        """
+        return self._released[frame]
+
+    def getArgv(self):
+        """
+        Returns the command line arguments (rows, aliens per row and alien
+        speed) that recreate the recorded waves.
+        """
+        return list(self._argv)
+
+    def getStarts(self):
+        """
+        Returns the list of the frames the waves started in, in order.
+        """
+        return self._starts
+
+    def getSeeds(self):
+        """
+        Returns the list of the seeds of the waves, in the order they started.
+        """
+        return self._seeds
+
+    # INITIALIZER
+    def __init__(self, path):
+        """
+        Initializes a session from a file written by InputRecorder.
+
+        The masks are decoded to key names once, here, so that replaying a
+        frame costs no more than a few list lookups.
+
+        Parameter path: the name of the session file
+        Precondition: path is the name of a session file
+        """
+        with np.load(path) as data:
+            keys = data['keys'].tolist()
+            self._dt = data['dt'].tolist()
+            self._down = decodeMasks(data['down'], keys)
+            self._pressed = decodeMasks(data['pressed'], keys)
+            self._released = decodeMasks(data['released'], keys)
+            self._argv = data['argv'].tolist()
+            self._starts = data['starts'].tolist()
+            self._seeds = data['seeds'].tolist()
+
+
+def decodeMasks(masks, keys):
+    """
+    Returns the key names in each bit mask, as a list of tuples.
+
+    Repeated masks share the same tuple, as most frames repeat the last one.
+
+    Parameter masks: the bit masks
+    Precondition: masks is a NumPy array of uint64
+
+    Parameter keys: the name of the key for each bit
+    Precondition: keys is a list of str
+    """
+    decoded = {}
+    result = []
+    for mask in masks.tolist():
+        if not mask in decoded:
+            decoded[mask] = tuple(key for i, key in enumerate(keys) \
+            if mask >> i & 1)
+        result.append(decoded[mask])
+    return result
@@ -0,0 +1,125 @@
+"""
+Headless replay module for Alien Invaders
+
+This module plays a session recorded by InputRecorder (see recorder.py) back
+through Invaders.update, as fast as the CPU allows and with no visible
+window.  Nothing is drawn.  To replay a session, type
+
+    python invaders/replay.py session.npz
+
+The session stores the rows, aliens per row and alien speed it was recorded
+with.  They are put into sys.argv before consts.py is loaded.  It also stores
+the seed of every wave started, and those are handed to the game, so each
+replayed wave is the one that was played.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+import os
+import sys
+import time
+from recorder import *
+
+if __name__ == '__main__':
+    # This must happen before consts (or Kivy) is imported
+    SESSION = Session(sys.argv[1])
+    sys.argv = sys.argv[:1] + SESSION.getArgv()
+    os.environ['KIVY_NO_ARGS'] = '1'
+    from kivy.config import Config
+    Config.set('graphics', 'window_state', 'hidden')
+
+from consts import *
+from game2d import *
+from app import *
+
+
+class ReplayInput(GInput):
+    """
+    An input handler that reports the keys of a recorded session.
+
+    Each call to advance moves to the next frame of the session, and
+    returns the time of that frame.  Between calls, the usual GInput methods
+    (is_key_down, is_key_pressed, is_key_released, keys) answer as the live
+    input did during that frame.
+
+    This handler is never registered with a view, so it receives no real
+    keyboard or touch input.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _session: the session being replayed
+    # Invariant: _session is a Session object
+    #
+    # Attribute _frame: the number of the next frame to replay
+    # Invariant: _frame is an int in 0.._session.getFrameCount()
+
+    # GETTERS AND SETTERS
+    def getFrame(self):
+        """
+        Returns the number of frames replayed so far.
+        """
+        return self._frame
+
+    # INITIALIZER
+    def __init__(self, session):
+        """
+        Initializes a handler at the start of the session.
+
+        Parameter session: the session to replay
+        Precondition: session is a Session object
+        """
+        assert isinstance(session, Session)
+        GInput.__init__(self)
+        self._session = session
+        self._frame = 0
+
+    # METHODS
+    def advance(self):
+        """
+        Moves to the next frame, and returns its time (None at the end).
+        """
+        frame = self._frame
+        if frame == self._session.getFrameCount():
+            return None
+        down = self._session.getDown(frame)
+        self._keystate = dict.fromkeys(down, True)
+        self._keycount = len(down)
+        self._keypress = dict.fromkeys(self._session.getPressed(frame), True)
+        self._keyrelease = dict.fromkeys(self._session.getReleased(frame), \
+        True)
+        self._frame = frame + 1
+        return self._session.getDt()[frame]
+
+
+def replay(session):
+    """
+    Replays session through a new Invaders, and returns the game.
+
+    The game is built but never run, so Kivy opens no window and calls no
+    draw.  Every frame is passed to Invaders.update in order, exactly as
+    GameApp would have done, and a summary is printed at the end.
+
+    Parameter session: the session to replay
+    Precondition: session is a Session object
+    """
+    game = Invaders(width=GAME_WIDTH, height=GAME_HEIGHT)
+    input = ReplayInput(session)
+    game._input = input
+    game.start()
+    game.setSeeds(session.getSeeds())
+    start = time.perf_counter()
+    dt = input.advance()
+    while dt != None:
+        input._prestep()
+        game.update(dt)
+        input._poststep()
+        dt = input.advance()
+    elapsed = time.perf_counter() - start
+    frames = input.getFrame()
+    print('Replayed %d frames in %.3f seconds (%.0f frames per second)' % \
+    (frames, elapsed, frames / max(elapsed, 1e-9)))
+    return game
+
+
+# Application code
+if __name__ == '__main__':
+    replay(SESSION)
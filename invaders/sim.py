@@ -0,0 +1,728 @@
+"""
+Simulation module for Alien Invaders
+
+This module contains the simulation kernel for a single wave of Alien
+Invaders. The kernel owns the state of the ship, the aliens, the barriers and
+the laser bolts as plain data, and advances that state with the method step.  It never
+creates a game2d object, so it can be imported and stepped without Kivy or a
+game window.
+
+The subcontroller Wave (in wave.py) wraps a kernel and mirrors its state into
+game2d objects for drawing. Headless tools, such as soak tests and balancing
+runs, should use WaveSim directly.
+
+# Jonathan Wang (jyw38) and Derek Wang (dkw48)
+# 12/11/2023
+"""
+from consts import *
+from formation import *
+from bolts import *
+from events import *
+from emitters import *
+from barriers import *
+from masks import *
+from collections import namedtuple
+import heapq
+import numpy as np
+import random
+
+# PRIMARY RULE: This module may only access consts.py, formation.py, bolts.py,
+# events.py, emitters.py, barriers.py and masks.py.  It must never import
+# game2d (or anything that imports it), as that would pull in Kivy.
+
+
+class WaveState(namedtuple('WaveState', ['seed', 'shipX', 'prevShipX', \
+'shipAlive', 'lives', 'formation', 'prevOffset', 'bolts', 'time', \
+'direction', 'steps', 'fireWhen', 'playerBoltPresent', 'fired', \
+'outcome', 'random', 'emitter', 'barriers'])):
+    """
+    An immutable snapshot of a WaveSim, made by WaveSim.snapshot.
+
+    Every attribute has the value of the WaveSim attribute with the same
+    name (see WaveSim), except that formation is a FormationState, bolts is
+    a StoreState, random is the state of the random generator, emitter is
+    the state of the emitter (or None) and barriers is the bytes of the
+    barrier masks.
+    """
+    __slots__ = ()
+
+
+class WaveSim(object):
+    """
+    This class simulates a single wave of Alien Invaders without graphics.
+
+    The simulation follows the same rules as the original Wave: the ship
+    moves left and right and fires one bolt at a time, the aliens march back
+    and forth (dropping at the edges) every ALIEN_SPEED seconds, and the
+    bottom-most alien of a random column fires every 1..BOLT_RATE steps.
+
+    The simulation is advanced with the method step, which takes the player
+    actions for that step as a bit mask of ACTION_LEFT, ACTION_RIGHT and
+    ACTION_FIRE.  Everything else is read through getters, or heard about
+    through events: every step posts what happened (see events.py) and
+    dispatches it to the subscribers at the end of the step.
+
+    A wave made with a bullet pattern is a bullet-hell wave: instead of the
+    usual alien fire, every shooting alien fires that pattern from an
+    Emitter (see emitters.py), and thousands of bolts can be on screen.
+
+    Each wave draws its random numbers from its own generator, never from
+    the module random.  Two waves with the same seed and the same actions
+    play out exactly the same, even when they are stepped side by side.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _shipX: the x coordinate of the center of the ship
+    # Invariant: _shipX is a float in SHIP_WIDTH/2..GAME_WIDTH-SHIP_WIDTH/2
+    #
+    # Attribute _prevShipX: the x coordinate of the ship before this step
+    # Invariant: _prevShipX is a float in the same range as _shipX
+    #
+    # Attribute _prevOffset: the formation offset before this step
+    # Invariant: _prevOffset is a pair (dx, dy) of floats
+    #
+    # Attribute _shipAlive: whether the ship is on screen
+    # Invariant: _shipAlive is a bool
+    #
+    # Attribute _formation: the grid of aliens, bottom row first
+    # Invariant: _formation is a Formation object
+    #
+    # Attribute _bolts: the laser bolts currently on screen
+    # Invariant: _bolts is a BoltStore, possibly empty
+    #
+    # Attribute _barriers: the damage state of the barriers
+    # Invariant: _barriers is a Barriers object
+    #
+    # Attribute _alienMasks: the pixel mask of each alien type
+    # Invariant: _alienMasks is the bool array loadMask(ALIEN_IMAGES), shared
+    # by every wave
+    #
+    # Attribute _shipMask: the pixel mask of the ship
+    # Invariant: _shipMask is the bool array loadMask((SHIP_IMAGE,)), shared
+    # by every wave
+    #
+    # Attribute _lives: the number of lives left
+    # Invariant: _lives is an int >= 0
+    #
+    # Attribute _time: the amount of time since the last alien step
+    # Invariant: _time is a float >= 0
+    #
+    # Attribute _direction: the direction the aliens are marching
+    # Invariant: _direction is either 1 or -1
+    #
+    # Attribute _fireWhen: the number of steps until the next alien bolt
+    # Invariant: _fireWhen is an int between 1 and BOLT_RATE
+    #
+    # Attribute _steps: the steps taken since the last alien bolt
+    # Invariant: _steps is an int >= 0
+    #
+    # Attribute _playerBoltPresent: whether a player bolt is on screen
+    # Invariant: _playerBoltPresent is a bool
+    #
+    # Attribute _fired: the number of bolts the player has fired
+    # Invariant: _fired is an int >= 0
+    #
+    # Attribute _outcome: how the wave ended
+    # Invariant: _outcome is None while the wave is in play, True once it is
+    # won and False once it is lost; it never changes after that
+    #
+    # Attribute _emitter: the bullet pattern emitter of a bullet-hell wave
+    # Invariant: _emitter is an Emitter, or None for the original alien fire
+    #
+    # Attribute _bus: the events of the current step and their subscribers
+    # Invariant: _bus is an EventBus; its queue is empty between steps
+    #
+    # Attribute _seed: the seed of the random generator of this wave
+    # Invariant: _seed is an int
+    #
+    # Attribute _random: the random generator for alien fire
+    # Invariant: _random is a random.Random seeded with _seed, and is used by
+    # nothing outside of this wave
+
+    # GETTERS AND SETTERS
+    def getShipX(self):
+        """
+        Returns the x coordinate of the center of the ship.
+        """
+        return self._shipX
+
+    def getPrevShipX(self):
+        """
+        Returns the x coordinate of the ship before the last step.
+
+        Together with getShipX, this lets a renderer draw the ship part way
+        between the last two steps.
+        """
+        return self._prevShipX
+
+    def getPrevOffset(self):
+        """
+        Returns the formation offset (dx, dy) before the last step.
+        """
+        return self._prevOffset
+
+    def isShipAlive(self):
+        """
+        Returns True if the ship is on screen, False if it was destroyed.
+        """
+        return self._shipAlive
+
+    def getLives(self):
+        """
+        Returns the number of lives remaining.
+        """
+        return self._lives
+
+    def getFormation(self):
+        """
+        Returns the Formation holding the aliens.
+
+        The formation is owned by the simulation and must not be modified.
+        """
+        return self._formation
+
+    def getBolts(self):
+        """
+        Returns the BoltStore holding the bolts currently on screen.
+
+        The store is owned by the simulation and must not be modified.
+        """
+        return self._bolts
+
+    def getBarriers(self):
+        """
+        Returns the Barriers protecting the ship.
+
+        The barriers are owned by the simulation and must not be modified.
+        """
+        return self._barriers
+
+    def getCount(self):
+        """
+        Returns the number of living aliens.
+        """
+        return self._formation.getCount()
+
+    def getPattern(self):
+        """
+        Returns the bullet pattern of this wave, or None if it has the
+        original alien fire.
+        """
+        return None if self._emitter == None else self._emitter.getPattern()
+
+    def getShotsFired(self):
+        """
+        Returns the number of bolts the player has fired this wave.
+        """
+        return self._fired
+
+    def getDip(self):
+        """
+        Returns True if any alien is below the defensive line.
+        """
+        return self._formation.isBelow(DEFENSE_LINE)
+
+    def getWin(self):
+        """
+        Returns True if every alien has been destroyed.
+        """
+        return self._outcome == True
+
+    def getLose(self):
+        """
+        Returns True if the player has lost (no lives or aliens too low).
+        """
+        return self._outcome == False
+
+    def getSeed(self):
+        """
+        Returns the seed of the random generator of this wave.
+        """
+        return self._seed
+
+    def getOutcome(self):
+        """
+        Returns None while the wave is in play, and then True if it was won
+        or False if it was lost.
+        """
+        return self._outcome
+
+    def subscribe(self, kind, subscriber):
+        """
+        Adds a subscriber to one kind of event, or to every kind.
+
+        The subscriber is called at the end of each step in which such
+        events happened, with the list of those events.
+
+        Parameter kind: the kind of event to listen to
+        Precondition: kind is an EVENT constant, or None for every kind
+
+        Parameter subscriber: the function to call with the events
+        Precondition: subscriber is a function taking a list of Events
+        """
+        self._bus.subscribe(kind, subscriber)
+
+    def unsubscribe(self, kind, subscriber):
+        """
+        Removes a subscriber added with subscribe.
+
+        Parameter kind: the kind the subscriber listens to
+        Precondition: kind is an EVENT constant, or None for every kind
+
+        Parameter subscriber: the function to remove
+        Precondition: subscriber was subscribed to kind
+        """
+        self._bus.unsubscribe(kind, subscriber)
+
+    # INITIALIZER
+    def __init__(self, seed=None, pattern=None, rows=ALIEN_ROWS, \
+    cols=ALIENS_IN_ROW):
+        """
+        Initializes a new wave with a full formation and a ship at center.
+
+        Parameter seed: the seed of the random generator of this wave
+        Precondition: seed is an int, or None to pick one at random
+
+        Parameter pattern: the bullet pattern of the aliens
+        Precondition: pattern is one of PATTERNS in emitters.py, or None for
+        the original alien fire
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int in 1..FORMATION_LIMIT
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int in 1..FORMATION_LIMIT
+        """
+        assert pattern is None or pattern in PATTERNS
+        assert seed is None or isinstance(seed, int)
+        if seed is None:
+            seed = random.randrange(SEED_RANGE)
+        self._seed = seed
+        self._random = random.Random(seed)
+        self._shipX = GAME_WIDTH/2
+        self._prevShipX = self._shipX
+        self._shipAlive = True
+        self._formation = Formation(rows, cols)
+        self._prevOffset = self._formation.getOffset()
+        self._bolts = BoltStore()
+        self._barriers = Barriers(BARRIER_COUNT)
+        self._alienMasks = loadMask(ALIEN_IMAGES)
+        self._shipMask = loadMask((SHIP_IMAGE,))
+        self._lives = SHIP_LIVES
+        self._time = 0
+        self._direction = 1
+        self._steps = 0
+        self._fireWhen = self._random.randint(1, BOLT_RATE)
+        self._playerBoltPresent = False
+        self._fired = 0
+        self._outcome = None
+        self._emitter = None if pattern == None else Emitter(pattern)
+        self._bus = EventBus()
+
+    # UPDATE METHOD
+    def step(self, actions, dt):
+        """
+        Advances the simulation by one update.
+
+        Everything moves by its speed times dt.  The ship fires and the
+        aliens march from where they are at the start of the update, and
+        bolts are swept over the whole update against the formation and the
+        moving ship, so the wave plays out the same at any update rate.
+
+        Parameter actions: the player actions for this update
+        Precondition: actions is an int combining ACTION_LEFT, ACTION_RIGHT
+        and ACTION_FIRE with |
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        assert isinstance(actions, int)
+        assert isinstance(dt, int) or isinstance(dt, float)
+        self._prevShipX = self._shipX
+        self._prevOffset = self._formation.getOffset()
+        if self._shipAlive and actions & ACTION_FIRE:
+            self.fireShipBolt()
+        self.updateAliens(dt)
+        if self._shipAlive:
+            self.moveShip(actions, dt)
+        self.updateBolts(dt)
+        self._bus.dispatch()
+
+    def finish(self, won):
+        """
+        Records the outcome of the wave and posts EVENT_WAVE_WON or
+        EVENT_WAVE_LOST.
+
+        Only the first call has any effect, so the outcome is posted exactly
+        once.
+
+        Parameter won: whether the wave was won
+        Precondition: won is a bool
+        """
+        if self._outcome == None:
+            self._outcome = won
+            self._bus.post(EVENT_WAVE_WON if won else EVENT_WAVE_LOST)
+
+    def respawnShip(self):
+        """
+        Puts a destroyed ship back on screen where it was destroyed.
+        """
+        self._shipAlive = True
+
+    # STATE CAPTURE
+    def snapshot(self):
+        """
+        Returns an immutable WaveState of everything that decides what this
+        wave does next.
+
+        A snapshot is cheap enough to take every update: the formation cells
+        are only copied after a kill, only live bolts are copied, and the
+        rest is a handful of numbers.
+        """
+        return WaveState(self._seed, self._shipX, self._prevShipX, \
+        self._shipAlive, self._lives, self._formation.snapshot(), \
+        self._prevOffset, self._bolts.snapshot(), self._time, \
+        self._direction, self._steps, self._fireWhen, \
+        self._playerBoltPresent, self._fired, self._outcome, \
+        self._random.getstate(), \
+        None if self._emitter == None else self._emitter.snapshot(), \
+        self._barriers.snapshot())
+
+    def restore(self, state):
+        """
+        Puts this wave back in the state captured by snapshot.
+
+        The wave plays on from there exactly as it did after the snapshot.
+        No event is posted, even if state is a finished wave.
+
+        Parameter state: the state to restore
+        Precondition: state is a WaveState taken from a wave with the same
+        number of rows and columns
+        """
+        assert isinstance(state, WaveState)
+        self._seed = state.seed
+        self._shipX = state.shipX
+        self._prevShipX = state.prevShipX
+        self._shipAlive = state.shipAlive
+        self._lives = state.lives
+        self._formation.restore(state.formation)
+        self._prevOffset = state.prevOffset
+        self._bolts.restore(state.bolts)
+        self._barriers.restore(state.barriers)
+        self._time = state.time
+        self._direction = state.direction
+        self._steps = state.steps
+        self._fireWhen = state.fireWhen
+        self._playerBoltPresent = state.playerBoltPresent
+        self._fired = state.fired
+        self._outcome = state.outcome
+        self._random.setstate(state.random)
+        if self._emitter != None:
+            self._emitter.restore(state.emitter)
+        self._bus.clear()
+
+    # HELPER METHODS FOR THE SHIP
+    def moveShip(self, actions, dt):
+        """
+        Moves the ship left and/or right at SHIP_SPEED, keeping it on screen.
+
+        Parameter actions: the player actions for this update
+        Precondition: actions is an int bit mask of ACTION values
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        da = 0
+        if actions & ACTION_LEFT:
+            da = da - SHIP_SPEED * dt
+        if actions & ACTION_RIGHT:
+            da = da + SHIP_SPEED * dt
+        current = self._shipX + da
+        current = max(current, SHIP_WIDTH/2)
+        current = min(current, GAME_WIDTH - SHIP_WIDTH/2)
+        self._shipX = current
+
+    def fireShipBolt(self):
+        """
+        Fires a bolt from the ship, unless a player bolt is already present.
+        """
+        if not self._playerBoltPresent:
+            self._bolts.spawn(self._shipX, \
+            SHIP_BOTTOM + SHIP_HEIGHT + BOLT_HEIGHT/2, True)
+            self._playerBoltPresent = True
+            self._fired += 1
+            self._bus.post(EVENT_BOLT_FIRED, True)
+
+    # HELPER METHODS FOR THE ALIENS
+    def updateAliens(self, dt):
+        """
+        Marches the aliens one step whenever ALIEN_SPEED seconds have passed.
+
+        In a bullet-hell wave, the aliens fire their pattern on the emitter
+        clock instead of firing on a march.
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if self._emitter != None:
+            self.whenAliensEmit(dt)
+        if self.alienTimer(dt):
+            if self._emitter == None:
+                self.whenAlienShoot()
+            scale = self._formation.getScale()
+            if self.detectEdge():
+                self._direction = -self._direction
+                self._formation.drop(ALIEN_V_WALK * scale)
+                self._bus.post(EVENT_FORMATION_DROPPED, \
+                self._formation.getBottom())
+                if self.getDip():
+                    self.finish(False)
+            self._formation.march(ALIEN_H_WALK * scale * self._direction)
+
+    def alienTimer(self, dt):
+        """
+        Returns True (and counts a step) when it is time for aliens to march.
+
+        The aliens march at the start of the first update that begins
+        ALIEN_SPEED seconds or more after the last march.  The time left
+        over is kept, so the marches happen at the same moments whatever the
+        length of the updates.
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        due = self._time >= ALIEN_SPEED - TIMER_SLACK
+        if due:
+            self._time = max(self._time - ALIEN_SPEED, 0.0)
+            self._steps += 1
+        self._time += dt
+        return due
+
+    def detectEdge(self):
+        """
+        Returns True if any alien is within ALIEN_H_SEP of a side of the screen.
+
+        The margin shrinks with the formation (see Formation.getScale).
+        """
+        margin = (ALIEN_H_SEP + ALIEN_WIDTH) * self._formation.getScale()
+        return self._formation.atEdge(margin, GAME_WIDTH - margin)
+
+    def whenAlienShoot(self):
+        """
+        Fires an alien bolt when enough steps have passed since the last one.
+        """
+        if self._steps == self._fireWhen:
+            shooter = self.whichAlienShoot()
+            if shooter != None:
+                x, y = self._formation.getPosition(*shooter)
+                height = self._formation.getAlienSize()[1]
+                self._bolts.spawn(x, \
+                y - 1/2*height - 1/2*BOLT_HEIGHT, False)
+                self._bus.post(EVENT_BOLT_FIRED, False)
+                self._steps = 0
+                self._fireWhen = self._random.randint(1, BOLT_RATE)
+
+    def whenAliensEmit(self, dt):
+        """
+        Fires a volley of the bullet pattern from every shooting alien when
+        EMITTER_RATE seconds have passed.
+
+        A single EVENT_BOLT_FIRED (False) is posted for the whole volley.
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if self._emitter.update(dt):
+            xs, ys = self._formation.getShooterPositions()
+            height = self._formation.getAlienSize()[1]
+            fired = self._emitter.fire(self._bolts, xs, \
+            ys - (height/2 + BOLT_HEIGHT/2), self._shipX, \
+            SHIP_BOTTOM + SHIP_HEIGHT/2)
+            if fired > 0:
+                self._bus.post(EVENT_BOLT_FIRED, False)
+
+    def whichAlienShoot(self):
+        """
+        Returns (row, col) of a random alien among the bottom-most living
+        alien of each column, or None if there are no aliens left.
+        """
+        count = self._formation.countShooters()
+        if count > 0:
+            return self._formation.getShooter(self._random.randrange(0, count))
+        return None
+
+    # HELPER METHODS FOR THE BOLTS
+    def updateBolts(self, dt):
+        """
+        Moves every bolt and resolves its collisions with ship and aliens.
+
+        All bolts move in one vectorized step. Bolts that hit something or
+        left the screen are marked, and removed together at the end.  Hits
+        are found before the offscreen test, so a bolt can still hit a target
+        on its way off the screen.
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        bolts = self._bolts
+        if bolts.getCount() == 0:
+            return
+        bolts.move(dt)
+        self.collides()
+        bolts.markOffscreen()
+        if bolts.compact() > 0:
+            self._playerBoltPresent = False
+
+    def collides(self):
+        """
+        Destroys every alien and ship hit by a bolt, and blasts a crater
+        wherever a bolt hits a barrier, marking the bolt.
+
+        Each bolt is swept along the segment it covered in the last move, so
+        a fast bolt (or a long update) cannot jump over a target.  Player
+        bolts can only hit aliens, and alien bolts can only hit the ship, but
+        every bolt is stopped by a barrier.  Player bolts are swept one at a
+        time through the formation lattice, while alien bolts are swept
+        against the (moving) ship, and all bolts against the barriers, all at
+        once.
+
+        Aliens and the ship are hit only where their images are opaque: the
+        boxes that a bolt overlaps are then tested against their pixel masks
+        (see masks.py).
+
+        Hits are resolved in the order they happen within the update, ties
+        going to aliens first, then the ship, then barriers.  A bolt whose
+        target was already destroyed by an earlier hit is swept again.  A
+        destroyed ship is left where it was at the time of the hit, so that
+        it is put back at the same place whatever the update rate.
+        """
+        bolts = self._bolts
+        player = bolts.getPlayer()
+        queue = []
+        for slot in np.nonzero(player)[0].tolist():
+            self.sweepAliens(queue, slot)
+        if self._shipAlive:
+            self.sweepShip(queue)
+        if self._barriers.getCount() > 0:
+            self.sweepBarriers(queue, np.arange(bolts.getCount()))
+        while len(queue) > 0:
+            time, kind, slot, hit = heapq.heappop(queue)
+            if bolts.isDead(slot):
+                if kind == 1 and self._shipAlive:
+                    self.sweepShip(queue)
+            elif kind == 2:
+                if self._barriers.isSolid(*hit):
+                    bolts.kill(slot)
+                    self._bus.post(EVENT_BARRIER_HIT, \
+                    (hit[0],) + self._barriers.blast(*hit))
+                else:
+                    self.sweepBarriers(queue, np.array([slot]))
+            elif kind == 1:
+                bolts.kill(slot)
+                self._shipX = self._prevShipX + time * (self._shipX - \
+                self._prevShipX)
+                self._shipAlive = False
+                self._lives -= 1
+                self._bus.post(EVENT_SHIP_HIT, self._lives)
+                if self._lives == 0:
+                    self.finish(False)
+            elif self._formation.isAlive(*hit):
+                bolts.kill(slot)
+                self._formation.kill(*hit)
+                self._bus.post(EVENT_ALIEN_KILLED, hit)
+                if self._formation.isEmpty():
+                    self.finish(True)
+            else:
+                self.sweepAliens(queue, slot)
+
+    def sweepAliens(self, queue, slot):
+        """
+        Sweeps the player bolt in slot through the formation, and queues the
+        first alien it hits.
+
+        The aliens whose boxes the bolt overlaps are found first, and only
+        those are tested against the masks of their images.  A queued hit is
+        the tuple (time, 0, slot, (row, col)), ordered by the time of the hit
+        within the update.
+
+        Parameter queue: the hits waiting to be resolved
+        Precondition: queue is a list kept as a heap by heapq
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int in 0..getBolts().getCount()-1 holding a
+        player bolt
+        """
+        bolts = self._bolts
+        formation = self._formation
+        sx = float(bolts.getPrevX()[slot])
+        sy = float(bolts.getPrevY()[slot])
+        dx = float(bolts.getX()[slot]) - sx
+        dy = float(bolts.getY()[slot]) - sy
+        cells = formation.sweepCells(sx, sy, sx + dx, sy + dy, BOLT_WIDTH, \
+        BOLT_HEIGHT)
+        if len(cells) == 0:
+            return
+        rows, cols = np.array([cell for time, cell in cells]).T
+        width, height = formation.getAlienSize()
+        times = sweepMasks(self._alienMasks, formation.getTypes()[rows, cols], \
+        formation.getX()[rows, cols] - width/2, \
+        formation.getY()[rows, cols] - height/2, \
+        width / self._alienMasks.shape[2], np.full(len(rows), sx), \
+        np.full(len(rows), sy), np.full(len(rows), dx), \
+        np.full(len(rows), dy), BOLT_WIDTH, BOLT_HEIGHT)[0]
+        first = int(np.argmin(times))
+        if times[first] != np.inf:
+            heapq.heappush(queue, (float(times[first]), 0, slot, \
+            (int(rows[first]), int(cols[first]))))
+
+    def sweepShip(self, queue):
+        """
+        Sweeps the alien bolts not yet marked against the ship, and queues the
+        first one to hit it.
+
+        The bolts that overlap the box of the (moving) ship are found first,
+        and only those are tested against the mask of its image, relative to
+        the ship.  A queued hit is the tuple (time, 1, slot, None).
+
+        Parameter queue: the hits waiting to be resolved
+        Precondition: queue is a list kept as a heap by heapq
+        """
+        bolts = self._bolts
+        slots = bolts.sweepAll(self._shipX, SHIP_BOTTOM + SHIP_HEIGHT/2, \
+        SHIP_WIDTH, SHIP_HEIGHT, ~(bolts.getPlayer() | bolts.getDead()), \
+        self._prevShipX)[1]
+        if len(slots) == 0:
+            return
+        sx = bolts.getPrevX()[slots] + (self._shipX - self._prevShipX)
+        sy = bolts.getPrevY()[slots]
+        count = len(slots)
+        times = sweepMasks(self._shipMask, np.zeros(count, dtype=int), \
+        np.full(count, self._shipX - SHIP_WIDTH/2), \
+        np.full(count, float(SHIP_BOTTOM)), \
+        SHIP_WIDTH / self._shipMask.shape[2], sx, sy, \
+        bolts.getX()[slots] - sx, bolts.getY()[slots] - sy, BOLT_WIDTH, \
+        BOLT_HEIGHT)[0]
+        first = int(np.argmin(times))
+        if times[first] != np.inf:
+            heapq.heappush(queue, (float(times[first]), 1, \
+            int(slots[first]), None))
+
+    def sweepBarriers(self, queue, slots):
+        """
+        Sweeps bolts against the barriers, and queues the first solid pixel
+        each one hits.
+
+        A queued hit is the tuple (time, 2, slot, (index, col, row)), where
+        (col, row) is the pixel of barrier index that was hit.
+
+        Parameter queue: the hits waiting to be resolved
+        Precondition: queue is a list kept as a heap by heapq
+
+        Parameter slots: the slots of the bolts
+        Precondition: slots is an int array of slots in
+        0..getBolts().getCount()-1
+        """
+        bolts = self._bolts
+        found = self._barriers.sweep(bolts.getPrevX()[slots], \
+        bolts.getPrevY()[slots], bolts.getX()[slots], bolts.getY()[slots])
+        for k, time, index, col, row in zip(*(part.tolist() for part in found)):
+            heapq.heappush(queue, (time, 2, int(slots[k]), (index, col, row)))
@@ -0,0 +1,19 @@
+"""
+Test configuration for the wave kernel.
+
+The game modules live flat in the parent folder and import each other by
+module name, so that folder is put on the path here.  As consts.py reads
+the wave settings from the command line, it is imported with the pytest
+arguments hidden, so that the tests always run with the default settings.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_argv = sys.argv
+sys.argv = _argv[:1]
+try:
+    import consts
+finally:
+    sys.argv = _argv
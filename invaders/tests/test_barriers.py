@@ -0,0 +1,106 @@
+"""
+Barrier tests for Alien Invaders
+
+Bolts blast craters in the barriers, and stop at the first solid pixel in
+their way, passing through the transparent ones.
+"""
+import numpy as np
+
+from consts import *
+from barriers import Barriers
+
+
+def shoot(barriers, x, y0, y1):
+    """
+    Returns the hits of one bolt moving from (x, y0) to (x, y1), as returned
+    by Barriers.sweep.
+
+    Parameter barriers: the barriers
+    Precondition: barriers is a Barriers object
+
+    Parameter x: the x coordinate of the bolt
+    Precondition: x is a float
+
+    Parameter y0: the y coordinate of the bolt before the move
+    Precondition: y0 is a float
+
+    Parameter y1: the y coordinate of the bolt after the move
+    Precondition: y1 is a float
+    """
+    return barriers.sweep(np.array([x]), np.array([y0]), np.array([x]), \
+    np.array([y1]))
+
+
+def test_blast_crater():
+    """
+    Checks that a blast clears a disc of pixels around the hit, and nothing
+    outside of it.
+    """
+    barriers = Barriers(2)
+    before = barriers.getMasks().copy()
+    col, row = BARRIER_WIDTH//2, BARRIER_HEIGHT//2
+    r = BARRIER_CRATER
+    assert barriers.blast(0, col, row) == (col - r, row - r, col + r + 1, \
+    row + r + 1)
+    masks = barriers.getMasks()
+    assert not barriers.isSolid(0, col, row)
+    assert not barriers.isSolid(0, col + r, row)
+    assert barriers.isSolid(0, col + r, row + r) == before[0, row + r, col + r]
+    changed = np.argwhere(before != masks)
+    assert (changed[:, 0] == 0).all()
+    assert ((changed[:, 1] - row)**2 + (changed[:, 2] - col)**2 <= r*r).all()
+
+
+def test_blast_clipped():
+    """
+    Checks that a crater at a corner stays inside the barrier.
+    """
+    barriers = Barriers(1)
+    r = BARRIER_CRATER
+    assert barriers.blast(0, 0, 0) == (0, 0, r + 1, r + 1)
+    assert not barriers.isSolid(0, 0, 0)
+
+
+def test_sweep_fast_bolt():
+    """
+    Checks that a bolt moving over the whole barrier in one move stops at
+    the first solid pixel in its way.
+    """
+    barriers = Barriers(1)
+    x = float(barriers.getLefts()[0]) + 4
+    bottom = float(barriers.getBottoms()[0])
+    slots, times, indices, cols, rows = shoot(barriers, x, bottom - 50, \
+    bottom + BARRIER_HEIGHT + 50)
+    assert list(slots) == [0] and list(indices) == [0]
+    assert rows[0] == 0 and 0 < times[0] < 1
+    assert barriers.isSolid(0, cols[0], rows[0])
+
+
+def test_sweep_through_transparent():
+    """
+    Checks that a bolt rises through the transparent arch of a barrier, and
+    only stops at the first solid pixel above it.
+    """
+    barriers = Barriers(1)
+    masks = barriers.getMasks()
+    col = BARRIER_WIDTH//2
+    assert not masks[0, 0, col]
+    x = float(barriers.getLefts()[0]) + col
+    bottom = float(barriers.getBottoms()[0])
+    slots, times, indices, cols, rows = shoot(barriers, x, bottom - 50, \
+    bottom + BARRIER_HEIGHT + 50)
+    assert list(slots) == [0]
+    assert rows[0] > 0
+    assert not masks[0, :rows[0], cols[0]].any()
+
+
+def test_sweep_after_blasts():
+    """
+    Checks that a bolt goes through a barrier once it is blasted away.
+    """
+    barriers = Barriers(1)
+    empty = np.zeros_like(barriers.getMasks())
+    barriers.restore(empty.tobytes())
+    x = float(barriers.getLefts()[0]) + 4
+    bottom = float(barriers.getBottoms()[0])
+    assert len(shoot(barriers, x, bottom - 50, bottom + 100)[0]) == 0
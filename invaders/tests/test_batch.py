@@ -0,0 +1,88 @@
+"""
+Tests for the batched simulator (batch.py)
+
+BatchSim must agree with the formation of WaveSim about where the aliens are
+and which one a player bolt hits first, for every formation size.
+"""
+import numpy as np
+import pytest
+
+from consts import *
+from batch import BatchSim
+from formation import Formation
+
+# The formation sizes to test, up to the largest one allowed
+SIZES = [(5, 12), (3, 30), (8, 200), (2, FORMATION_LIMIT)]
+
+
+@pytest.mark.parametrize('rows,cols', SIZES)
+def test_same_formation(rows, cols):
+    """
+    Checks that every game starts with the formation of a WaveSim.
+    """
+    batch = BatchSim(4, 0, rows, cols)
+    assert batch.getAlive().shape == (4, rows, cols)
+    assert batch.getAlive().all()
+    assert (batch.getCount() == rows * cols).all()
+    assert (batch.getShipX() == GAME_WIDTH/2).all()
+    assert (batch.getLives() == SHIP_LIVES).all()
+
+
+@pytest.mark.parametrize('rows,cols', SIZES)
+def test_same_hits(rows, cols):
+    """
+    Checks that each player bolt destroys the alien Formation.sweepCells
+    finds first, or nothing when it finds none.
+
+    The aliens and bolts are put in place directly, and the step is too short
+    for the aliens to march or fire.
+    """
+    size = 64
+    rng = np.random.default_rng(rows * cols)
+    batch = BatchSim(size, 0, rows, cols)
+    alive = batch.getAlive()
+    alive[:] = rng.random(alive.shape) < 0.3
+    batch.getCount()[:] = alive.sum(axis=(1, 2))
+    before = alive.copy()
+    present, xs, ys = batch.getPlayerBolts()
+    home = Formation(rows, cols)
+    ys0 = home.getY()[:, 0]
+    present[:] = True
+    xs[:] = rng.uniform(0, GAME_WIDTH, size)
+    ys[:] = rng.uniform(ys0[0] - 30, ys0[-1] + 30, size)
+    starts = ys.copy()
+    batch.step(np.zeros(size, dtype=int))
+    move = BOLT_SPEED * FIXED_STEP
+    hits = 0
+    for game in range(size):
+        formation = Formation(rows, cols)
+        for row, col in np.argwhere(~before[game]):
+            formation.kill(int(row), int(col))
+        cells = formation.sweepCells(xs[game], starts[game], xs[game], \
+        starts[game] + move, BOLT_WIDTH, BOLT_HEIGHT)
+        killed = [tuple(cell) for cell in np.argwhere(before[game] & \
+        ~alive[game])]
+        assert killed == ([min(cells)[1]] if cells else [])
+        hits += len(killed)
+    assert hits > 0
+
+
+def test_same_seed_same_batch():
+    """
+    Checks that two batches with one seed and the same actions stay
+    identical.
+    """
+    size = 16
+    rng = np.random.default_rng(7)
+    first = BatchSim(size, 3)
+    second = BatchSim(size, 3)
+    for _ in range(1200):
+        actions = rng.choice([ACTION_NONE, ACTION_LEFT, ACTION_RIGHT], size) \
+        | rng.choice([0, ACTION_FIRE], size)
+        done1, won1 = first.step(actions)
+        done2, won2 = second.step(actions)
+        assert (done1 == done2).all() and (won1 == won2).all()
+        assert (first.getAlive() == second.getAlive()).all()
+        assert (first.getAlienBolts()[2] == second.getAlienBolts()[2]).all()
+    assert all((a == b).all() for a, b in zip(first.getResults(), \
+    second.getResults()))
@@ -0,0 +1,117 @@
+"""
+Swept collision tests for Alien Invaders
+
+Bolts are swept over their whole move, so no target can be jumped over, no
+matter how fast the bolt or how long the update.
+"""
+import numpy as np
+
+from consts import *
+from bolts import BoltStore
+from formation import Formation
+from sim import WaveSim
+
+
+def column(formation, col):
+    """
+    Returns the x coordinate of a column of a formation.
+
+    Parameter formation: the formation
+    Precondition: formation is a Formation
+
+    Parameter col: the column
+    Precondition: col is an int in 0..formation.getCols()-1
+    """
+    return float(formation.getX()[0, col])
+
+
+def test_sweep_through_formation():
+    """
+    Checks that a bolt crossing the whole formation in one move hits every
+    row of its column, the bottom row first.
+    """
+    formation = Formation(5, 11)
+    x = column(formation, 3)
+    ys = formation.getY()[:, 3]
+    cells = formation.sweepCells(x, ys[0] - 100, x, ys[-1] + 100, \
+    BOLT_WIDTH, BOLT_HEIGHT)
+    assert sorted(cell for t, cell in cells) == [(row, 3) for row in range(5)]
+    assert min(cells)[1] == (0, 3)
+    assert all(0 < t < 1 for t, cell in cells)
+
+
+def test_sweep_jumps_nothing():
+    """
+    Checks that a bolt which starts below an alien and ends above it hits
+    it, though it overlaps the alien at neither end.
+    """
+    formation = Formation(1, 5)
+    x = column(formation, 2)
+    y = float(formation.getY()[0, 2])
+    cells = formation.sweepCells(x, y - 200, x, y + 200, BOLT_WIDTH, \
+    BOLT_HEIGHT)
+    assert [cell for t, cell in cells] == [(0, 2)]
+
+
+def test_sweep_edges():
+    """
+    Checks the time of a bolt that starts overlapping an alien, and of one
+    that stops just short of it.
+    """
+    formation = Formation(1, 5)
+    x = column(formation, 2)
+    y = float(formation.getY()[0, 2])
+    width, height = formation.getAlienSize()
+    reach = (height + BOLT_HEIGHT)/2
+    assert formation.sweepCells(x, y, x, y + 50, BOLT_WIDTH, BOLT_HEIGHT) \
+    == [(0.0, (0, 2))]
+    assert formation.sweepCells(x, y - reach - 50, x, y - reach, BOLT_WIDTH, \
+    BOLT_HEIGHT) == []
+    gap = x + (width + BOLT_WIDTH)/2
+    assert formation.sweepCells(gap, y - 200, gap, y + 200, BOLT_WIDTH, \
+    BOLT_HEIGHT) == []
+
+
+def test_sweep_skips_dead():
+    """
+    Checks that a bolt passes through the cell of a destroyed alien.
+    """
+    formation = Formation(3, 4)
+    x = column(formation, 1)
+    ys = formation.getY()[:, 1]
+    formation.kill(0, 1)
+    cells = formation.sweepCells(x, ys[0] - 100, x, ys[-1] + 100, \
+    BOLT_WIDTH, BOLT_HEIGHT)
+    assert min(cells)[1] == (1, 1)
+    assert not (0, 1) in [cell for t, cell in cells]
+
+
+def test_sweep_moving_box():
+    """
+    Checks that a box moving sideways hits a bolt that it passes over,
+    though it overlaps the bolt at neither end of the move.
+    """
+    bolts = BoltStore()
+    bolts.spawn(400.0, 60.0, False)
+    bolts.move(0.0)
+    mask = np.ones(1, dtype=bool)
+    assert len(bolts.sweepAll(500.0, 60.0, 20, 20, mask)[1]) == 0
+    times, slots = bolts.sweepAll(500.0, 60.0, 20, 20, mask, 300.0)
+    assert list(slots) == [0]
+    assert 0 < times[0] < 1
+
+
+def test_long_update_hits_alien():
+    """
+    Checks that a player bolt crossing the whole formation in one update
+    destroys the first alien in its way, and only that one.
+    """
+    sim = WaveSim(0, None, 5, 11)
+    x = column(sim.getFormation(), 5)
+    sim.step(ACTION_LEFT, (sim.getShipX() - x)/SHIP_SPEED)
+    killed = []
+    sim.subscribe(EVENT_ALIEN_KILLED, killed.extend)
+    sim.step(ACTION_FIRE, 0.0)
+    sim.step(ACTION_NONE, 0.9)
+    assert [event.value for event in killed] == [(0, 5)]
+    assert sim.getCount() == 54
@@ -0,0 +1,46 @@
+"""
+Tests for the agent environment (env.py)
+
+An environment plays waves of any formation size, and its observation
+follows the wave it plays.
+"""
+import pytest
+
+from consts import *
+from env import WaveEnv
+
+
+@pytest.mark.parametrize('rows,cols', [(ALIEN_ROWS, ALIENS_IN_ROW), (3, 4), \
+(1, 1), (12, 40)])
+def test_any_size(rows, cols):
+    """
+    Checks that an environment resets and steps a wave of the given size.
+    """
+    env = WaveEnv(rows, cols)
+    obs = env.reset(1)
+    assert obs['alive'].shape == (rows, cols)
+    assert obs['alive'].all()
+    assert env.getSim().getCount() == rows * cols
+    done = False
+    steps = 0
+    while not done and steps < 600:
+        obs, reward, done, info = env.step(ACTION_FIRE)
+        steps += 1
+    assert obs['alive'].sum() == info['count'] == env.getSim().getCount()
+
+
+def test_same_seed_same_episode():
+    """
+    Checks that two resets with one seed give the same episode.
+    """
+    env = WaveEnv(3, 4)
+    runs = []
+    for _ in range(2):
+        env.reset(5)
+        rewards = []
+        done = False
+        while not done and len(rewards) < 900:
+            obs, reward, done, info = env.step(ACTION_FIRE | ACTION_LEFT)
+            rewards.append(reward)
+        runs.append((rewards, obs['alive'].tobytes(), info['lives']))
+    assert runs[0] == runs[1]
@@ -0,0 +1,36 @@
+"""
+Mask tests for Alien Invaders
+
+Bolts only hit the opaque pixels of an image: a bolt passes through
+transparent pixels.
+"""
+import numpy as np
+
+from consts import *
+from masks import loadMask, readImage, sweepMasks
+
+
+def test_mask_alpha():
+    """
+    Checks that a pixel is solid exactly when its alpha is at least
+    MASK_ALPHA, and that masks are only made once.
+    """
+    mask = loadMask(SHIP_IMAGE)
+    assert (mask == (readImage(SHIP_IMAGE)[:, :, 3] >= MASK_ALPHA)).all()
+    assert loadMask(SHIP_IMAGE) is mask
+    assert loadMask(ALIEN_IMAGES).shape[0] == len(ALIEN_IMAGES)
+
+
+def test_sweep_masks_hole():
+    """
+    Checks that a box falling through a column of transparent pixels hits
+    nothing, and that one beside it hits the top pixel.
+    """
+    masks = np.ones((1, 3, 3), dtype=bool)
+    masks[0, :, 1] = False
+    args = (masks, np.zeros(2, dtype=int), np.zeros(2), np.zeros(2), 1.0, \
+    np.array([1.5, 0.5]), np.array([6.0, 6.0]), np.zeros(2), \
+    np.array([-6.0, -6.0]), 0.5, 0.5)
+    times, cols, rows = sweepMasks(*args)
+    assert times[0] == np.inf
+    assert times[1] < 1 and (cols[1], rows[1]) == (0, 2)
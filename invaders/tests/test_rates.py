@@ -0,0 +1,19 @@
+"""
+Update-rate tests for Alien Invaders
+
+A wave played by the timed policy of farm.py must end the same way whatever
+the number of updates per second.
+"""
+import pytest
+
+from farm import playTimed
+
+
+@pytest.mark.parametrize('rows,cols', [(1, 1), (2, 7), (5, 12), (3, 30)])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_timed_outcome_ignores_rate(seed, rows, cols):
+    """
+    Checks that a timed wave has the same result at 30, 60 and 240 Hz.
+    """
+    results = [playTimed(seed, rate, rows, cols) for rate in (30, 60, 240)]
+    assert results[0] == results[1] == results[2]
@@ -0,0 +1,98 @@
+"""
+Determinism tests for the wave kernel (sim.py)
+
+Two waves with the same seed and the same actions must play out exactly the
+same.
+"""
+import random
+
+import pytest
+
+from consts import *
+from emitters import PATTERNS
+from sim import WaveSim
+
+
+def actions(seed, count):
+    """
+    Returns a list of count random action masks drawn from seed.
+
+    Parameter seed: the seed of the actions
+    Precondition: seed is an int
+
+    Parameter count: the number of actions
+    Precondition: count is an int >= 0
+    """
+    rng = random.Random(seed)
+    moves = (ACTION_NONE, ACTION_LEFT, ACTION_RIGHT)
+    return [rng.choice(moves) | rng.choice((0, ACTION_FIRE)) \
+    for _ in range(count)]
+
+
+def state(sim):
+    """
+    Returns everything visible about a wave as a tuple of plain values.
+
+    Parameter sim: the wave
+    Precondition: sim is a WaveSim
+    """
+    bolts = sim.getBolts()
+    n = bolts.getCount()
+    return (sim.getShipX(), sim.isShipAlive(), sim.getLives(), \
+    sim.getCount(), sim.getShotsFired(), sim.getOutcome(), \
+    sim.getFormation().getOffset(), sim.getFormation().getAlive().tobytes(), \
+    bolts.getX()[:n].tobytes(), bolts.getY()[:n].tobytes(), \
+    bolts.getPlayer()[:n].tobytes(), sim.getBarriers().getMasks().tobytes())
+
+
+def play(sim, moves):
+    """
+    Steps a wave through moves at FIXED_STEP, and returns its state after
+    every step.
+
+    A destroyed ship is put back before the next step, and the wave stops
+    early once it is over.
+
+    Parameter sim: the wave
+    Precondition: sim is a WaveSim
+
+    Parameter moves: the actions of each step
+    Precondition: moves is a list of action masks
+    """
+    states = []
+    for action in moves:
+        if sim.getOutcome() != None:
+            break
+        if not sim.isShipAlive():
+            sim.respawnShip()
+        sim.step(action, FIXED_STEP)
+        states.append(state(sim))
+    return states
+
+
+@pytest.mark.parametrize('pattern', (None,) + PATTERNS)
+def test_same_seed_same_wave(pattern):
+    """
+    Checks that two waves with one seed and the same actions stay identical,
+    even when stepped side by side.
+    """
+    moves = actions(3, 900)
+    first = WaveSim(11, pattern)
+    second = WaveSim(11, pattern)
+    heard = ([], [])
+    first.subscribe(None, heard[0].extend)
+    second.subscribe(None, heard[1].extend)
+    for action in moves:
+        if first.getOutcome() != None:
+            break
+        assert play(first, [action]) == play(second, [action])
+    assert heard[0] == heard[1]
+    assert len(heard[0]) > 0
+
+
+def test_different_seeds_differ():
+    """
+    Checks that the seed decides the alien fire.
+    """
+    moves = actions(3, 600)
+    assert play(WaveSim(1), moves) != play(WaveSim(2), moves)
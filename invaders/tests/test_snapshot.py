@@ -0,0 +1,60 @@
+"""
+Snapshot tests for the wave kernel (sim.py)
+
+A wave restored from a snapshot must play on exactly as it did after the
+snapshot was taken.
+"""
+import pytest
+
+from consts import *
+from emitters import PATTERNS
+from sim import WaveSim
+from test_sim import actions, play
+
+
+@pytest.mark.parametrize('pattern', (None,) + PATTERNS)
+def test_snapshot_restore(pattern):
+    """
+    Checks that a restored wave replays exactly what followed the snapshot.
+
+    Bullet-hell waves are over in a couple of seconds, so the snapshot is
+    taken early.
+    """
+    moves = actions(5, 900)
+    sim = WaveSim(4, pattern)
+    play(sim, moves[:40])
+    saved = sim.snapshot()
+    after = play(sim, moves[40:])
+    assert len(after) > 0
+    sim.restore(saved)
+    assert play(sim, moves[40:]) == after
+
+
+def test_restore_into_other_wave():
+    """
+    Checks that a snapshot can be restored into a fresh wave.
+    """
+    moves = actions(6, 900)
+    sim = WaveSim(8)
+    play(sim, moves[:400])
+    saved = sim.snapshot()
+    after = play(sim, moves[400:])
+    other = WaveSim(0)
+    other.restore(saved)
+    assert other.getSeed() == 8
+    assert play(other, moves[400:]) == after
+
+
+def test_restore_posts_nothing():
+    """
+    Checks that restoring a wave drops its pending events.
+    """
+    sim = WaveSim(2)
+    heard = []
+    sim.subscribe(None, heard.extend)
+    saved = sim.snapshot()
+    play(sim, actions(1, 200))
+    count = len(heard)
+    sim.restore(saved)
+    sim.step(ACTION_NONE, 0.0)
+    assert len(heard) == count
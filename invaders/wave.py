@@ -5,13 +5,13 @@ This module contains the subcontroller to manage a single level or wave in
 the Alien Invaders game.  Instances of Wave represent a single wave. Whenever
 you move to a new level, you are expected to make a new instance of the class.
 
-The subcontroller Wave manages the ship, the aliens and any laser bolts on
-screen. These are model objects.  Their classes are defined in models.py.
+The subcontroller Wave manages the ship, the aliens, the barriers and any
+laser bolts on screen. These are model objects.  Their classes are defined in
+models.py.
 
-Most of your work on this assignment will be in either this module or
-models.py. Whether a helper method belongs in this module or models.py is
-often a complicated issue.  If you do not know, ask on Piazza and we will
-answer.
+The rules of the wave live in the simulation kernel WaveSim (see sim.py),
+which has no graphics at all.  Wave turns player input into kernel actions,
+and mirrors the kernel state into the game2d models only when it draws.
 
 # Jonathan Wang (jyw38) and Derek Wang (dkw48)
 # 12/11/2023
@@ -19,9 +19,10 @@ answer.
 from game2d import *
 from consts import *
 from models import *
-import random
+from sim import *
 
-# PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
+# PRIMARY RULE: Wave can only access attributes in models.py via
+# getters/setters
 # Wave is NOT allowed to access anything in app.py (Subcontrollers are not
 # permitted to access anything in their parent. To see why, take CS 3152)
 
@@ -37,6 +38,9 @@ class Wave(object):
     loses). When the wave is complete, you  should create a NEW instance of
     Wave (in Invaders) if you want to make a new wave of aliens.
 
+    The game rules are delegated to a WaveSim.  This class only owns the
+    game2d objects, which are updated from the WaveSim in drawWave.
+
     If you want to pause the game, tell this controller to draw, but do not
     update.  See subcontrollers.py from Lecture 24 for an example.  This
     class will be similar to than one in how it interacts with the main class
@@ -51,46 +55,42 @@ class Wave(object):
 
     """
     # HIDDEN ATTRIBUTES:
-    # Attribute _ship: the player ship to control
-    # Invariant: _ship is a Ship object or None
-    #
-    # Attribute _aliens: the 2d list of aliens in the wave
-    # Invariant: _aliens is a rectangular 2d list containing Alien
-    # objects or None
+    # Attribute _sim: the simulation kernel that owns the state of the wave
+    # Invariant: _sim is a WaveSim object
     #
-    # Attribute _bolts: the laser bolts currently on screen
-    # Invariant: _bolts is a list of Bolt objects, possibly empty
+    # Attribute _ship: the player ship to draw
+    # Invariant: _ship is a Ship object
     #
-    # Attribute _dline: the defensive line being protected
-    # Invariant : _dline is a GPath object
+    # Attribute _aliens: the 2d list of aliens to draw, matching the kernel
+    # Invariant: _aliens is a rectangular 2d list of Alien objects, with the
+    # same shape as the kernel Formation (empty if there is an _alienField)
     #
-    # Attribute _lives: the number of lives left
-    # Invariant: _lives is an int >= 0
+    # Attribute _alienField: the aliens of a scaled formation, drawn at once
+    # Invariant: _alienField is an AlienField, or None if the formation is
+    # drawn with Alien objects (when it is not scaled)
     #
-    # Attribute _time: the amount of time since the last Alien "step"
-    # Invariant: _time is a float >= 0s
+    # Attribute _dirty: the rows of _alienField that need to be rebuilt
+    # Invariant: _dirty is a set of row indices
     #
-    # Attribute _direction: determines the direction of aliens as they move
-    # Invariant: _direction is either 1 or -1
+    # Attribute _frame: the march frame the aliens are drawn with
+    # Invariant: _frame is an int in 0..ALIEN_MARCH_FRAMES-1
     #
-    # Attribute _fireWhen: the random amount of steps required for alien to
-    # shoot a bolt
-    # Invariant: _fireWhen is a random integer between 1 and BOLT_RATE
+    # Attribute _bolts: the laser bolts to draw, one per kernel bolt slot
+    # Invariant: _bolts is a list of Bolt objects; after syncBolts, _bolts[i]
+    # shows slot i of the kernel BoltStore (only the player slots, in the
+    # same order, when there is a _field)
     #
-    # Attribute _steps: the steps an alien takes up until it shoots a bolt
-    # Invariant: _steps is an integer
+    # Attribute _field: the alien bolts of a bullet pattern, drawn at once
+    # Invariant: _field is a BoltField, or None if the wave has no pattern
     #
-    # Attribute _playerBoltPresent: determines whether or not a bolt shot from
-    # the player is present in the list of bolts and/or on the screen
-    # Invariant: _playerBoltPresent is a boolean value
+    # Attribute _pool: the pool that recycles Bolt objects
+    # Invariant: _pool is a BoltPool; every Bolt in _bolts came from it
     #
-    # Attribute _edge: determines whether or not an alien has reached close
-    # enough to the edge to move down and in the opposite direction
-    # Invariant: _edge is a boolean value
+    # Attribute _dline: the defensive line being protected
+    # Invariant : _dline is a GPath object
     #
-    # Attribute _coordinates: the coordinates of the ship right before it is
-    # destroyed by a bolt and is used to resume game
-    # Invariant: _coordinates is a size two tuple of ints or floats
+    # Attribute _barrierField: the barriers of the kernel, as they are damaged
+    # Invariant: _barrierField is a BarrierField
     #
     # Parameters:_paused  creates a GLabel that shows that the game will
     # not continue
@@ -108,288 +108,233 @@ class Wave(object):
     #Parameters:_winner is a boolean that signifies who has won the game
     # Invarinat: _winner is a boolean
     #
+    # Attribute _latched: the fire action waiting for the next update
+    # Invariant: _latched is ACTION_NONE or ACTION_FIRE
+    #
+    # Attribute _builder: the construction of the game objects still to come
+    # Invariant: _builder is the generator returned by build, or None once
+    # every game object exists (only then may the wave be drawn)
+    #
     # You may change any attribute above, as long as you update the invariant
     # You may also add any new attributes as long as you document them.
     # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
 
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def resetFireWhen(self):
+    def isReady(self):
         """
-        Resets the steps it takes for when an alien fires.
-
-        Sets the steps back to zero and then sets the hidden attribute
-        _fireWhen (the amount of steps needed to fire) to a random int
-        between 1 and BOLT_RATE.
+        Returns True if every game object of the wave has been built.
         """
-        self._steps = 0
-        self._fireWhen = random.randint(1, BOLT_RATE)
+        return self._builder == None
 
 
     def getLives(self):
         """
         Getter for returning the amount of lives remaining.
         """
-        return self._lives
+        return self._sim.getLives()
 
 
-    # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
+    def getPoolStats(self):
         """
-        Initializes all the hidden attributes within Wave and creates a ship
-        and alien object. These attributes include the bolts, line, and many
-        of the visual aspects on the game board.
+        Returns the bolt pool statistics as (high-water mark, reuse count).
         """
-        self.appendAlien()
-        self._ship = Ship()
-        self._dline = GPath(points = [0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],\
-        linewidth = 2, linecolor = DARK_GREY)
-        self._time = 0
-        self._direction = 1
-        self._bolts = []
-        self._fireWhen = random.randint(1, BOLT_RATE)
-        self._steps = 0
-        self._playerBoltPresent = False
-        self._edge = False
-        self._lives = 3
-        self.coordinates = (0,0)
-        self._paused = GLabel(text="Press 'S' to Continue", \
-        font_name = ARCADE_FONT, font_size = ARCADE_LARGE, \
-        linecolor = 'blue', x = GAME_WIDTH/2, y = GAME_HEIGHT/2)
-        self._lose = GLabel(text="YOU'VE LOST! :(", font_name = ARCADE_FONT, \
-        font_size = ARCADE_LARGE, linecolor = 'blue', x = GAME_WIDTH/2, \
-        y = GAME_HEIGHT/2)
-        self._win = GLabel(text="WOO, YOU'VE WON! :D", \
-        font_name = ARCADE_FONT, font_size = ARCADE_LARGE, \
-        linecolor = 'blue', x = GAME_WIDTH/2, y = GAME_HEIGHT/2)
-        self._winner = False
+        return (self._pool.getHighWater(), self._pool.getReuses())
 
 
-# UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
-    def updateWave(self, input, dt):
+    def getSeed(self):
         """
-        Update method for Wave class. Updates the ship for at every frame
-        and moves the ship, aliens, and laser bolts on the screen.
+        Returns the seed of the random generator of this wave.
 
-        Parameter input: takes the input attribute from Invaders to use.
-        Precondition: input is an instance of GInput
+        A wave built with this seed, and given the same input, plays out the
+        same way.
+        """
+        return self._sim.getSeed()
 
-        Parameter dt: the time in seconds since last update
-        Precondition: dt is a number (int or float)
+    def subscribe(self, kind, subscriber):
         """
-        assert isinstance(input, GInput)
-        assert isinstance(dt, int) or isinstance(dt, float)
-        self.updateShip(input)
-        self.updateAlien(dt)
-        self.updateBolt(input)
-        if self.getWin() == True:
-            self._winner = True
+        Adds a subscriber to one kind of wave event, or to every kind.
 
+        At the end of each update in which such events happened, the
+        subscriber is called once with the list of those events (see
+        events.py).  This replaces checking the wave every frame.
 
-    def updateShip(self, input):
-        """
-        Update method for Ship. Allows for the movement of the ship across
-        the x axis.
+        Parameter kind: the kind of event to listen to
+        Precondition: kind is an EVENT constant, or None for every kind
 
-        Parameter input: takes the input attribute from Invaders to use.
-        Precondition: input is an instance of GInput
+        Parameter subscriber: the function to call with the events
+        Precondition: subscriber is a function taking a list of Events
         """
-        assert isinstance(input, GInput)
-        if self._ship != None:
-            self._ship.moveShip(input)
+        self._sim.subscribe(kind, subscriber)
 
 
-    def updateAlien(self,dt):
+    def unsubscribe(self, kind, subscriber):
         """
-        Update method for Alien. Updates when and which Aliens shoot bolts
-        and detects movement, particularly direction.
+        Removes a subscriber added with subscribe.
 
-        Parameter dt: the time in seconds since last update
-        Precondition: dt is a number (int or float)
+        Parameter kind: the kind the subscriber listens to
+        Precondition: kind is an EVENT constant, or None for every kind
+
+        Parameter subscriber: the function to remove
+        Precondition: subscriber was subscribed to kind
         """
-        assert isinstance(dt, int) or isinstance(dt, float)
-        if self.alienTimer(dt):
-            self.whenAlienShoot()
-            self.whichAlienShoot()
-            self.detectEdge()
-            if self._edge == True:
-                self._direction = - self._direction
-            for row in self._aliens:
-                for alien in row:
-                    if alien != None:
-                        if self._edge == True:
-                            self.moveAlienDown(alien)
-                        self.moveAlienHorizontal(alien)
-            self._edge = False
+        self._sim.unsubscribe(kind, subscriber)
 
 
-    def alienTimer(self,dt):
+    # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
+    def __init__(self, seed=None, pattern=None, prepare=True):
         """
-        Sets time when alien will shoot. Increments so that it returns True
-        whenever the specified time has been reached.
+        Initializes the simulation kernel and the game objects that mirror
+        it. These include the aliens, the ship, the line, and many of the
+        visual aspects on the game board.
 
-        Parameter dt: the time in seconds since last update
-        Precondition: dt is a number (int or float)
-        """
-        assert isinstance(dt, int) or isinstance(dt, float)
-        self._time += dt
-        if self._time >= ALIEN_SPEED:
-            self._time = 0
-            self._steps += 1
-            return True
-        else:
-            return False
+        The kernel is made at once.  With prepare False, the game objects are
+        left to later calls to prepare, so that a wave can be built a little
+        at a time, ahead of when it is needed.
 
+        Parameter seed: the seed of the random generator of the wave
+        Precondition: seed is an int, or None to pick one at random
 
-    def moveAlienHorizontal(self,alien):
-        """
-        Moves Alien in the horizontal direction. Moves alien across the x axis
-        and shoots whenever alien walks (depending on which and when)
+        Parameter pattern: the bullet pattern the aliens fire
+        Precondition: pattern is one of PATTERNS in emitters.py, or None for
+        the original alien fire
 
-        Parameter alien: the alien object selected from the list of aliens:
-        _aliens.
-        Precondition: alien is an instance of Alien
+        Parameter prepare: whether to build every game object now
+        Precondition: prepare is a bool
         """
-        assert isinstance(alien, Alien)
-        alien.x += ALIEN_H_WALK * self._direction
-        self.whenAlienShoot()
+        self._sim = WaveSim(seed, pattern)
+        self._aliens = []
+        self._alienField = None
+        self._dirty = set()
+        self._frame = 0
+        self._bolts = []
+        self._pool = BoltPool()
+        self._winner = False
+        self._latched = ACTION_NONE
+        self._sim.subscribe(EVENT_WAVE_WON, self.endWave)
+        self._sim.subscribe(EVENT_WAVE_LOST, self.endWave)
+        self._builder = self.build()
+        if prepare:
+            self.prepare()
 
 
-    def moveAlienDown(self,alien):
+    def prepare(self, steps=None):
         """
-        Moves Alien in the vertical direction. Moves alien across the y axis.
+        Builds more of the game objects of the wave, and returns True once
+        all of them are built.
 
-        Parameter alien: the alien object selected from the list of aliens:
-        _aliens.
-        Precondition: alien is an instance of Alien
+        Parameter steps: how many objects (or rows of aliens) to build
+        Precondition: steps is an int > 0, or None to build all that is left
         """
-        assert isinstance(alien, Alien)
-        alien.y -= ALIEN_V_WALK
+        while self._builder != None and steps != 0:
+            try:
+                next(self._builder)
+            except StopIteration:
+                self._builder = None
+            if steps != None:
+                steps -= 1
+        return self._builder == None
 
 
-    def detectEdge(self):
+    def build(self):
         """
-        Detects the edge of the game screen and turns _edge attribute to True
-        when alien is within ALIEN_H_SEP from the very edge of the screen. This
-        is used to signal the aliens to move down and away from the edge.
-        """
-        for row in self._aliens:
-            for alien in row:
-                if alien != None:
-                    if (alien.x >= GAME_WIDTH-ALIEN_H_SEP-ALIEN_WIDTH) \
-                    or (alien.x <= ALIEN_H_SEP+ALIEN_WIDTH):
-                        self._edge = True
-
+        Creates the game objects of the wave, a piece at a time.
 
-    def whenAlienShoot(self):
+        This is a generator: it pauses after each game object, and after each
+        row of aliens, so that prepare can spread the work over many frames.
         """
-        Determines when alien shoots. If shooter is a living alien, it will
-        fire a bolt.
-        """
-        if self._steps == self._fireWhen:
-            shooter = self.whichAlienShoot()
-            if shooter != None:
-                self.newAlienBolts(shooter.x, shooter.y)
-                self.resetFireWhen()
+        self._ship = Ship(x = self._sim.getShipX())
+        self._field = None if self._sim.getPattern() == None else BoltField()
+        yield
+        self._dline = GPath(points = [0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],\
+        linewidth = 2, linecolor = DARK_GREY)
+        yield
+        barriers = self._sim.getBarriers()
+        self._barrierField = BarrierField(barriers.getLefts(), \
+        barriers.getBottoms(), loadPixels(), barriers.getMasks())
+        self._sim.subscribe(EVENT_BARRIER_HIT, self.blastBarriers)
+        yield
+        self._paused = GLabel(text="Press 'S' to Continue", \
+        font_name = ARCADE_FONT, font_size = ARCADE_LARGE, \
+        linecolor = 'blue', x = GAME_WIDTH/2, y = GAME_HEIGHT/2)
+        yield
+        self._lose = GLabel(text="YOU'VE LOST! :(", font_name = ARCADE_FONT, \
+        font_size = ARCADE_LARGE, linecolor = 'blue', x = GAME_WIDTH/2, \
+        y = GAME_HEIGHT/2)
+        yield
+        self._win = GLabel(text="WOO, YOU'VE WON! :D", \
+        font_name = ARCADE_FONT, font_size = ARCADE_LARGE, \
+        linecolor = 'blue', x = GAME_WIDTH/2, y = GAME_HEIGHT/2)
+        yield
+        yield from self.appendAlien()
 
 
-    def whichAlienShoot(self):
-        """
-        Determines which alien shoots. It gets the bottom most alien that is
-        still alive and chooses them to be the ones shooting the bolts.
+# UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
+    def updateWave(self, input, dt):
         """
-        bottom = []
-        for i in range(ALIENS_IN_ROW):
-            bottom.append(None)
-        for row in self._aliens:
-            for i in range(len(row)):
-                if row[i] != None:
-                    if bottom[i] == None:
-                        bottom[i] = row[i]
-                    elif row[i].x < bottom[i].x:
-                        bottom[i] = row[i]
-        while None in bottom:
-            bottom.remove(None)
-        if bottom != []:
-            index = random.randrange(0, len(bottom))
-            return bottom[index]
-        else:
-            return None
-
+        Update method for Wave class. Steps the simulation kernel once with
+        the actions read from the player input.
 
-    def updateBolt(self,input):
-        """
-        Update method for the Bolts. It controls the movements and collisions
-        of the bolts.
+        The arrow keys are read from input as they are now, but firing comes
+        from latchInput, so that a spacebar press is used by exactly one
+        update even if a frame runs several updates (or none).
 
         Parameter input: takes the input attribute from Invaders to use.
         Precondition: input is an instance of GInput
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float)
         """
         assert isinstance(input, GInput)
-        if self._ship != None:
-            self.newShipBolts(input)
-        for bolt in self._bolts:
-            self.moveBolts(bolt)
-            self.collides(bolt)
-
+        assert isinstance(dt, int) or isinstance(dt, float)
+        actions = (self.readActions(input) & ~ACTION_FIRE) | self._latched
+        self._latched = ACTION_NONE
+        self._sim.step(actions, dt)
 
-    def moveBolts(self, bolt):
-        """
-        Move method for bolts. Ensures that bolts are removed once they go off
-        the screen and removes them from the list of bolts.
 
-        Parameter bolt: the bolt object chosen from the list of bolts
-        Precondition: bolt is an instance of Bolt
+    def latchInput(self, input):
         """
-        assert isinstance(bolt, Bolt)
-        bolt.y += bolt._velocity
-        if bolt.y >= GAME_HEIGHT:
-            self._bolts.remove(bolt)
-            self._playerBoltPresent = False
-        if bolt.y <= 0:
-            self._bolts.remove(bolt)
+        Remembers a spacebar press until the next call to updateWave.
 
-
-    def newShipBolts(self, input):
-        """
-        Creates a new bolt shot from the Ship object through pressing the
-        spacebar. It appends that bolt to the bolt list as well.
+        This should be called once per animation frame, before any updates.
 
         Parameter input: takes the input attribute from Invaders to use.
         Precondition: input is an instance of GInput
         """
         assert isinstance(input, GInput)
-        if input.is_key_pressed('spacebar') and self._playerBoltPresent == False:
-            newBolt = Bolt(self._ship.x, isPlayerBolt = True)
-            self._bolts.append(newBolt)
-            self._playerBoltPresent = True
+        self._latched |= self.readActions(input) & ACTION_FIRE
 
 
-    def newAlienBolts(self, x, y):
+    def readActions(self, input):
         """
-        Creates new bolts shot from the Alien objects automatically. It also
-        appends these bolts to the bolt list as well.
+        Returns the kernel actions (a bit mask) for the current player input.
 
-        Parameter x: the x coordinate of the center of the alien bolt
-        Precondiiton: x is an int or float
+        Holding the arrow keys moves the ship, and pressing the spacebar fires.
 
-        Parameter y: the y coordinate of the center of the alien bolt
-        Precondition: y is an int or float
+        Parameter input: takes the input attribute from Invaders to use.
+        Precondition: input is an instance of GInput
         """
-        assert isinstance(x, int) or isinstance(x, float)
-        assert isinstance(y, int) or isinstance(y, float)
-        alienBolt = Bolt(x=x, y=y - 1/2*ALIEN_HEIGHT - 1/2 * BOLT_HEIGHT, \
-        isPlayerBolt = False)
-        self._bolts.append(alienBolt)
+        assert isinstance(input, GInput)
+        actions = ACTION_NONE
+        if input.is_key_down('left'):
+            actions |= ACTION_LEFT
+        if input.is_key_down('right'):
+            actions |= ACTION_RIGHT
+        if input.is_key_pressed('spacebar'):
+            actions |= ACTION_FIRE
+        return actions
 
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
-    def drawWave(self, state, view):
+    def drawWave(self, state, view, alpha=1.0):
         """
         Draw Wave method for creating all the visuals during the wave,
-        including the aliens, the ship, and the defensive line. It also
-        draws out the text for when the game is paused and when the game is
-        completed.
+        including the aliens, the ship, the barriers and the defensive line.
+        It also draws out the text for when the game is paused and when the
+        game is completed.
+
+        The game objects are brought up to date with the kernel first.  They
+        are drawn alpha of the way from the previous update to the latest one.
 
         Parameter state: the current state of the game
         Precondition: one of the following states: STATE_INACTIVE,
@@ -398,17 +343,30 @@ class Wave(object):
 
         Parameter view: the game view used in drawing from Invaders
         Precondition: view is an instance of GView
+
+        Parameter alpha: how far to draw between the last two updates
+        Precondition: alpha is a float in 0..1 (1 draws the latest update)
         """
         assert isinstance(view, GView)
-        for row in self._aliens:
-            for alien in row:
-                if alien != None:
-                    alien.draw(view)
-        if self._ship != None:
+        assert 0 <= alpha <= 1
+        assert self.isReady()
+        self.syncAliens(alpha)
+        if self._alienField != None:
+            self._alienField.draw(view)
+        else:
+            for r, c in zip(*self._sim.getFormation().getLiving()):
+                self._aliens[r][c].draw(view)
+        if self._sim.isShipAlive():
+            self._ship.x = lerp(self._sim.getPrevShipX(), \
+            self._sim.getShipX(), alpha)
             self._ship.draw(view)
         self._dline.draw(view)
+        self._barrierField.draw(view)
+        self.syncBolts(alpha)
         for bolt in self._bolts:
             bolt.draw(view)
+        if self._field != None:
+            self._field.draw(view)
         if state == STATE_PAUSED:
             self._paused.draw(view)
         if state == STATE_COMPLETE and self._winner == False:
@@ -417,88 +375,210 @@ class Wave(object):
             self._win.draw(view)
 
 
-    # HELPER METHODS FOR COLLISION DETECTION
+    # HELPER METHODS FOR MIRRORING THE KERNEL
     def appendAlien(self):
         """
-        Method for appending Aliens into the list _aliens. Row and columns
-        are dependent on given constants. Distances between each alien and
-        distances from the edge of the game screen are given.
+        Method for appending Aliens into the list _aliens. There is one Alien
+        for each cell of the kernel formation, using the filmstrip of its
+        type.
+
+        A formation scaled down to fit the screen is instead drawn by an
+        AlienField, with one mesh per row.
+
+        This is a generator, which pauses after each row of aliens (see
+        build).  The formation must not have moved yet.
+        """
+        formation = self._sim.getFormation()
+        if formation.getScale() < 1:
+            dx, dy = formation.getOffset()
+            width, height = formation.getAlienSize()
+            self._alienField = AlienField(formation.getX()[0] - dx, \
+            formation.getY()[:, 0] - dy, formation.getTypes()[:, 0].tolist(), \
+            width, height)
+            self._dirty = set(range(formation.getRows()))
+            self._sim.subscribe(EVENT_ALIEN_KILLED, self.markRows)
+            return
+        xs = formation.getX().tolist()
+        ys = formation.getY().tolist()
+        types = formation.getTypes().tolist()
+        for r in range(formation.getRows()):
+            self._aliens.append([Alien(xs[r][c], ys[r][c], \
+            ALIEN_STRIPS[types[r][c]]) for c in range(formation.getCols())])
+            yield
+
+
+    def syncAliens(self, alpha=1.0):
+        """
+        Copies the kernel formation positions into the living Aliens.
+
+        An AlienField is only moved to the formation offset, after rebuilding
+        the rows that lost an alien.
+
+        The aliens move on to their next frame at every march.  The frame is
+        worked out from the offset, as each march moves the formation one
+        walk left or right, and the frame of every Alien (or of the field) is
+        only set when it changes.
+
+        The formation arrays are converted to lists once per frame, as the
+        GObject setters only accept Python numbers.
+
+        Parameter alpha: how far to draw between the last two updates
+        Precondition: alpha is a float in 0..1
+        """
+        formation = self._sim.getFormation()
+        dx, dy = formation.getOffset()
+        px, py = self._sim.getPrevOffset()
+        frame = int(round(dx / (ALIEN_H_WALK * formation.getScale()))) % \
+        ALIEN_MARCH_FRAMES
+        if self._alienField != None:
+            for row in self._dirty:
+                self._alienField.setRow(row, formation.getAlive()[row])
+            self._dirty.clear()
+            self._alienField.setFrame(frame)
+            self._alienField.x = lerp(px, dx, alpha)
+            self._alienField.y = lerp(py, dy, alpha)
+            return
+        xs = (formation.getX() + (lerp(px, dx, alpha) - dx)).tolist()
+        ys = (formation.getY() + (lerp(py, dy, alpha) - dy)).tolist()
+        if frame != self._frame:
+            self._frame = frame
+            for row in self._aliens:
+                for alien in row:
+                    alien.frame = frame
+        rows, cols = formation.getLiving()
+        for r, c in zip(rows, cols):
+            alien = self._aliens[r][c]
+            alien.x = xs[r][c]
+            alien.y = ys[r][c]
+
+
+    def syncBolts(self, alpha=1.0):
         """
-        self._aliens = []
-        currenty =  \
-        GAME_HEIGHT - ALIEN_CEILING - (ALIEN_ROWS - 0.5) * ALIEN_HEIGHT \
-        - ALIEN_V_SEP * (ALIEN_ROWS - 1)
-        sourceIndex = 0
-        for r in range(ALIEN_ROWS):
-            self._aliens.append([])
-            currentx = ALIEN_H_SEP + 1/2 * ALIEN_WIDTH
-            for a in range(ALIENS_IN_ROW):
-                currentx = currentx + (ALIEN_H_SEP + ALIEN_WIDTH)
-                self._aliens[r].append(Alien(currentx, currenty, \
-                ALIEN_IMAGES[sourceIndex]))
-            currenty = currenty + (ALIEN_V_SEP + ALIEN_HEIGHT)
-            if r % 2 == 1:
-                sourceIndex = sourceIndex + 1
-                if sourceIndex == len(ALIEN_IMAGES):
-                    sourceIndex = 0
-
-
-    def collides(self, bolt):
-        """
-        Detects if a bolt collides with either the ship or an alien. In the
-        case that it does, it will remove that bolt and the ship/alien.
-
-        Parameter bolt: the bolt object chosen from the list of bolts
-        Precondition: bolt is an instance of Bolt
-        """
-        assert isinstance(bolt, Bolt)
-        for row in self._aliens:
-            for i in range(len(row)):
-                if isinstance(row[i], Alien) and self._ship != None:
-                    if row[i].alienCollides(bolt):
-                        row[i] = None
-                        self._bolts.remove(bolt)
-                        self._playerBoltPresent = False
-                    if self._ship.shipCollides(bolt):
-                        self._coordinates = (self._ship.x, self._ship.y)
-                        self._ship = None
-                        self._bolts.remove(bolt)
-                        self._playerBoltPresent = False
-                        self._lives -= 1
-
-
-    def manageLives(self):
-        """
-        Gets whether or not the ship is None. Determines if player loses life.
-        """
-        if self._ship == None:
-            return True
+        Matches the Bolt objects in _bolts to the slots of the kernel store.
 
+        Bolts are taken from (or given back to) the pool so that there is one
+        per live slot. Each Bolt is then moved to its slot, and recolored only
+        if the slot now holds a bolt from the other side.
 
-    def redrawShip(self):
+        In a pattern wave, the alien bolts all go to the BoltField instead,
+        and only the player bolts get Bolt objects.
+
+        Parameter alpha: how far to draw between the last two updates
+        Precondition: alpha is a float in 0..1
         """
-        Method for redrawing ship after ship is hit by bolt and lives > 0.
+        store = self._sim.getBolts()
+        count = store.getCount()
+        xs = lerp(store.getPrevX(), store.getX(), alpha)
+        ys = lerp(store.getPrevY(), store.getY(), alpha)
+        player = store.getPlayer()
+        if self._field != None:
+            self._field.setBolts(xs[~player], ys[~player])
+            xs = xs[player]
+            ys = ys[player]
+            player = player[player]
+            count = len(player)
+        xs = xs.tolist()
+        ys = ys.tolist()
+        player = player.tolist()
+        while len(self._bolts) > count:
+            self._pool.release(self._bolts.pop())
+        for i in range(len(self._bolts), count):
+            self._bolts.append(self._pool.acquire(xs[i], ys[i], player[i]))
+        for i in range(count):
+            bolt = self._bolts[i]
+            if bolt.isPlayerBolt() != player[i]:
+                bolt.reuse(xs[i], ys[i], player[i])
+            else:
+                bolt.x = xs[i]
+                bolt.y = ys[i]
+
+
+    def markRows(self, events):
+        """
+        Marks the rows of the AlienField that lost an alien.
+
+        Parameter events: the aliens destroyed in the last update
+        Precondition: events is a list of EVENT_ALIEN_KILLED Events
+        """
+        for event in events:
+            self._dirty.add(event.value[0])
+
+
+    def blastBarriers(self, events):
+        """
+        Redraws the pixels of the barriers changed by craters.
+
+        Only the rectangle each crater changed is written to its texture.
+
+        Parameter events: the craters blasted in the last update
+        Precondition: events is a list of EVENT_BARRIER_HIT Events
         """
-        self._ship = Ship(x = self._coordinates[0], y = self._coordinates[1])
+        masks = self._sim.getBarriers().getMasks()
+        for event in events:
+            index, left, bottom, right, top = event.value
+            self._barrierField.setRegion(index, masks[index], left, bottom, \
+            right, top)
 
 
-    def getDip(self):
+    def endWave(self, events):
         """
-        Returns True if any alien goes below the defensive line.
+        Records the outcome reported by the kernel, to pick the label to draw.
+
+        Parameter events: the outcome event of the wave
+        Precondition: events is a list of one EVENT_WAVE_WON or
+        EVENT_WAVE_LOST Event
         """
-        for row in self._aliens:
-            for alien in row:
-                if alien != None and (alien.y - ALIEN_HEIGHT/2) < DEFENSE_LINE:
-                    return True
+        self._winner = events[0].kind == EVENT_WAVE_WON
+
 
+    def snapshot(self):
+        """
+        Returns an immutable snapshot (a WaveState) of the wave.
 
-    def getWin(self):
+        The game objects are not part of the snapshot: they are rebuilt from
+        the kernel every time the wave is drawn.
         """
-        Returns True if each alien in the list _aliens is None. Otherwise,
-        returns False.
+        return self._sim.snapshot()
+
+
+    def restore(self, state):
         """
-        for row in self._aliens:
-            for alien in row:
-                if alien != None:
-                    return False
-        return True
+        Puts the wave back in the state captured by snapshot.
+
+        The existing aliens, ship and bolts are reused, so no texture is
+        loaded again.  No event is posted.  A wave that is not ready is built
+        first, from its own starting state.
+
+        Parameter state: the state to restore
+        Precondition: state is a WaveState taken from a wave of this size
+        """
+        self.prepare()
+        self._sim.restore(state)
+        self._barrierField.setBarriers(self._sim.getBarriers().getMasks())
+        if self._alienField != None:
+            self._dirty = set(range(self._sim.getFormation().getRows()))
+        self._winner = state.outcome == True
+        self._latched = ACTION_NONE
+
+
+    def redrawShip(self):
+        """
+        Method for redrawing ship after ship is hit by bolt and lives > 0.
+        """
+        self._sim.respawnShip()
+
+
+def lerp(start, end, alpha):
+    """
+    Returns the value alpha of the way from start to end.
+
+    Parameter start: the value at alpha 0
+    Precondition: start is a number or a NumPy array
+
+    Parameter end: the value at alpha 1
+    Precondition: end is a number or a NumPy array the same shape as start
+
+    Parameter alpha: how far to go from start to end
+    Precondition: alpha is a float in 0..1
+    """
+    return start + (end - start) * alpha